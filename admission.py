@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from flask import current_app, g, jsonify, request, session
+
+import database
+from metrics import Counter, Gauge, registry
+
+admission_shed = registry.register(Counter(
+    'admission_shed_total', 'Requests turned away by admission control', ('reason', 'endpoint')))
+
+# Every AdmissionControl attached to an app; the gauge covers them all, so
+# building more than one app in a process doesn't register it twice
+_controls = weakref.WeakSet()
+registry.register(Gauge('admission_in_flight', 'Requests holding an admission slot',
+                        lambda: sum(control.stats()['in_flight'] for control in list(_controls))))
+
+
+class TokenBuckets:
+    """One token bucket per key (client address, user id) in a bounded LRU.
+
+    Each bucket refills at `rate` tokens per second up to `burst`; keys
+    not seen for a while are evicted first, and an evicted key simply
+    starts again with a full bucket.
+    """
+
+    def __init__(self, rate, burst, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Spend one token; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def uses_database(view):
+    """Mark a view as needing one of admission control's concurrency slots"""
+    view.admission_slot = True
+    return view
+
+
+class AdmissionControl:
+    """Sheds load before it reaches the database.
+
+    Every request except the exempt endpoints (static files, metrics and
+    health checks) spends a token from its
+    client's bucket and, when logged in, its user's bucket; login and
+    signup also spend from a stricter per-client bucket. An empty bucket
+    answers 429. Admitted requests to views marked @uses_database then
+    need one of max_concurrent slots (by default the connection pool's
+    size plus overflow); if none frees up within queue_timeout seconds
+    the answer is 503. Both carry Retry-After. A slot is held until the
+    response is closed, so streamed responses keep theirs until the last
+    chunk is sent.
+    """
+
+    def __init__(self, client_rate=20, client_burst=40, user_rate=10, user_burst=20, auth_rate=0.5,
+                 auth_burst=5, auth_endpoints=('login', 'signup'), max_concurrent=None, queue_timeout=0.25,
+                 exempt=('static', 'serve_asset', 'metrics', 'health', 'ready'), enabled=True):
+        if max_concurrent is None:
+            max_concurrent = database.pool_config['pool_size'] + database.pool_config['max_overflow']
+        self.clients = TokenBuckets(client_rate, client_burst)
+        self.users = TokenBuckets(user_rate, user_burst)
+        self.auth = TokenBuckets(auth_rate, auth_burst)
+        self.auth_endpoints = set(auth_endpoints)
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.exempt = set(exempt)
+        self.enabled = enabled
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._stats = {'admitted': 0, 'rate_limited': 0, 'overloaded': 0, 'in_flight': 0}
+
+    def init_app(self, app):
+        app.extensions['admission'] = self
+        app.before_request(self._admit)
+        app.after_request(self._release_on_close)
+        app.teardown_request(self._release)
+        _controls.add(self)
+
+    def _shed(self, reason, status, message, retry_after):
+        with self._lock:
+            self._stats[reason] += 1
+        admission_shed.inc((reason, request.endpoint))
+        response = jsonify({'error': message})
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response, status
+
+    def _admit(self):
+        endpoint = request.endpoint
+        if not self.enabled or endpoint is None or endpoint in self.exempt:
+            return None
+
+        client = request.remote_addr
+        wait = self.clients.take(client)
+        if endpoint in self.auth_endpoints:
+            wait = max(wait, self.auth.take(client))
+        user_id = session.get('user_id')
+        if user_id is not None:
+            wait = max(wait, self.users.take(user_id))
+        if wait:
+            return self._shed('rate_limited', 429, 'Too many requests, please slow down', wait)
+
+        if not getattr(current_app.view_functions.get(endpoint), 'admission_slot', False):
+            return None
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            return self._shed('overloaded', 503, 'Server is busy, please try again shortly', 1)
+        g.admission_slot = self._slot_release()
+        with self._lock:
+            self._stats['admitted'] += 1
+            self._stats['in_flight'] += 1
+        return None
+
+    def _slot_release(self):
+        """A callable that gives the slot back on its first call only"""
+        once = threading.Lock()
+
+        def release():
+            if once.acquire(blocking=False):
+                with self._lock:
+                    self._stats['in_flight'] -= 1
+                self._slots.release()
+        return release
+
+    def _release_on_close(self, response):
+        release = g.get('admission_slot')
+        if release is not None:
+            response.call_on_close(release)
+            g.admission_handed_off = True
+        return response
+
+    def _release(self, exc=None):
+        release = g.pop('admission_slot', None)
+        if release is None:
+            return
+        # A request that failed after the after_request hooks (e.g. in
+        # save_session) sends an error response instead of the one that
+        # carries the close callback, so the slot is released here
+        if exc is not None or not g.pop('admission_handed_off', False):
+            release()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['max_concurrent'] = self.max_concurrent
+        snapshot['tracked_clients'] = len(self.clients)
+        snapshot['tracked_users'] = len(self.users)
+        return snapshot
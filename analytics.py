@@ -0,0 +1,366 @@
+import threading
+import time
+
+import numpy as np
+from mysql.connector import Error
+
+from database import get_db_connection
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Cohorts with fewer students per subject are left out of "weakest subjects"
+MIN_COHORT_STUDENTS = 5
+
+# Most skipped ids a snapshot keeps looking for per table
+MAX_GAPS = 10000
+
+
+def _encode(values, codes, names):
+    """Map strings to integer codes, adding unseen ones to codes/names; None becomes -1"""
+    if not values:
+        return np.empty(0, dtype=np.int32)
+    unique, inverse = np.unique(np.array(['' if v is None else v for v in values], dtype=object),
+                                return_inverse=True)
+    mapping = np.empty(len(unique), dtype=np.int32)
+    for index, value in enumerate(unique):
+        if value == '':
+            mapping[index] = -1
+            continue
+        if value not in codes:
+            codes[value] = len(names)
+            names.append(value)
+        mapping[index] = codes[value]
+    return mapping[inverse.reshape(-1)]
+
+
+def _track_gaps(gaps, watermark, ids, found, now, grace):
+    """Update {id: first missed at} with ids skipped below the new rows and drop found or expired ones.
+
+    A transaction that took its id early can commit after higher ids
+    were read, so ids missing between the watermark and the newest row
+    are looked up again until they appear or grace seconds pass (rolled
+    back inserts and rows deleted before they were read never appear).
+    """
+    gaps = {gap: missed for gap, missed in gaps.items() if now - missed < grace and gap not in found}
+    if ids:
+        seen = set(ids)
+        start = max(watermark + 1, max(ids) - len(ids) - MAX_GAPS)
+        for gap in range(start, max(ids)):
+            if gap not in seen:
+                gaps.setdefault(gap, now)
+    while len(gaps) > MAX_GAPS:
+        gaps.pop(min(gaps, key=gaps.get))
+    return gaps
+
+
+def _months(timestamps):
+    """Months since 1970-01 for each timestamp"""
+    return np.array(timestamps, dtype='datetime64[M]').astype(np.int64)
+
+
+def _month_label(month):
+    return str(np.datetime64(int(month), 'M'))
+
+
+class CohortSnapshot:
+    """Columnar in-memory copy of users and user_subjects for cohort statistics.
+
+    Grades, streams and subject names are mapped to integer codes so every
+    aggregate is a NumPy bincount/sort over whole columns. refresh() only
+    reads rows above the last seen ids, ids skipped below them during the
+    last commit_grace seconds (see _track_gaps), and the subjects of users
+    passed to mark_dirty() (update_subjects changes rows in place); a full
+    reload happens every full_reload_interval seconds to catch anything
+    else, including in-place changes made by other worker processes.
+    Subject rows whose user has not been read yet are left out of every
+    aggregate until it has. Results are cached until the data changes.
+    """
+
+    def __init__(self, refresh_interval=60, full_reload_interval=3600, commit_grace=300):
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.commit_grace = commit_grace
+        self.grades, self.streams, self.subjects = [], [], []
+        self._grade_codes, self._stream_codes, self._subject_codes = {}, {}, {}
+        self._data = None
+        self._refreshed_at = None
+        self._loaded_at = None
+        self._dirty = set()
+        self._results = {}
+        self._lock = threading.Lock()
+        # Reentrant: _snapshot() holds it while calling refresh()
+        self._refresh_lock = threading.RLock()
+
+    def mark_dirty(self, user_id):
+        """Reload this user's subjects on the next refresh"""
+        with self._lock:
+            self._dirty.add(user_id)
+
+    def _load(self, cursor, data):
+        now = time.monotonic()
+        full = data is None or now - self._loaded_at >= self.full_reload_interval
+        with self._lock:
+            dirty, self._dirty = ([], set()) if full else (sorted(self._dirty), set())
+
+        if full:
+            data = {
+                'user_ids': np.empty(0, dtype=np.int64), 'user_grade': np.empty(0, dtype=np.int32),
+                'user_stream': np.empty(0, dtype=np.int32), 'user_month': np.empty(0, dtype=np.int64),
+                'row_ids': np.empty(0, dtype=np.int64), 'row_user': np.empty(0, dtype=np.int64),
+                'row_subject': np.empty(0, dtype=np.int32), 'row_confidence': np.empty(0, dtype=np.float64),
+                'subject_gaps': {}, 'user_gaps': {},
+            }
+        else:
+            data = dict(data)
+
+        # Subjects before users, so a subject row's user is usually read in the same refresh
+        subject_watermark = int(data['row_ids'].max()) if len(data['row_ids']) else 0
+        cursor.execute("""
+            SELECT id, user_id, subject_name, confidence_level
+            FROM user_subjects
+            WHERE id > %s
+            ORDER BY id
+        """, (subject_watermark,))
+        rows = cursor.fetchall()
+        late = []
+        if data['subject_gaps']:
+            gaps = sorted(data['subject_gaps'])
+            placeholders = ', '.join(['%s'] * len(gaps))
+            cursor.execute(f"""
+                SELECT id, user_id, subject_name, confidence_level
+                FROM user_subjects
+                WHERE id IN ({placeholders})
+            """, gaps)
+            late = cursor.fetchall()
+        data['subject_gaps'] = _track_gaps(data['subject_gaps'], subject_watermark, [row[0] for row in rows],
+                                           {row[0] for row in late}, now, self.commit_grace)
+        rows = late + rows
+        if dirty:
+            placeholders = ', '.join(['%s'] * len(dirty))
+            cursor.execute(f"""
+                SELECT id, user_id, subject_name, confidence_level
+                FROM user_subjects
+                WHERE user_id IN ({placeholders})
+            """, dirty)
+            dirty_rows = cursor.fetchall()
+            seen = {row[0] for row in dirty_rows}
+            rows = [row for row in rows if row[0] not in seen] + dirty_rows
+
+        user_watermark = int(data['user_ids'][-1]) if len(data['user_ids']) else 0
+        cursor.execute("""
+            SELECT id, grade, stream, created_at
+            FROM users
+            WHERE id > %s
+            ORDER BY id
+        """, (user_watermark,))
+        users = cursor.fetchall()
+        late = []
+        if data['user_gaps']:
+            gaps = sorted(data['user_gaps'])
+            placeholders = ', '.join(['%s'] * len(gaps))
+            cursor.execute(f"""
+                SELECT id, grade, stream, created_at
+                FROM users
+                WHERE id IN ({placeholders})
+            """, gaps)
+            late = cursor.fetchall()
+        data['user_gaps'] = _track_gaps(data['user_gaps'], user_watermark, [user[0] for user in users],
+                                        {user[0] for user in late}, now, self.commit_grace)
+        users = late + users
+
+        if not rows and not users and not dirty:
+            return data, False
+
+        if users:
+            ids, grades, streams, created = zip(*users)
+            data['user_ids'] = np.concatenate([data['user_ids'], np.array(ids, dtype=np.int64)])
+            data['user_grade'] = np.concatenate([data['user_grade'], _encode(grades, self._grade_codes, self.grades)])
+            data['user_stream'] = np.concatenate([data['user_stream'],
+                                                  _encode(streams, self._stream_codes, self.streams)])
+            data['user_month'] = np.concatenate([data['user_month'], _months(created)])
+            if (np.diff(data['user_ids']) < 0).any():
+                # Late users land below newer ones; the user columns must stay sorted by id
+                order = np.argsort(data['user_ids'], kind='stable')
+                for name in ('user_ids', 'user_grade', 'user_stream', 'user_month'):
+                    data[name] = data[name][order]
+
+        keep = np.ones(len(data['row_ids']), dtype=bool)
+        if dirty:
+            keep = ~np.isin(data['row_user'], np.array(dirty, dtype=np.int64))
+        columns = {'row_ids': np.empty(0, dtype=np.int64), 'row_user': np.empty(0, dtype=np.int64),
+                   'row_subject': np.empty(0, dtype=np.int32), 'row_confidence': np.empty(0, dtype=np.float64)}
+        if rows:
+            ids, user_ids, names, confidence = zip(*rows)
+            columns = {'row_ids': np.array(ids, dtype=np.int64), 'row_user': np.array(user_ids, dtype=np.int64),
+                       'row_subject': _encode(names, self._subject_codes, self.subjects),
+                       'row_confidence': np.array(confidence, dtype=np.float64)}
+        for name, column in columns.items():
+            data[name] = np.concatenate([data[name][keep], column])
+
+        # Position of each row's user in the user columns; rows whose user
+        # has not been read yet point at position 0 and are masked out
+        position = np.searchsorted(data['user_ids'], data['row_user'])
+        position[position == len(data['user_ids'])] = 0
+        data['row_known'] = (data['user_ids'][position] == data['row_user']) if len(data['user_ids']) else \
+            np.zeros(len(position), dtype=bool)
+        data['row_position'] = position
+        if full:
+            self._loaded_at = now
+        return data, True
+
+    def refresh(self):
+        """Pull new and changed rows; returns False if the database is unavailable"""
+        with self._refresh_lock:
+            connection = get_db_connection()
+            if connection is None:
+                return False
+            try:
+                cursor = connection.cursor()
+                data, changed = self._load(cursor, self._data)
+                cursor.close()
+            except Error as e:
+                print(f"Error refreshing analytics: {e}")
+                return False
+            finally:
+                connection.close()
+
+            with self._lock:
+                if changed:
+                    self._data = data
+                    self._results = {}
+                self._refreshed_at = time.monotonic()
+            return True
+
+    def _snapshot(self):
+        stale = self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_interval
+        if stale:
+            # One request refreshes; the others keep using the old snapshot
+            if self._refresh_lock.acquire(blocking=self._data is None):
+                try:
+                    self.refresh()
+                finally:
+                    self._refresh_lock.release()
+        return self._data
+
+    def _cached(self, key, compute):
+        data = self._snapshot()
+        if data is None:
+            return None
+        with self._lock:
+            if key in self._results and self._data is data:
+                return self._results[key]
+        result = compute(data)
+        with self._lock:
+            if self._data is data:
+                self._results[key] = result
+        return result
+
+    def _row_mask(self, data, grade, stream):
+        mask = data['row_known'].copy()
+        if grade:
+            code = self._grade_codes.get(grade, -2)
+            mask &= data['user_grade'][data['row_position']] == code
+        if stream:
+            code = self._stream_codes.get(stream, -2)
+            mask &= data['user_stream'][data['row_position']] == code
+        return mask
+
+    def subject_stats(self, grade=None, stream=None):
+        """Average confidence and percentiles per subject for a cohort, weakest first"""
+        return self._cached(('subjects', grade, stream), lambda data: self._subject_stats(data, grade, stream))
+
+    def _subject_stats(self, data, grade, stream):
+        mask = self._row_mask(data, grade, stream)
+        subject = data['row_subject'][mask]
+        confidence = data['row_confidence'][mask]
+        size = len(self.subjects)
+        counts = np.bincount(subject, minlength=size)
+        sums = np.bincount(subject, weights=confidence, minlength=size)
+
+        # Sort by subject, then confidence, so each subject is one sorted run
+        ordered = confidence[np.lexsort((confidence, subject))]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        present = np.flatnonzero(counts)
+        percentiles = {}
+        for p in PERCENTILES:
+            position = starts[present] + (counts[present] - 1) * (p / 100)
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, starts[present] + counts[present] - 1)
+            fraction = position - low
+            percentiles[p] = ordered[low] + (ordered[high] - ordered[low]) * fraction
+
+        averages = sums[present] / counts[present]
+        stats = []
+        for index in np.argsort(averages, kind='stable'):
+            subject_id = present[index]
+            stats.append({
+                'subject_name': self.subjects[subject_id],
+                'students': int(counts[subject_id]),
+                'average_confidence': round(float(averages[index]), 2),
+                'percentiles': {f"p{p}": round(float(values[index]), 2) for p, values in percentiles.items()},
+            })
+        return stats
+
+    def weakest_subjects(self, limit=3):
+        """The lowest average-confidence subjects of every grade/stream cohort"""
+        return self._cached(('weakest', limit), lambda data: self._weakest_subjects(data, limit))
+
+    def _weakest_subjects(self, data, limit):
+        streams = len(self.streams) + 1
+        subjects = len(self.subjects)
+        # Cohort code per user: grade * (streams + 1) + stream + 1 (no stream is 0)
+        user_cohort = data['user_grade'].astype(np.int64) * streams + data['user_stream'] + 1
+        cohorts = (len(self.grades)) * streams
+        users = np.bincount(user_cohort, minlength=cohorts)
+
+        known = data['row_known']
+        key = user_cohort[data['row_position'][known]] * subjects + data['row_subject'][known]
+        counts = np.bincount(key, minlength=cohorts * subjects).reshape(cohorts, subjects)
+        sums = np.bincount(key, weights=data['row_confidence'][known],
+                           minlength=cohorts * subjects).reshape(cohorts, subjects)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = np.where(counts >= MIN_COHORT_STUDENTS, sums / counts, np.inf)
+        order = np.argsort(averages, axis=1, kind='stable')[:, :limit]
+
+        result = []
+        for cohort in np.flatnonzero(users):
+            weakest = [{
+                'subject_name': self.subjects[subject_id],
+                'students': int(counts[cohort, subject_id]),
+                'average_confidence': round(float(averages[cohort, subject_id]), 2),
+            } for subject_id in order[cohort] if np.isfinite(averages[cohort, subject_id])]
+            grade, stream = divmod(int(cohort), streams)
+            result.append({
+                'grade': self.grades[grade],
+                'stream': self.streams[stream - 1] if stream else None,
+                'students': int(users[cohort]),
+                'weakest_subjects': weakest,
+            })
+        return result
+
+    def trend(self, grade=None, stream=None, subject=None):
+        """Average confidence of students by signup month"""
+        return self._cached(('trend', grade, stream, subject),
+                            lambda data: self._trend(data, grade, stream, subject))
+
+    def _trend(self, data, grade, stream, subject):
+        mask = self._row_mask(data, grade, stream)
+        if subject:
+            mask &= data['row_subject'] == self._subject_codes.get(subject, -2)
+        if not mask.any():
+            return []
+        months = data['user_month'][data['row_position'][mask]]
+        first = months.min()
+        offsets = months - first
+        counts = np.bincount(offsets)
+        sums = np.bincount(offsets, weights=data['row_confidence'][mask])
+        students = np.bincount(offsets[np.unique(data['row_position'][mask], return_index=True)[1]],
+                               minlength=len(counts))
+        return [{
+            'month': _month_label(first + offset),
+            'students': int(students[offset]),
+            'average_confidence': round(float(sums[offset] / counts[offset]), 2),
+        } for offset in np.flatnonzero(counts)]
+
+
+cohort_snapshot = CohortSnapshot()
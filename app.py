@@ -1,44 +1,159 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-import mysql.connector
-from mysql.connector import Error
+from flask import Flask, Response, current_app, render_template, request, jsonify, redirect, url_for, flash
+from mysql.connector import Error, IntegrityError, errorcode
+import csv
+import io
 import json
 import os
-from datetime import datetime
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
 from flask import session
 import random
 
-app = Flask(__name__)
-app.secret_key = 'your_secret_key_here'  # Change this to a random secret key
+import config
+import database
+from database import get_db_connection, get_pool_stats, upsert_clause, values_placeholders
+from admission import AdmissionControl, uses_database
+from events import BufferFull, EVENT_TYPES, MAX_SESSION_MINUTES, confidence_aggregator, study_events
+from profile_cache import profile_cache
+from quote_cache import quote_cache, quote_hash
+from response_cache import response_cache
+from revision import revision_scheduler, MIN_QUALITY, MAX_QUALITY
+import assets
+from jobs import job_queue, JobFailed, QueueFull
+import metrics
+from session_store import create_session_interface
+from scheduler import diff_timetable, generate_timetable, plan_key, replan_timetable, TimetableError, TimetablePlanCache
+from warmup import Warmup
 
-# Database configuration
-db_config = {
-    'host': 'localhost',
-    'user': 'root',  # Default XAMPP username
-    'password': '',  # Default XAMPP password (empty)
-    'database': 'study_planner'
+# Overridden by SECRET_KEY from the environment or .env (see config.py)
+SECRET_KEY = 'your_secret_key_here'  # Change this to a random secret key
+
+# Views are recorded here and added to every app create_app() builds
+_routes = []
+
+def route(rule, **options):
+    """Register a view for rule on each app create_app() returns (like app.route)"""
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
+
+# Server-side sessions: the cookie only carries an opaque session id.
+# The SQLite file is shared by every worker process on one host; 'memory'
+# is faster but only works with a single process.
+session_config = {
+    'backend': 'sqlite',
+    'path': 'sessions.sqlite3',
+    'max_entries': 10000,  # Sessions kept before the soonest-expiring are evicted
+    'ttl': 86400           # Seconds a non-permanent session stays valid
 }
 
+# Last generated timetable per user, so subject edits only re-place the
+# sessions they affect
+timetable_plans = TimetablePlanCache()
 
+# Admission control in front of the database: per-client and per-user token
+# buckets answer 429, a full set of concurrency slots answers 503. Behind a
+# reverse proxy, wrap app.wsgi_app in werkzeug's ProxyFix so clients are
+# told apart by their own address.
+admission_config = {
+    'client_rate': 20,       # Requests per second per client address
+    'client_burst': 40,
+    'user_rate': 10,         # Requests per second per logged-in user
+    'user_burst': 20,
+    'auth_rate': 0.5,        # /login and /signup attempts per second per client address
+    'auth_burst': 5,
+    'queue_timeout': 0.25    # Seconds to wait for a free slot before a 503
+}
 
-def get_db_connection():
-    """Create and return database connection"""
-    try:
-        connection = mysql.connector.connect(**db_config)
-        return connection
-    except Error as e:
-        print(f"Error connecting to MySQL: {e}")
-        return None
+_setup_lock = threading.Lock()
+_database_configured = False
+
+def create_app(warmup=None):
+    """Build a new app, configured from the environment (and .env).
+
+    Each call returns a separate Flask instance with every route, its own
+    session interface, metrics hooks, assets and admission control. The
+    database settings are process-wide (one pool, shared caches), so they
+    are applied by the first call only. With warmup (or WARMUP=1) pools
+    and caches are primed in the background and /ready answers 503 until
+    that has finished.
+    """
+    global _database_configured
+    started = time.perf_counter()
+    settings = config.load()
+    app_settings = settings.get('app', {})
+    with _setup_lock:
+        if not _database_configured:
+            database.configure(settings)
+            _database_configured = True
+    if warmup is None:
+        warmup = app_settings.get('warmup', False)
+    
+    app = Flask(__name__)
+    app.secret_key = app_settings.get('secret_key', SECRET_KEY)
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    
+    session_options = dict(session_config, **settings.get('session', {}))
+    if session_options['backend'] != 'sqlite':
+        session_options.pop('path', None)
+    app.session_interface = create_session_interface(**session_options)
+    # Per-route latency, SQL and template timings exported on /metrics
+    metrics.init_app(app)
+    # Fingerprinted, precompressed CSS/JS built by build_assets.py
+    assets.init_app(app)
+    AdmissionControl(**dict(admission_config, **settings.get('admission', {}))).init_app(app)
     
+    # Compile every template now rather than on its first request
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    
+    app.config['CONFIGURED_MS'] = round((time.perf_counter() - started) * 1000, 1)
+    app.config['WARMUP'] = warmup
+    if warmup:
+        app_warmup.start()
+    return app
+
+# NumPy-backed modules are imported on first use to keep startup fast
+def _cohort_snapshot():
+    from analytics import cohort_snapshot
+    return cohort_snapshot
+
+def _buddy_index():
+    from buddies import buddy_index
+    return buddy_index
+
+def _loaded(module_name):
+    """A lazily imported module, or None if nothing has needed it yet"""
+    return sys.modules.get(module_name)
+
+def _load_cohort_snapshot():
+    return _cohort_snapshot().refresh()
 
-@app.route('/')
+def _load_buddy_index():
+    return _buddy_index().load()
+
+# Background startup work run by create_app(warmup=True); /ready reports on it
+app_warmup = Warmup([
+    ('database_pool', database.warm_pool),
+    ('quotes', quote_cache.refresh),
+    ('analytics', _load_cohort_snapshot),
+    ('study_buddies', _load_buddy_index),
+])
+
+@route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/create')
+@route('/create')
 def create():
     return render_template('signup.html')
 
-@app.route('/signup', methods=['POST'])
+@route('/signup', methods=['POST'])
+@uses_database
 def signup():
     try:
         # Get form data
@@ -79,38 +194,44 @@ def signup():
         
         cursor = connection.cursor()
         
-        # Check if email already exists
-        cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
-        if cursor.fetchone():
+        try:
+            # Insert new user; the unique index on users.email rejects duplicates
+            insert_user_query = """
+            INSERT INTO users (name, email, password, grade, stream, study_time, hobbies, exams)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(insert_user_query, (name, email, password, grade, stream, study_time, hobbies, exams_json))
+            
+            # Get the inserted user ID
+            user_id = cursor.lastrowid
+            
+            # Insert all subjects in a single multi-row statement
+            insert_subject_query = f"""
+            INSERT INTO user_subjects (user_id, subject_name, confidence_level)
+            VALUES {values_placeholders(len(subjects), 3)}
+            """
+            params = []
+            for subject_name, confidence_level in subjects.items():
+                params.extend((user_id, subject_name, confidence_level))
+            cursor.execute(insert_subject_query, params)
+            
+            connection.commit()
+            response_cache.bump(('subjects', user_id))
+            profile_cache.invalidate(user_id, email)
+            # An index that is not loaded yet will read the new user when it is
+            if _loaded('buddies'):
+                _buddy_index().add_user(user_id, name, grade, stream, subjects)
+        except IntegrityError as e:
+            connection.rollback()
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                return jsonify({'error': 'Email already exists'}), 400
+            raise
+        except Error:
+            connection.rollback()
+            raise
+        finally:
             cursor.close()
             connection.close()
-            return jsonify({'error': 'Email already exists'}), 400
-        
-        # Insert new user
-        insert_user_query = """
-        INSERT INTO users (name, email, password, grade, stream, study_time, hobbies, exams)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        cursor.execute(insert_user_query, (name, email, password, grade, stream, study_time, hobbies, exams_json))
-        connection.commit()
-        
-        # Get the inserted user ID
-        user_id = cursor.lastrowid
-        
-        # Insert subjects into user_subjects table
-        insert_subject_query = """
-        INSERT INTO user_subjects (user_id, subject_name, confidence_level)
-        VALUES (%s, %s, %s)
-        """
-        
-        for subject_name, confidence_level in subjects.items():
-            cursor.execute(insert_subject_query, (user_id, subject_name, confidence_level))
-        
-        connection.commit()
-        
-        cursor.close()
-        connection.close()
         
         # Return success response
         return jsonify({
@@ -126,74 +247,157 @@ def signup():
         print(f"Unexpected error: {e}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
-@app.route('/users')
+# Page size limits for the /users listing
+USERS_PAGE_SIZE = 50
+USERS_MAX_PAGE_SIZE = 200
+
+@route('/users')
+@uses_database
 def view_users():
-    """Route to view all users (for testing purposes)"""
+    """Route to view users one page at a time (for testing purposes)"""
     try:
+        # Keyset pagination: ?after_id=<last id of previous page>&limit=<n>
+        after_id = request.args.get('after_id', 0, type=int)
+        limit = min(max(request.args.get('limit', USERS_PAGE_SIZE, type=int), 1), USERS_MAX_PAGE_SIZE)
+        
         connection = get_db_connection()
         if connection is None:
             return "Database connection failed"
         
         cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT u.id, u.name, u.email, u.grade, u.stream, u.study_time, u.hobbies, u.exams, u.created_at,
-                   GROUP_CONCAT(CONCAT(us.subject_name, ' (', us.confidence_level, ')') SEPARATOR ', ') as subjects
-            FROM users u
-            LEFT JOIN user_subjects us ON u.id = us.user_id
-            GROUP BY u.id
-        """)
-        users = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        try:
+            cursor.execute("""
+                SELECT id, name, email, grade, stream, study_time, hobbies, exams, created_at
+                FROM users
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (after_id, limit + 1))
+            users = cursor.fetchall()
+            
+            has_next = len(users) > limit
+            users = users[:limit]
+            
+            if users:
+                placeholders = ', '.join(['%s'] * len(users))
+                cursor.execute(f"""
+                    SELECT user_id, subject_name, confidence_level
+                    FROM user_subjects
+                    WHERE user_id IN ({placeholders})
+                    ORDER BY user_id, subject_name
+                """, [user['id'] for user in users])
+                subjects = {}
+                for row in cursor.fetchall():
+                    subjects.setdefault(row['user_id'], []).append(
+                        f"{row['subject_name']} ({row['confidence_level']})")
+                for user in users:
+                    user['subjects'] = ', '.join(subjects.get(user['id'], []))
+        finally:
+            cursor.close()
+            connection.close()
         
-        return render_template('users.html', users=users)
+        next_after_id = users[-1]['id'] if has_next else None
+        return render_template('users.html', users=users, limit=limit, next_after_id=next_after_id)
         
     except Error as e:
         return f"Database error: {e}"
 
-@app.route('/user/<int:user_id>/subjects')
+@route('/users/export')
+@uses_database
+def export_users():
+    """Stream every user with their subjects as NDJSON (default) or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    connection = get_db_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    def generate():
+        # Unbuffered cursor: rows are read from the server as they are sent,
+        # so memory stays flat regardless of table size.
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute("""
+                SELECT u.id, u.name, u.email, u.grade, u.stream, u.study_time, u.hobbies, u.exams, u.created_at,
+                       us.subject_name, us.confidence_level
+                FROM users u
+                LEFT JOIN user_subjects us ON u.id = us.user_id
+                ORDER BY u.id
+            """)
+            if export_format == 'csv':
+                yield _csv_line(EXPORT_COLUMNS)
+            
+            user = None
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for row in rows:
+                    if user is None or user['id'] != row['id']:
+                        if user is not None:
+                            yield _export_line(user, export_format)
+                        user = {column: row[column] for column in EXPORT_COLUMNS[:-1]}
+                        user['subjects'] = {}
+                    if row['subject_name'] is not None:
+                        user['subjects'][row['subject_name']] = row['confidence_level']
+            if user is not None:
+                yield _export_line(user, export_format)
+        except Error as e:
+            print(f"Database error during export: {e}")
+        finally:
+            try:
+                cursor.close()
+            except Error:
+                # Export was abandoned mid-stream; the pool discards the connection
+                pass
+            connection.close()
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = Response(generate(), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=users.{export_format}'
+    return response
+
+EXPORT_COLUMNS = ['id', 'name', 'email', 'grade', 'stream', 'study_time', 'hobbies', 'exams', 'created_at', 'subjects']
+
+def _csv_line(values):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+def _export_line(user, export_format):
+    if export_format == 'csv':
+        subjects = ', '.join(f"{name} ({level})" for name, level in user['subjects'].items())
+        return _csv_line([user[column] for column in EXPORT_COLUMNS[:-1]] + [subjects])
+    return json.dumps(user, default=str) + '\n'
+
+@route('/user/<int:user_id>/subjects')
+@uses_database
 def view_user_subjects(user_id):
     """Route to view specific user's subjects"""
-    try:
-        connection = get_db_connection()
-        if connection is None:
+    def load():
+        user = profile_cache.by_id(user_id)
+        if user is None:
             return jsonify({'error': 'Database connection failed'}), 500
         
-        cursor = connection.cursor(dictionary=True)
-        
-        # Get user info
-        cursor.execute("SELECT id, name, email, grade, stream FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
-        
         if not user:
-            cursor.close()
-            connection.close()
             return jsonify({'error': 'User not found'}), 404
         
-        # Get user subjects
-        cursor.execute("""
-            SELECT subject_name, confidence_level, created_at 
-            FROM user_subjects 
-            WHERE user_id = %s 
-            ORDER BY subject_name
-        """, (user_id,))
-        subjects = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
-        
-        return jsonify({
-            'user': user,
-            'subjects': subjects
-        })
+        return {
+            'user': {column: user[column] for column in ('id', 'name', 'email', 'grade', 'stream')},
+            'subjects': user['subjects']
+        }
+    
+    try:
+        return response_cache.respond(('user-subjects', user_id), [('subjects', user_id)], load, private=True)
         
     except Error as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'Database error occurred'}), 500
 
 # API endpoint for Google signup (placeholder)
-@app.route('/api/google-signup', methods=['POST'])
+@route('/api/google-signup', methods=['POST'])
 def google_signup():
     # This would handle Google OAuth in production
     return jsonify({
@@ -202,7 +406,8 @@ def google_signup():
     })
 
 # Add login route
-@app.route('/login', methods=['POST'])
+@route('/login', methods=['POST'])
+@uses_database
 def login():
     try:
         # Get form data
@@ -218,46 +423,30 @@ def login():
         if '@' not in email or '.' not in email:
             return jsonify({'error': 'Please enter a valid email address'}), 400
         
-        # Create database connection
-        connection = get_db_connection()
-        if connection is None:
+        # User row and subjects in one query, or straight from the profile cache
+        user = profile_cache.by_email(email)
+        if user is None:
             return jsonify({'error': 'Database connection failed'}), 500
         
-        cursor = connection.cursor(dictionary=True)
-        
-        # Check if user exists
-        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-        user = cursor.fetchone()
-        
         if not user:
-            cursor.close()
-            connection.close()
             return jsonify({'error': 'Invalid email address'}), 401
         
         # Check password (in production, use proper password hashing!)
         if user['password'] != password:  # Replace with proper password verification
-            cursor.close()
-            connection.close()
             return jsonify({'error': 'Invalid password'}), 401
         
-        # Get user subjects for session
-        cursor.execute("""
-            SELECT subject_name, confidence_level 
-            FROM user_subjects 
-            WHERE user_id = %s
-        """, (user['id'],))
-        subjects = cursor.fetchall()
-        
         # Convert subjects to dictionary for easy access
-        subjects_dict = {subject['subject_name']: subject['confidence_level'] for subject in subjects}
+        subjects_dict = {subject['subject_name']: subject['confidence_level'] for subject in user['subjects']}
         
-        # Set session
+        # Set session under a new id so an id fixed before login is useless
+        session.regenerate()
         session['user_id'] = user['id']
         session['user_email'] = user['email']
         session['user_name'] = user['name']
         session['user_grade'] = user['grade']
         session['user_stream'] = user['stream']
         session['user_subjects'] = subjects_dict
+        session['subjects_saved_at'] = time.time()
         
         # Set session permanence based on remember me
         if remember:
@@ -265,9 +454,6 @@ def login():
         else:
             session.permanent = False
         
-        cursor.close()
-        connection.close()
-        
         # Return success response
         return jsonify({
             'success': True,
@@ -291,18 +477,19 @@ def login():
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 # Add login page route
-@app.route('/login')
+@route('/login')
 def login_page():
     return render_template('login.html')
 
 # Add logout route
-@app.route('/logout')
+@route('/logout')
 def logout():
     session.clear()
+    session.regenerate()
     return redirect('/login')
 
 # Google login API endpoint
-@app.route('/api/google-login', methods=['POST'])
+@route('/api/google-login', methods=['POST'])
 def google_login():
     # This would handle Google OAuth in production
     return jsonify({
@@ -311,39 +498,37 @@ def google_login():
     })
 
 # Forgot password route (placeholder)
-@app.route('/forgot-password')
+@route('/forgot-password')
 def forgot_password():
     return "Forgot password page - to be implemented"
 
 # Add this function to get a random quote
-def get_random_quote():
-    """Get a random active quote from the database"""
+# A revision this late means the student is falling behind
+REVISION_OVERDUE = timedelta(days=1)
+
+def _quote_situation():
+    """Pick the quote weighting for the logged-in student from data already in memory"""
+    item = revision_scheduler.peek(session['user_id'])
+    if item is not None and item.due_at < datetime.now() - REVISION_OVERDUE:
+        return 'behind'
+    subjects = session.get('user_subjects') or {}
     try:
-        connection = get_db_connection()
-        if connection is None:
-            return None
-        
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT quote_text, author, category 
-            FROM motivation_quotes 
-            WHERE is_active = TRUE 
-            ORDER BY RAND() 
-            LIMIT 1
-        """)
-        quote = cursor.fetchone()
-        
-        cursor.close()
-        connection.close()
-        return quote
-        
-    except Error as e:
-        print(f"Error fetching quote: {e}")
-        return None
+        if subjects and sum(int(level) for level in subjects.values()) / len(subjects) <= 4:
+            return 'struggling'
+    except (TypeError, ValueError):
+        pass  # Levels are not validated on save; a non-number gives no signal
+    return 'steady'
+
+def get_random_quote():
+    """Get a random active quote, served from the in-process quote cache"""
+    if 'user_id' not in session:
+        return quote_cache.random_quote()
+    return quote_cache.random_quote(session['user_id'], _quote_situation())
 
 
 # Update your dashboard route
-@app.route('/dashboard')
+@route('/dashboard')
+@uses_database
 def dashboard():
     if 'user_id' not in session:
         return redirect('/login')
@@ -355,7 +540,8 @@ def dashboard():
     return render_template('dashboard.html', quote=quote)
 
 # API endpoint to get a new random quote
-@app.route('/api/random-quote')
+@route('/api/random-quote')
+@uses_database
 def random_quote():
     quote = get_random_quote()
     if quote:
@@ -370,35 +556,41 @@ def random_quote():
         }), 404
 
 # Get all quotes (for admin purposes)
-@app.route('/api/quotes')
+@route('/api/quotes')
+@uses_database
 def get_all_quotes():
-    try:
+    def load():
         connection = get_db_connection()
         if connection is None:
             return jsonify({'error': 'Database connection failed'}), 500
         
         cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT id, quote_text, author, category, created_at, is_active 
-            FROM motivation_quotes 
-            ORDER BY created_at DESC
-        """)
-        quotes = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        try:
+            cursor.execute("""
+                SELECT id, quote_text, author, category, created_at, is_active 
+                FROM motivation_quotes 
+                ORDER BY created_at DESC
+            """)
+            quotes = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
         
-        return jsonify({
+        return {
             'success': True,
             'quotes': quotes
-        })
+        }
+    
+    try:
+        return response_cache.respond('quotes', [('quotes',)], load)
         
     except Error as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'Database error occurred'}), 500
 
 # Add new quote
-@app.route('/api/quotes', methods=['POST'])
+@route('/api/quotes', methods=['POST'])
+@uses_database
 def add_quote():
     if 'user_id' not in session:
         return jsonify({'error': 'Please login first'}), 401
@@ -418,17 +610,26 @@ def add_quote():
         
         cursor = connection.cursor()
         insert_query = """
-        INSERT INTO motivation_quotes (quote_text, author, category)
-        VALUES (%s, %s, %s)
+        INSERT INTO motivation_quotes (quote_text, author, category, content_hash)
+        VALUES (%s, %s, %s, %s)
         """
         
-        cursor.execute(insert_query, (quote_text, author, category))
-        connection.commit()
-        
-        quote_id = cursor.lastrowid
+        try:
+            cursor.execute(insert_query, (quote_text, author, category, quote_hash(quote_text, author)))
+            connection.commit()
+        except IntegrityError as e:
+            connection.rollback()
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                return jsonify({'error': 'This quote already exists'}), 400
+            raise
+        finally:
+            quote_id = cursor.lastrowid
+            cursor.close()
+            connection.close()
         
-        cursor.close()
-        connection.close()
+        # Make the new quote eligible for /dashboard and /api/random-quote
+        quote_cache.add({'id': quote_id, 'quote_text': quote_text, 'author': author, 'category': category})
+        response_cache.bump(('quotes',))
         
         return jsonify({
             'success': True,
@@ -442,7 +643,8 @@ def add_quote():
 
 
 # API to update user subjects
-@app.route('/api/update-subjects', methods=['POST'])
+@route('/api/update-subjects', methods=['POST'])
+@uses_database
 def update_subjects():
     if 'user_id' not in session:
         return jsonify({'error': 'Please login first'}), 401
@@ -456,78 +658,645 @@ def update_subjects():
         
         subjects = json.loads(subjects_json)
         
-        connection = get_db_connection()
-        if connection is None:
-            return jsonify({'error': 'Database connection failed'}), 500
+        # The session picks up the new levels once the job has succeeded (see job_status)
+        if request.args.get('async'):
+            return _submit_job(user_id, 'update-subjects', json.dumps(subjects, sort_keys=True),
+                               _update_subjects_job, user_id, subjects)
         
-        cursor = connection.cursor()
-        
-        # Delete existing subjects
-        cursor.execute("DELETE FROM user_subjects WHERE user_id = %s", (user_id,))
+        payload, status = _update_subjects_for(user_id, subjects)
+        if status == 200:
+            # Update session
+            _remember_subjects(subjects, time.time())
+        return jsonify(payload), status
         
-        # Insert new subjects
-        insert_subject_query = """
-        INSERT INTO user_subjects (user_id, subject_name, confidence_level)
-        VALUES (%s, %s, %s)
-        """
-        
-        for subject_name, confidence_level in subjects.items():
-            cursor.execute(insert_subject_query, (user_id, subject_name, confidence_level))
+    except Error as e:
+        print(f"Database error: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
+def _update_subjects_for(user_id, subjects):
+    """Store a user's new confidence levels; returns (payload, status)"""
+    connection = get_db_connection()
+    if connection is None:
+        return {'error': 'Database connection failed'}, 500
+    
+    cursor = connection.cursor()
+    
+    try:
+        cursor.execute("""
+            SELECT subject_name, confidence_level 
+            FROM user_subjects 
+            WHERE user_id = %s
+        """, (user_id,))
+        current = dict(cursor.fetchall())
+        
+        # Only touch rows whose confidence actually changed
+        changed = [(name, level) for name, level in subjects.items() if current.get(name) != level]
+        removed = [name for name in current if name not in subjects]
+        
+        if changed:
+            upsert_subject_query = f"""
+            INSERT INTO user_subjects (user_id, subject_name, confidence_level)
+            VALUES {values_placeholders(len(changed), 3)}
+            {upsert_clause(['user_id', 'subject_name'], ['confidence_level'])}
+            """
+            params = []
+            for subject_name, confidence_level in changed:
+                params.extend((user_id, subject_name, confidence_level))
+            cursor.execute(upsert_subject_query, params)
+        
+        if removed:
+            placeholders = ', '.join(['%s'] * len(removed))
+            cursor.execute(f"""
+                DELETE FROM user_subjects 
+                WHERE user_id = %s AND subject_name IN ({placeholders})
+            """, [user_id] + removed)
+        
+        # Keep an existing timetable in step with the new confidence levels
+        plan = timetable_plans.get(user_id)
+        if plan is not None and (changed or removed):
+            try:
+                _save_timetable(connection, user_id, subjects, plan['settings'])
+            except TimetableError:
+                timetable_plans.discard(user_id)
         
         connection.commit()
+    except Error:
+        connection.rollback()
+        raise
+    finally:
         cursor.close()
         connection.close()
-        
-        # Update session
+    
+    if changed or removed:
+        _subjects_changed(user_id, subjects)
+    
+    return {
+        'success': True,
+        'message': 'Subjects updated successfully'
+    }, 200
+
+def _subjects_changed(user_id, subjects):
+    """Drop every cached copy of a user's confidence levels"""
+    response_cache.bump(('subjects', user_id))
+    profile_cache.invalidate(user_id)
+    revision_scheduler.invalidate(user_id)
+    # Analytics and study buddies read everything afresh on their first use
+    if _loaded('analytics'):
+        _cohort_snapshot().mark_dirty(user_id)
+    if _loaded('buddies'):
+        _buddy_index().update_subjects(user_id, subjects)
+
+# Confidence levels moved by logged study sessions and quizzes
+confidence_aggregator.on_change = _subjects_changed
+
+def _update_subjects_job(user_id, subjects):
+    payload, status = _update_subjects_for(user_id, subjects)
+    if status != 200:
+        raise JobFailed(payload['error'])
+    return dict(payload, subjects=subjects, saved_at=time.time())
+
+def _remember_subjects(subjects, saved_at):
+    """Put subjects in the session unless it already holds ones saved at or after saved_at"""
+    if saved_at > session.get('subjects_saved_at', 0):
         session['user_subjects'] = subjects
+        session['subjects_saved_at'] = saved_at
+
+# API to get user subjects
+@route('/api/user-subjects')
+@uses_database
+def get_user_subjects():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    user_id = session['user_id']
+    
+    def load():
+        user = profile_cache.by_id(user_id)
+        if user is None:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        subjects = [{'subject_name': subject['subject_name'], 'confidence_level': subject['confidence_level']}
+                    for subject in (user['subjects'] if user else [])]
         
+        return {
+            'success': True,
+            'subjects': subjects
+        }
+    
+    try:
+        # Polling clients revalidate with If-None-Match and usually get a 304
+        return response_cache.respond(('my-subjects', user_id), [('subjects', user_id)], load, private=True)
+        
+    except Error as e:
+        print(f"Database error: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+# API for the subject to revise next (spaced repetition)
+@route('/api/revision/next')
+@uses_database
+def next_revision():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        limit = min(max(request.args.get('limit', 1, type=int), 1), 20)
+        items = revision_scheduler.next_items(session['user_id'], limit)
+        if items is None:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        now = datetime.now()
         return jsonify({
             'success': True,
-            'message': 'Subjects updated successfully'
+            'next': items[0].to_dict(now) if items else None,
+            'items': [item.to_dict(now) for item in items]
         })
         
     except Error as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'Database error occurred'}), 500
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return jsonify({'error': 'An unexpected error occurred'}), 500
 
-# API to get user subjects
-@app.route('/api/user-subjects')
-def get_user_subjects():
+# API to mark a revision session as done and reschedule the subject
+@route('/api/revision/review', methods=['POST'])
+@uses_database
+def review_revision():
     if 'user_id' not in session:
         return jsonify({'error': 'Please login first'}), 401
     
     try:
-        user_id = session['user_id']
+        data = request.json or {}
+        subject_name = data.get('subject_name')
+        quality = data.get('quality')
         
-        connection = get_db_connection()
-        if connection is None:
+        if not subject_name:
+            return jsonify({'error': 'Subject name is required'}), 400
+        if not isinstance(quality, int) or not MIN_QUALITY <= quality <= MAX_QUALITY:
+            return jsonify({'error': f'Quality must be a whole number from {MIN_QUALITY} to {MAX_QUALITY}'}), 400
+        
+        item = revision_scheduler.review(session['user_id'], subject_name, quality)
+        if item is None:
             return jsonify({'error': 'Database connection failed'}), 500
+        if item is False:
+            return jsonify({'error': 'Subject not found'}), 404
         
+        return jsonify({
+            'success': True,
+            'item': item.to_dict()
+        })
+        
+    except Error as e:
+        print(f"Database error: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+# Most events one request may log
+MAX_EVENTS_PER_REQUEST = 100
+
+def _parse_study_event(user_id, subjects, data):
+    """Validate one logged event; returns (event tuple, None) or (None, error message)"""
+    if not isinstance(data, dict):
+        return None, 'Each event must be an object'
+    subject_name = data.get('subject_name')
+    event_type = data.get('type')
+    if subject_name not in subjects:
+        return None, f'Unknown subject: {subject_name}'
+    if event_type not in EVENT_TYPES:
+        return None, f"Event type must be one of: {', '.join(EVENT_TYPES)}"
+    if event_type == 'session':
+        duration = data.get('duration_minutes')
+        if isinstance(duration, bool) or not isinstance(duration, int) or not 1 <= duration <= MAX_SESSION_MINUTES:
+            return None, f'Duration must be a whole number of minutes from 1 to {MAX_SESSION_MINUTES}'
+        return (user_id, subject_name, event_type, duration, None), None
+    score = data.get('score')
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+        return None, 'Quiz score must be a number from 0 to 100'
+    return (user_id, subject_name, event_type, None, float(score)), None
+
+# API to log completed study sessions and quiz scores; they adjust confidence levels over time
+@route('/api/study-events', methods=['POST'])
+@uses_database
+def log_study_events():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    user_id = session['user_id']
+    data = request.json
+    items = data.get('events', [data]) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'No events provided'}), 400
+    if len(items) > MAX_EVENTS_PER_REQUEST:
+        return jsonify({'error': f'At most {MAX_EVENTS_PER_REQUEST} events per request'}), 400
+    
+    profile = profile_cache.by_id(user_id)
+    if profile is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    subjects = {subject['subject_name'] for subject in profile['subjects']} if profile else set()
+    
+    events = []
+    for item in items:
+        event, error = _parse_study_event(user_id, subjects, item)
+        if error:
+            return jsonify({'error': error}), 400
+        events.append(event)
+    
+    try:
+        study_events.add(events)
+    except BufferFull:
+        response = jsonify({'error': 'Too many events are waiting to be saved, please try again shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    
+    return jsonify({
+        'success': True,
+        'accepted': len(events)
+    }), 202
+
+# Timetable page
+@route('/timetable')
+def timetable():
+    if 'user_id' not in session:
+        return redirect('/login')
+    return render_template('timetable.html')
+
+# API to generate a weekly timetable from the user's subject confidence levels
+@route('/api/generate-timetable', methods=['POST'])
+@uses_database
+def generate_user_timetable():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        user_id = session['user_id']
+        data = request.json or {}
+        settings = {
+            'study_hours_per_day': int(data.get('study_hours_per_day', 4)),
+            'preferred_study_times': sorted(set(data.get('preferred_study_times') or ['Morning', 'Evening'])),
+            'days_per_subject': int(data.get('days_per_subject', 2))
+        }
+        
+        # The timetable page polls /api/jobs/<job_id> instead of holding a worker
+        if request.args.get('async'):
+            return _submit_job(user_id, 'generate-timetable', json.dumps(settings, sort_keys=True),
+                               _generate_timetable_job, user_id, settings)
+        
+        payload, status = _generate_timetable_for(user_id, settings)
+        return jsonify(payload), status
+        
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid timetable settings'}), 400
+    except Error as e:
+        print(f"Database error: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+def _generate_timetable_for(user_id, settings):
+    """Plan and store a user's timetable; returns (payload, status)"""
+    connection = get_db_connection()
+    if connection is None:
+        return {'error': 'Database connection failed'}, 500
+    
+    try:
         cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT subject_name, confidence_level 
+                FROM user_subjects 
+                WHERE user_id = %s
+            """, (user_id,))
+            subjects = {row['subject_name']: row['confidence_level'] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
         
+        if not subjects:
+            return {'error': 'Add your subjects before generating a timetable'}, 400
+        
+        try:
+            sessions, written = _save_timetable(connection, user_id, subjects, settings)
+        except TimetableError as e:
+            return {'error': str(e)}, 400
+        connection.commit()
+    finally:
+        connection.close()
+    
+    return {
+        'success': True,
+        'message': 'Timetable generated successfully',
+        'sessions': len(sessions),
+        'sessions_written': written
+    }, 200
+
+def _generate_timetable_job(user_id, settings):
+    payload, status = _generate_timetable_for(user_id, settings)
+    if status != 200:
+        raise JobFailed(payload['error'])
+    return payload
+
+def _save_timetable(connection, user_id, subjects, settings):
+    """Store a user's plan, writing only the slots whose session changed.
+
+    When the table still holds the cached plan, unchanged subjects keep
+    their slots (replan_timetable); otherwise the plan is generated from
+    scratch. Either way only differing rows are updated, inserted or
+    deleted. Returns (sessions, rows written) and leaves committing to the
+    caller.
+    """
+    key = plan_key(subjects, **settings)
+    cursor = connection.cursor(dictionary=True)
+    try:
         cursor.execute("""
-            SELECT subject_name, confidence_level 
-            FROM user_subjects 
-            WHERE user_id = %s 
-            ORDER BY subject_name
+            SELECT id, day_of_week, time_slot, subject_name, task_type, duration_minutes, priority 
+            FROM user_timetable 
+            WHERE user_id = %s
         """, (user_id,))
-        subjects = cursor.fetchall()
+        stored = cursor.fetchall()
+        
+        plan = timetable_plans.get(user_id)
+        # Another worker or regenerate_timetables.py may have replaced it
+        if plan is not None and sorted(tuple(row.values())[1:] for row in stored) != sorted(
+                tuple(entry.values()) for entry in plan['sessions']):
+            plan = None
         
+        if plan is not None and plan['key'] == key:
+            return plan['sessions'], 0
+        
+        if plan is not None and plan['settings'] == settings:
+            sessions, _ = replan_timetable(plan['sessions'], subjects, **settings)
+        else:
+            sessions = generate_timetable(subjects, **settings)
+        
+        updates, inserts, deletes = diff_timetable(stored, sessions)
+        if deletes:
+            placeholders = ', '.join(['%s'] * len(deletes))
+            cursor.execute(f"DELETE FROM user_timetable WHERE id IN ({placeholders})", deletes)
+        if updates:
+            cursor.executemany("""
+                UPDATE user_timetable 
+                SET subject_name = %s, task_type = %s, duration_minutes = %s, priority = %s 
+                WHERE id = %s
+            """, [(entry['subject_name'], entry['task_type'], entry['duration_minutes'], entry['priority'], row_id)
+                  for row_id, entry in updates])
+        if inserts:
+            insert_session_query = """
+            INSERT INTO user_timetable (user_id, day_of_week, time_slot, subject_name, task_type, duration_minutes, priority)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.executemany(insert_session_query, [
+                (user_id, entry['day_of_week'], entry['time_slot'], entry['subject_name'],
+                 entry['task_type'], entry['duration_minutes'], entry['priority'])
+                for entry in inserts
+            ])
+    finally:
         cursor.close()
-        connection.close()
+    
+    timetable_plans.put(user_id, {'key': key, 'settings': settings, 'sessions': sessions})
+    return sessions, len(updates) + len(inserts) + len(deletes)
+
+# API to get the user's timetable
+@route('/api/timetable')
+@uses_database
+def get_timetable():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        connection = get_db_connection()
+        if connection is None:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT day_of_week, time_slot, subject_name, task_type, duration_minutes, priority 
+                FROM user_timetable 
+                WHERE user_id = %s 
+                ORDER BY id
+            """, (session['user_id'],))
+            sessions = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
         
         return jsonify({
             'success': True,
-            'subjects': subjects
+            'timetable': sessions
         })
         
     except Error as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'Database error occurred'}), 500
 
+# API to clear the user's timetable
+@route('/api/clear-timetable', methods=['POST'])
+@uses_database
+def clear_timetable():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        connection = get_db_connection()
+        if connection is None:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute("DELETE FROM user_timetable WHERE user_id = %s", (session['user_id'],))
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+        timetable_plans.discard(session['user_id'])
+        
+        return jsonify({
+            'success': True,
+            'message': 'Timetable cleared successfully'
+        })
+        
+    except Error as e:
+        print(f"Database error: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+# API to find study buddies in the same grade and stream
+@route('/api/study-buddies')
+@uses_database
+def study_buddies():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    mode = request.args.get('mode', 'complementary')
+    if mode not in ('complementary', 'similar'):
+        return jsonify({'error': 'Mode must be complementary or similar'}), 400
+    limit = min(max(request.args.get('limit', 5, type=int), 1), 20)
+    
+    matches = _buddy_index().matches(session['user_id'], limit, complementary=mode == 'complementary')
+    if matches is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    return jsonify({
+        'success': True,
+        'mode': mode,
+        'buddies': matches
+    })
+
+def _submit_job(user_id, kind, key, func, *args):
+    """Queue a background job and answer 202 with where to poll for it.
+
+    Jobs live in the worker process that accepted them, so the ?async
+    forms need a single worker or sticky routing; every page uses the
+    synchronous forms.
+    """
+    try:
+        job = job_queue.submit(user_id, kind, key, func, *args)
+    except QueueFull:
+        return jsonify({'error': 'Too many jobs are waiting, please try again shortly'}), 503
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('job_status', job_id=job.id)
+    }), 202
+
+# API to poll a background job
+@route('/api/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    # Jobs without a user (analytics refreshes) are visible to everyone
+    if job is None or job.user_id not in (None, session.get('user_id')):
+        return jsonify({'error': 'Job not found'}), 404
+    # Applied once, and never over a newer update
+    if job.kind == 'update-subjects' and job.status == 'done':
+        _remember_subjects(job.result['subjects'], job.result['saved_at'])
+    return jsonify({
+        'success': True,
+        'job': job.to_dict()
+    })
+
+# Study event buffer and confidence aggregator usage
+@route('/api/event-stats')
+def event_stats():
+    return jsonify({
+        'success': True,
+        'buffer': study_events.stats(),
+        'aggregator': confidence_aggregator.stats()
+    })
+
+# Background job queue usage (queued, running, outcomes)
+@route('/api/job-stats')
+def job_stats():
+    return jsonify({
+        'success': True,
+        'jobs': job_queue.stats()
+    })
+
+def _refresh_analytics_job():
+    if not _cohort_snapshot().refresh():
+        raise JobFailed('Database connection failed')
+    return {'success': True, 'message': 'Analytics refreshed'}
+
+# Cohort analytics over subject confidence (grade/stream dashboards)
+@route('/api/analytics/refresh', methods=['POST'])
+@uses_database
+def analytics_refresh():
+    if request.args.get('async'):
+        return _submit_job(None, 'analytics-refresh', '', _refresh_analytics_job)
+    try:
+        return jsonify(_refresh_analytics_job())
+    except JobFailed as e:
+        return jsonify({'error': str(e)}), 500
+
+@route('/api/analytics/subjects')
+@uses_database
+def analytics_subjects():
+    stats = _cohort_snapshot().subject_stats(request.args.get('grade'), request.args.get('stream'))
+    if stats is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    return jsonify({
+        'success': True,
+        'subjects': stats
+    })
+
+@route('/api/analytics/weakest')
+@uses_database
+def analytics_weakest():
+    limit = min(max(request.args.get('limit', 3, type=int), 1), 10)
+    cohorts = _cohort_snapshot().weakest_subjects(limit)
+    if cohorts is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    return jsonify({
+        'success': True,
+        'cohorts': cohorts
+    })
+
+@route('/api/analytics/trend')
+@uses_database
+def analytics_trend():
+    trend = _cohort_snapshot().trend(request.args.get('grade'), request.args.get('stream'),
+                                     request.args.get('subject'))
+    if trend is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    return jsonify({
+        'success': True,
+        'trend': trend
+    })
+
+# Connection pool usage (for sizing pool_config)
+@route('/api/pool-stats')
+def pool_stats():
+    return jsonify({
+        'success': True,
+        'pool': get_pool_stats()
+    })
+
+# Session store usage (hits, evictions, entries)
+@route('/api/session-stats')
+def session_stats():
+    return jsonify({
+        'success': True,
+        'sessions': current_app.session_interface.stats()
+    })
+
+# Response cache usage (hits, 304s, evictions)
+@route('/api/response-cache-stats')
+def response_cache_stats():
+    return jsonify({
+        'success': True,
+        'response_cache': response_cache.stats()
+    })
+
+# Admission control counters (admitted, rate limited, overloaded)
+@route('/api/admission-stats')
+def admission_stats():
+    return jsonify({
+        'success': True,
+        'admission': current_app.extensions['admission'].stats()
+    })
+
+# Profile cache hit rate (logins and subject reads served without the database)
+@route('/api/profile-cache-stats')
+def profile_cache_stats():
+    return jsonify({
+        'success': True,
+        'profile_cache': profile_cache.stats()
+    })
+
+# Liveness: the process is up and serving requests
+@route('/health')
+def health():
+    return jsonify({'status': 'ok'})
+
+# Readiness: warmup (if enabled) has finished, so the instance can take traffic
+@route('/ready')
+def ready():
+    warmup = current_app.config['WARMUP']
+    if warmup and not app_warmup.ready():
+        return jsonify({'status': 'warming_up', 'warmup': app_warmup.status()}), 503
+    return jsonify({
+        'status': 'ready',
+        'configured_ms': current_app.config['CONFIGURED_MS'],
+        'warmup': app_warmup.status() if warmup else None
+    })
+
+# The app served by `flask --app app run`, wsgi.py and asgi.py
+app = create_app()
+
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
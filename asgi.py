@@ -0,0 +1,235 @@
+"""ASGI entry point for serving the app under an async server.
+
+    pip install uvicorn
+    uvicorn asgi:application --port 5000
+
+The event loop owns the client connections; the Flask views themselves
+(including the JSON API: /login, /signup, /api/random-quote, /api/quotes
+and /api/user-subjects) run unchanged on a bounded thread pool sized to
+the database connection pool. Idle and queued connections therefore cost
+a coroutine instead of a thread, and requests beyond what the pool can
+take wait in the loop or are turned away with a 503.
+"""
+import asyncio
+import io
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import database
+from app import app
+from metrics import Gauge, registry
+
+# Responses are sent in chunks of at least this many bytes (or when the view finishes)
+FLUSH_BYTES = 64 * 1024
+# Unsent chunks a streaming view may run ahead of a slow client
+QUEUED_CHUNKS = 8
+
+
+class ClientDisconnected(Exception):
+    """Raised in a worker thread when the client went away mid-response"""
+
+
+def _environ(scope, body):
+    """Build a WSGI environ for an ASGI HTTP request"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f"HTTP_{name}"
+        if key in environ:
+            value = environ[key] + ('; ' if key == 'HTTP_COOKIE' else ',') + value
+        environ[key] = value
+    return environ
+
+
+class ASGIAdapter:
+    """Serve a WSGI app over ASGI with a bounded worker pool.
+
+    Each request runs start to finish on one worker thread (Flask's
+    request context is thread-bound); the response is handed back to the
+    event loop through a small queue, so streamed responses keep
+    backpressure. At most max_workers requests run at once and
+    max_waiting more may queue before new ones get a 503.
+    """
+
+    def __init__(self, wsgi_app, max_workers=None, max_waiting=1000):
+        if max_workers is None:
+            max_workers = database.pool_config['pool_size'] + database.pool_config['max_overflow']
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asgi')
+        self._lock = threading.Lock()
+        self._stats = {'waiting': 0, 'running': 0, 'completed': 0, 'rejected': 0, 'disconnected': 0}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self._executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def _reject(self, send):
+        body = json.dumps({'error': 'Server is busy, please try again shortly'}).encode()
+        await send({'type': 'http.response.start', 'status': 503, 'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'retry-after', b'1'),
+        ]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _http(self, scope, receive, send):
+        with self._lock:
+            if self._stats['waiting'] >= self.max_waiting:
+                self._stats['rejected'] += 1
+                admitted = False
+            else:
+                self._stats['waiting'] += 1
+                admitted = True
+        if not admitted:
+            await self._reject(send)
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            with self._lock:
+                self._stats['waiting'] -= 1
+            return
+
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(QUEUED_CHUNKS)
+        disconnected = threading.Event()
+        worker = loop.run_in_executor(self._executor, self._run, _environ(scope, body), loop, chunks,
+                                      disconnected)
+        try:
+            while True:
+                start, data, more = await chunks.get()
+                if start is not None:
+                    status, headers = start
+                    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+                await send({'type': 'http.response.body', 'body': data, 'more_body': more})
+                if not more:
+                    break
+        except BaseException:
+            # The worker notices within a second and stops producing
+            disconnected.set()
+            raise
+        await worker
+
+    def _run(self, environ, loop, chunks, disconnected):
+        """Run the WSGI app on a worker thread, passing the response to the loop"""
+        with self._lock:
+            self._stats['waiting'] -= 1
+            self._stats['running'] += 1
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['start'] = (int(status.split(' ', 1)[0]),
+                                 [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                  for name, value in headers])
+
+        def put(data, more):
+            item = (response.pop('start', None), data, more)
+            future = asyncio.run_coroutine_threadsafe(chunks.put(item), loop)
+            while True:
+                try:
+                    return future.result(timeout=1)
+                except FutureTimeout:
+                    if disconnected.is_set():
+                        future.cancel()
+                        raise ClientDisconnected()
+
+        outcome = 'completed'
+        iterable = None
+        started = False
+        try:
+            iterable = self.wsgi_app(environ, start_response)
+            buffered, size = [], 0
+            for data in iterable:
+                if data:
+                    buffered.append(data)
+                    size += len(data)
+                if size >= FLUSH_BYTES:
+                    put(b''.join(buffered), True)
+                    started = True
+                    buffered, size = [], 0
+            put(b''.join(buffered), False)
+        except ClientDisconnected:
+            outcome = 'disconnected'
+        except Exception as e:
+            print(f"Unexpected error serving {environ['PATH_INFO']}: {e}")
+            if not started:
+                response['start'] = (500, [(b'content-type', b'text/plain')])
+            put(b'' if started else b'Internal Server Error', False)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            with self._lock:
+                self._stats['running'] -= 1
+                self._stats[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['max_workers'] = self.max_workers
+        snapshot['max_waiting'] = self.max_waiting
+        return snapshot
+
+
+application = ASGIAdapter(app)
+
+
+def _request_states():
+    stats = application.stats()
+    return {(state,): stats[state] for state in ('waiting', 'running')}
+
+
+registry.register(Gauge('asgi_requests', 'Requests in the ASGI worker pool by state', _request_states, ('state',)))
@@ -0,0 +1,69 @@
+import json
+import os
+
+from flask import abort, request, send_from_directory, url_for
+
+DIST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# Fingerprinted files never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Precompressed variants written by build_assets.py, best first (.br only
+# when brotli was installed for the build)
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+_manifest = None
+
+
+def load_manifest():
+    """Read static/dist/manifest.json; an empty manifest means no build was run"""
+    global _manifest
+    try:
+        with open(MANIFEST_PATH) as f:
+            _manifest = json.load(f)
+    except (OSError, ValueError):
+        _manifest = {}
+    return _manifest
+
+
+def asset_url(path):
+    """URL for a static asset, fingerprinted when build_assets.py has been run"""
+    manifest = _manifest if _manifest is not None else load_manifest()
+    built = manifest.get(path)
+    if built is None:
+        return url_for('static', filename=path)
+    return url_for('serve_asset', filename=built)
+
+
+def _accepts(encoding):
+    """Whether Accept-Encoding allows encoding (q=0 refuses it)"""
+    return request.accept_encodings[encoding] > 0
+
+
+def serve_asset(filename):
+    """Serve a built asset, preferring a precompressed variant"""
+    if not os.path.isfile(os.path.join(DIST_DIR, filename)):
+        abort(404)
+
+    served, content_encoding = filename, None
+    for encoding, suffix in ENCODINGS:
+        if _accepts(encoding) and os.path.isfile(os.path.join(DIST_DIR, filename + suffix)):
+            served, content_encoding = filename + suffix, encoding
+            break
+
+    response = send_from_directory(DIST_DIR, served, max_age=31536000)
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+        # send_from_directory guesses the type from the .br/.gz suffix
+        response.mimetype = 'text/css' if filename.endswith('.css') else 'application/javascript'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app):
+    """Expose asset_url() to templates and serve built assets from /assets/"""
+    load_manifest()
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.add_url_rule('/assets/<path:filename>', 'serve_asset', serve_asset)
@@ -0,0 +1,180 @@
+"""Compare the threaded WSGI server with the ASGI mode under rising concurrency.
+
+Each level runs `concurrency` keep-alive clients against the JSON API
+(/login, /api/random-quote, /api/user-subjects, /api/quotes, optionally
+/signup) for `duration` seconds. The server runs in a child process so
+its threads can be counted and do not share a GIL with the clients.
+Needs uvicorn (pip install uvicorn).
+
+Usage:
+    python benchmarks/seed.py --backend sqlite
+    python benchmarks/bench_asgi.py --backend sqlite --concurrency 16 64 256
+"""
+import argparse
+import http.client
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import ROOT, Client, KeepAliveHandler, percentile, use_database
+
+sys.path.insert(0, ROOT)
+
+MIX = ['login', 'random_quote', 'user_subjects', 'quotes']
+ACTIONS = {
+    'login': Client.login,
+    'signup': Client.signup,
+    'random_quote': lambda client: client.request('GET', '/api/random-quote'),
+    'user_subjects': lambda client: client.request('GET', '/api/user-subjects'),
+    'quotes': lambda client: client.request('GET', '/api/quotes'),
+}
+
+
+def serve(args):
+    """Child process: run the app under the requested server on args.port"""
+    # Every client connects from 127.0.0.1, so per-client rate limits would shed most of the load
+    use_database(args, ADMISSION_ENABLED=int(args.admission))
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    from app import app
+
+    if args.serve == 'threaded':
+        from werkzeug.serving import make_server
+        make_server('127.0.0.1', args.port, app, threaded=True, request_handler=KeepAliveHandler).serve_forever()
+    else:
+        import uvicorn
+        uvicorn.run('asgi:application', host='127.0.0.1', port=args.port, log_level='warning',
+                    access_log=False, backlog=4096)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Server exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/quotes')
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit("Server did not start")
+
+
+def thread_count(pid):
+    """Threads in a process (Linux only; None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def run_level(port, pid, concurrency, duration, user_count, endpoints, seed):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = Client(port, user_count, rng)
+        client.login()
+        local, local_errors = [], 0
+        start_barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = ACTIONS[rng.choice(endpoints)](client)
+            local.append(time.perf_counter() - started)
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    peak_threads = 0
+    while any(thread.is_alive() for thread in threads):
+        peak_threads = max(peak_threads, thread_count(pid) or 0)
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'server_threads': peak_threads or None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql')
+    parser.add_argument('--database', default='study_planner_bench', help='MySQL database seeded by seed.py')
+    parser.add_argument('--sqlite-path', default='study_planner_bench.sqlite3', help='SQLite file seeded by seed.py')
+    parser.add_argument('--users', type=int, default=1000, help='number of users seed.py created')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per concurrency level')
+    parser.add_argument('--servers', nargs='+', choices=['threaded', 'asgi'], default=['threaded', 'asgi'])
+    parser.add_argument('--endpoints', nargs='+', choices=list(ACTIONS), default=MIX)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--admission', action='store_true', help='keep admission control on')
+    parser.add_argument('--serve', choices=['threaded', 'asgi'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        os.chdir(ROOT)
+        serve(args)
+        return
+
+    print(f"{'server':>9} {'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'threads':>8}")
+    for server in args.servers:
+        port = free_port()
+        command = [sys.executable, os.path.abspath(__file__), '--serve', server, '--port', str(port),
+                   '--backend', args.backend, '--database', args.database,
+                   '--sqlite-path', os.path.abspath(args.sqlite_path)]
+        if args.admission:
+            command.append('--admission')
+        process = subprocess.Popen(command, cwd=ROOT)
+        try:
+            wait_until_up(port, process)
+            for concurrency in args.concurrency:
+                result = run_level(port, process.pid, concurrency, args.duration, args.users,
+                                   args.endpoints, args.seed)
+                print(f"{server:>9} {concurrency:>8} {result['requests']:>9} {result['errors']:>7} "
+                      f"{result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                      f"{result['server_threads'] or '-':>8}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
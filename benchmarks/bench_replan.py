@@ -0,0 +1,132 @@
+"""Benchmark diff-based timetable writes against a full rewrite.
+
+Each run changes one subject's confidence level and then stores the new
+plan both ways: 'full' regenerates the plan and replaces every row,
+'diff' re-plans with replan_timetable() and writes only the slots whose
+session changed, as app._save_timetable does. Planning time and rows
+written to an in-memory SQLite copy of the schema are reported; planning
+costs about the same either way, the savings are in the writes.
+
+Usage: python benchmarks/bench_replan.py [--subjects 5 15 30] [--runs 500]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrate
+import sqlite_backend
+from bench_timetable import make_subjects
+from scheduler import diff_timetable, generate_timetable, replan_timetable
+
+INSERT_SESSION = """
+INSERT INTO user_timetable (user_id, day_of_week, time_slot, subject_name, task_type, duration_minutes, priority)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def scratch_database():
+    connection = sqlite_backend.connect(':memory:')
+    cursor = connection.cursor()
+    for _, _, path in migrate.list_migrations('sqlite'):
+        with open(path) as f:
+            for statement in migrate.split_statements(f.read()):
+                cursor.execute(statement)
+    cursor.execute("INSERT INTO users (id, name, email, password, grade, study_time) VALUES (1, 'b', 'b', 'b', '9', 4)")
+    connection.commit()
+    return connection, cursor
+
+
+def write(connection, cursor, sessions, diff):
+    """Store a plan, replacing every row or (diff) the way app._save_timetable does; returns rows written"""
+    if not diff:
+        cursor.execute("DELETE FROM user_timetable WHERE user_id = 1")
+        cursor.executemany(INSERT_SESSION, [(1,) + tuple(entry.values()) for entry in sessions])
+        connection.commit()
+        return len(sessions)
+
+    cursor.execute("""
+        SELECT id, day_of_week, time_slot, subject_name, task_type, duration_minutes, priority
+        FROM user_timetable WHERE user_id = 1
+    """)
+    names = [column[0] for column in cursor.description]
+    updates, inserts, deletes = diff_timetable([dict(zip(names, row)) for row in cursor.fetchall()], sessions)
+    if deletes:
+        cursor.execute(f"DELETE FROM user_timetable WHERE id IN ({', '.join(['%s'] * len(deletes))})", deletes)
+    cursor.executemany("""
+        UPDATE user_timetable SET subject_name = %s, task_type = %s, duration_minutes = %s, priority = %s
+        WHERE id = %s
+    """, [(entry['subject_name'], entry['task_type'], entry['duration_minutes'], entry['priority'], row_id)
+          for row_id, entry in updates])
+    cursor.executemany(INSERT_SESSION, [(1,) + tuple(entry.values()) for entry in inserts])
+    connection.commit()
+    return len(updates) + len(inserts) + len(deletes)
+
+
+def bench(count, runs, settings, seed=42):
+    rng = random.Random(seed)
+    subjects = make_subjects(count, seed)
+    connection, cursor = scratch_database()
+    plan = generate_timetable(subjects, **settings)
+    write(connection, cursor, plan, False)
+
+    results = {'full': ([], [], []), 'diff': ([], [], [])}
+    for _ in range(runs):
+        edited = dict(subjects)
+        edited[rng.choice(list(edited))] = rng.randint(1, 10)
+
+        for mode in ('full', 'diff'):
+            # Both start from the previous plan
+            write(connection, cursor, plan, False)
+            started = time.perf_counter()
+            if mode == 'full':
+                sessions = generate_timetable(edited, **settings)
+            else:
+                sessions, _ = replan_timetable(plan, edited, **settings)
+            planned = time.perf_counter()
+            rows = write(connection, cursor, sessions, mode == 'diff')
+            finished = time.perf_counter()
+
+            plan_ms, total_ms, written = results[mode]
+            plan_ms.append((planned - started) * 1000)
+            total_ms.append((finished - started) * 1000)
+            written.append(rows)
+
+        # Both modes end at a valid plan; continue from the diff one
+        plan = sessions
+        subjects = edited
+    connection.close()
+
+    return {mode: {'plan_ms': statistics.fmean(plan_ms), 'total_ms': statistics.fmean(total_ms),
+                   'rows': statistics.fmean(written)}
+            for mode, (plan_ms, total_ms, written) in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subjects', type=int, nargs='+', default=[5, 15, 30])
+    parser.add_argument('--runs', type=int, default=500)
+    args = parser.parse_args()
+
+    settings = {
+        'study_hours_per_day': 12,
+        'preferred_study_times': ['Morning', 'Afternoon', 'Evening'],
+        'days_per_subject': 3,
+    }
+    print(f"{'subjects':>8} {'mode':>12} {'plan ms':>9} {'plan+write ms':>14} {'rows written':>13}")
+    for count in args.subjects:
+        result = bench(count, args.runs, settings)
+        for mode, stats in result.items():
+            print(f"{count:>8} {mode:>12} {stats['plan_ms']:>9.3f} {stats['total_ms']:>14.3f} {stats['rows']:>13.1f}")
+        full, diff = result['full'], result['diff']
+        print(f"{'':>8} {'full / diff':>12} {full['plan_ms'] / diff['plan_ms']:>8.1f}x "
+              f"{full['total_ms'] / diff['total_ms']:>13.1f}x "
+              f"{full['rows'] / max(diff['rows'], 0.1):>12.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Compare per-request session overhead: signed cookie vs server-side stores.
+
+Usage: python benchmarks/bench_sessions.py [--requests 5000] [--subjects 15]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, session
+
+from session_store import create_session_interface
+
+
+def make_app(session_interface=None):
+    app = Flask(__name__)
+    app.secret_key = 'bench'
+    if session_interface is not None:
+        app.session_interface = session_interface
+
+    @app.route('/login/<int:subjects>')
+    def login(subjects):
+        # Same keys login() stores
+        session['user_id'] = 1
+        session['user_email'] = 'student@example.com'
+        session['user_name'] = 'Student'
+        session['user_grade'] = '12'
+        session['user_stream'] = 'Science'
+        session['user_subjects'] = {f"Subject {i}": 5 for i in range(subjects)}
+        return 'ok'
+
+    @app.route('/page')
+    def page():
+        return 'hello ' + str(session.get('user_id'))
+
+    return app
+
+
+def bench(app, requests, subjects):
+    client = app.test_client()
+    client.get(f'/login/{subjects}')
+    cookie = client.get_cookie('session')
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get('/page')
+    elapsed = time.perf_counter() - started
+    return elapsed / requests * 1e6, len(cookie.value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--subjects', type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [
+            ('cookie', None),
+            ('memory', create_session_interface('memory')),
+            ('sqlite', create_session_interface('sqlite', path=os.path.join(tmp, 'sessions.sqlite3'))),
+        ]
+        print(f"{'backend':>8} {'us/request':>11} {'cookie bytes':>13}")
+        for name, interface in backends:
+            per_request, cookie_bytes = bench(make_app(interface), args.requests, args.subjects)
+            print(f"{name:>8} {per_request:>11.1f} {cookie_bytes:>13}")
+
+
+if __name__ == '__main__':
+    main()
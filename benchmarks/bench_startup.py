@@ -0,0 +1,87 @@
+"""Measure startup time and first-request latency, with and without warmup.
+
+Each run starts a fresh interpreter that imports app.py (which
+configures the app), optionally waits for /ready, then times the first
+and second request to a few endpoints through the test client. Medians
+over all runs are reported.
+
+Usage:
+    python benchmarks/seed.py --backend sqlite
+    python benchmarks/bench_startup.py --backend sqlite --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ['/', '/api/quotes', '/api/random-quote', '/api/analytics/subjects']
+
+
+def child(args):
+    """Runs in a fresh interpreter; prints one JSON line of timings"""
+    # Settings reach create_app() through the environment, which wins over .env
+    os.environ.update({'DB_BACKEND': args.backend, 'DB_NAME': args.database, 'SQLITE_PATH': args.sqlite_path,
+                       'WARMUP': '1' if args.warmup else '0'})
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    imported = time.perf_counter()
+
+    client = app_module.app.test_client()
+    if args.warmup:
+        while client.get('/ready').status_code != 200:
+            time.sleep(0.01)
+    ready = time.perf_counter()
+
+    timings = {
+        'import_ms': (imported - started) * 1000,
+        'create_app_ms': app_module.app.config['CONFIGURED_MS'],
+        'ready_ms': (ready - started) * 1000,
+    }
+    for path in PATHS:
+        for attempt in ('first', 'second'):
+            request_started = time.perf_counter()
+            client.get(path)
+            timings[f"{path} {attempt}_ms"] = (time.perf_counter() - request_started) * 1000
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql')
+    parser.add_argument('--database', default='study_planner_bench', help='MySQL database seeded by seed.py')
+    parser.add_argument('--sqlite-path', default='study_planner_bench.sqlite3', help='SQLite file seeded by seed.py')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--warmup', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    results = {}
+    for warmup in (False, True):
+        command = [sys.executable, os.path.abspath(__file__), '--child', '--backend', args.backend,
+                   '--database', args.database, '--sqlite-path', os.path.abspath(args.sqlite_path)]
+        if warmup:
+            command.append('--warmup')
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        results[warmup] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+    print(f"{'median ms':<36} {'no warmup':>10} {'warmup':>10}")
+    for key in results[False]:
+        print(f"{key.removesuffix('_ms'):<36} {results[False][key]:>10.1f} {results[True][key]:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
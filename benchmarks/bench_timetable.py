@@ -0,0 +1,58 @@
+"""Benchmark full-week timetable generation.
+
+Usage: python benchmarks/bench_timetable.py [--subjects 15] [--runs 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import generate_timetable
+
+
+def make_subjects(count, seed=42):
+    rng = random.Random(seed)
+    return {f"Subject {i + 1}": rng.randint(1, 10) for i in range(count)}
+
+
+def bench(subjects, runs, **settings):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        generate_timetable(subjects, **settings)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'mean_ms': statistics.fmean(timings),
+        'p50_ms': timings[len(timings) // 2],
+        'p99_ms': timings[int(len(timings) * 0.99) - 1],
+        'max_ms': timings[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subjects', type=int, nargs='+', default=[5, 15, 30])
+    parser.add_argument('--runs', type=int, default=2000)
+    args = parser.parse_args()
+
+    settings = {
+        'study_hours_per_day': 12,
+        'preferred_study_times': ['Morning', 'Afternoon', 'Evening'],
+        'days_per_subject': 3,
+    }
+    print(f"{'subjects':>8} {'sessions':>8} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for count in args.subjects:
+        subjects = make_subjects(count)
+        sessions = len(generate_timetable(subjects, **settings))
+        result = bench(subjects, args.runs, **settings)
+        print(f"{count:>8} {sessions:>8} {result['mean_ms']:>9.3f} {result['p50_ms']:>9.3f} "
+              f"{result['p99_ms']:>9.3f} {result['max_ms']:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
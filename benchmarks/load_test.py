@@ -0,0 +1,246 @@
+"""Drive app.py with concurrent clients and report throughput and latency per endpoint.
+
+Usage:
+    python benchmarks/seed.py --users 1000 --quotes 500
+    python benchmarks/load_test.py --concurrency 16 --duration 10 --save baseline.json
+    python benchmarks/load_test.py --compare benchmarks/results/baseline.json
+
+    python benchmarks/seed.py --backend sqlite
+    python benchmarks/load_test.py --backend sqlite
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from seed import BENCH_PASSWORD, bench_email
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+def use_database(args, **settings):
+    """Hand the CLI's database flags (and any other settings) to app.py.
+
+    They go into the environment, which create_app() reads when app.py is
+    imported and which takes precedence over .env. Call before importing app.
+    """
+    os.environ.update({
+        'DB_BACKEND': args.backend,
+        'DB_NAME': args.database,
+        'SQLITE_PATH': os.path.abspath(args.sqlite_path),
+    })
+    os.environ.update({name: str(value) for name, value in settings.items()})
+
+
+class KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class Client:
+    """One simulated student with a keep-alive connection and a session cookie"""
+
+    def __init__(self, port, user_count, rng):
+        self.port = port
+        self.user_count = user_count
+        self.rng = rng
+        self.cookie = None
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            return 599
+        set_cookie = response.getheader('Set-Cookie')
+        if set_cookie and set_cookie.startswith('session='):
+            self.cookie = set_cookie.split(';', 1)[0]
+        return response.status
+
+    def login(self):
+        user_id = self.rng.randint(1, self.user_count)
+        form = urlencode({'email': bench_email(user_id), 'password': BENCH_PASSWORD})
+        return self.request('POST', '/login', form, FORM_HEADERS)
+
+    def signup(self):
+        form = urlencode({
+            'name': 'Load Test', 'email': f"load-{uuid.uuid4().hex}@example.com", 'password': 'x',
+            'grade': '10', 'studyTime': '4', 'hobbies': '',
+            'subjects': json.dumps({'Mathematics': self.rng.randint(1, 10), 'Science': self.rng.randint(1, 10)}),
+        })
+        return self.request('POST', '/signup', form, FORM_HEADERS)
+
+
+SCENARIOS = {
+    'signup': Client.signup,
+    'login': Client.login,
+    'dashboard': lambda client: client.request('GET', '/dashboard'),
+    'random_quote': lambda client: client.request('GET', '/api/random-quote'),
+    'user_subjects': lambda client: client.request('GET', '/api/user-subjects'),
+    'users': lambda client: client.request('GET', '/users'),
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_scenario(name, port, concurrency, duration, user_count, seed):
+    """Run one endpoint with `concurrency` clients for `duration` seconds"""
+    action = SCENARIOS[name]
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index):
+        client = Client(port, user_count, random.Random(seed + index))
+        client.login()
+        local = []
+        local_errors = 0
+        start_barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = action(client)
+            local.append(time.perf_counter() - started)
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-endpoint deltas against a saved run; return True if p95 regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['endpoints']
+    regressed = False
+    print(f"\nCompared with {baseline_path}:")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous['p95_ms']:
+            continue
+        p95_change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+        rps_change = ((current['throughput_rps'] - previous['throughput_rps']) / previous['throughput_rps'] * 100
+                      if previous['throughput_rps'] else 0.0)
+        flag = ''
+        if p95_change > threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"{name:>14}  p95 {p95_change:+6.1f}%  throughput {rps_change:+6.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql')
+    parser.add_argument('--database', default='study_planner_bench', help='MySQL database seeded by seed.py')
+    parser.add_argument('--sqlite-path', default='study_planner_bench.sqlite3', help='SQLite file seeded by seed.py')
+    parser.add_argument('--users', type=int, default=1000, help='number of users seed.py created')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per endpoint')
+    parser.add_argument('--endpoints', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', metavar='NAME', help='file name under benchmarks/results/ for the JSON results')
+    parser.add_argument('--compare', metavar='PATH', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='p95 regression threshold in percent')
+    parser.add_argument('--admission', action='store_true',
+                        help='keep admission control on (every client shares one address, so expect 429s)')
+    args = parser.parse_args()
+
+    use_database(args, DB_POOL_SIZE=args.concurrency, ADMISSION_ENABLED=int(args.admission))
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    from app import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    results = {}
+    print(f"{'endpoint':>14} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name in args.endpoints:
+        result = run_scenario(name, port, args.concurrency, args.duration, args.users, args.seed)
+        results[name] = result
+        print(f"{name:>14} {result['requests']:>9} {result['errors']:>7} {result['throughput_rps']:>9.1f} "
+              f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+    server.shutdown()
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('save', 'compare')},
+        'endpoints': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = args.save or f"load_test_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    path = os.path.join(RESULTS_DIR, name)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {path}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
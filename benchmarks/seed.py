@@ -0,0 +1,140 @@
+"""Seed a scratch database with synthetic users, subjects and quotes.
+
+Usage: python benchmarks/seed.py [--users 1000] [--quotes 500] [--database study_planner_bench]
+       python benchmarks/seed.py --backend sqlite --sqlite-path bench.sqlite3
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import migrate
+from database import values_placeholders
+from import_quotes import SAMPLE_QUOTES
+
+BENCH_PASSWORD = 'bench-password'
+
+# Same subject lists signup.html offers
+SUBJECT_LISTS = {
+    '9': ['Mathematics', 'Science', 'Social Studies', 'English', 'Hindi', 'Artificial Intelligence'],
+    '10': ['Mathematics', 'Science', 'Social Studies', 'English', 'Hindi', 'Artificial Intelligence'],
+    'Science': ['Physics', 'Chemistry', 'Mathematics', 'Biology', 'English', 'Computer Science'],
+    'Commerce': ['Accountancy', 'Business Studies', 'Economics', 'Mathematics', 'English', 'Computer Science'],
+    'Arts': ['History', 'Political Science', 'Geography', 'Economics', 'Psychology', 'English'],
+}
+EXAMS = ['JEE', 'NEET', 'MHCET', 'BITSAT', 'Other']
+
+DROP_TABLES = [
+    "DROP TABLE IF EXISTS data_versions",
+    "DROP TABLE IF EXISTS event_watermarks",
+    "DROP TABLE IF EXISTS study_events",
+    "DROP TABLE IF EXISTS revision_items",
+    "DROP TABLE IF EXISTS user_timetable",
+    "DROP TABLE IF EXISTS user_subjects",
+    "DROP TABLE IF EXISTS users",
+    "DROP TABLE IF EXISTS motivation_quotes",
+    "DROP TABLE IF EXISTS schema_migrations",
+]
+
+BATCH_SIZE = 1000
+
+
+def bench_email(user_id):
+    return f"bench{user_id}@example.com"
+
+
+def generate_users(count, rng):
+    """Yield (user_row, subjects) pairs shaped like signup() input"""
+    for user_id in range(1, count + 1):
+        grade = rng.choice(['9', '10', '11', '12'])
+        stream = rng.choice(['Science', 'Commerce', 'Arts']) if grade in ('11', '12') else None
+        exams = rng.sample(EXAMS, rng.randint(0, 2)) if stream else []
+        subjects = {name: rng.randint(1, 10) for name in SUBJECT_LISTS[stream or grade]}
+        row = (user_id, f"Bench Student {user_id}", bench_email(user_id), BENCH_PASSWORD, grade, stream,
+               rng.choice([2, 3, 4, 5.5, 6, 8]), 'Reading', json.dumps(exams) if exams else None)
+        yield row, subjects
+
+
+def generate_quotes(count, rng):
+    """Yield quote rows based on the sample quotes in import_quotes.py"""
+    for i in range(count):
+        quote = SAMPLE_QUOTES[i % len(SAMPLE_QUOTES)]
+        text = quote['quote_text'] if i < len(SAMPLE_QUOTES) else f"{quote['quote_text']} (#{i})"
+        yield (text, quote['author'], quote['category'])
+
+
+def _insert_batches(cursor, table, columns, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            _insert(cursor, table, columns, batch)
+            batch = []
+    if batch:
+        _insert(cursor, table, columns, batch)
+
+
+def _insert(cursor, table, columns, batch):
+    params = [value for row in batch for value in row]
+    cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values_placeholders(len(batch), len(columns))}",
+                   params)
+
+
+def seed(users=1000, quotes=500, seed_value=42):
+    """Recreate the benchmark tables and fill them with synthetic data"""
+    rng = random.Random(seed_value)
+    connection = database.get_db_connection()
+    if connection is None:
+        raise SystemExit("Failed to connect to database")
+
+    started = time.perf_counter()
+    cursor = connection.cursor()
+    for statement in DROP_TABLES:
+        cursor.execute(statement)
+    connection.commit()
+    if not migrate.upgrade():
+        raise SystemExit("Failed to create the schema")
+
+    subject_rows = []
+
+    def user_rows():
+        for row, subjects in generate_users(users, rng):
+            subject_rows.extend((row[0], name, level) for name, level in subjects.items())
+            yield row
+
+    _insert_batches(cursor, 'users', ['id', 'name', 'email', 'password', 'grade', 'stream', 'study_time',
+                                      'hobbies', 'exams'], user_rows())
+    _insert_batches(cursor, 'user_subjects', ['user_id', 'subject_name', 'confidence_level'], subject_rows)
+    _insert_batches(cursor, 'motivation_quotes', ['quote_text', 'author', 'category'], generate_quotes(quotes, rng))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+    print(f"Seeded {users} users, {len(subject_rows)} subjects and {quotes} quotes "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--quotes', type=int, default=500)
+    parser.add_argument('--database', default='study_planner_bench',
+                        help='scratch MySQL database to (re)create tables in')
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql')
+    parser.add_argument('--sqlite-path', default='study_planner_bench.sqlite3')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    database.db_backend = args.backend
+    database.db_config['database'] = args.database
+    database.sqlite_config['path'] = args.sqlite_path
+    seed(args.users, args.quotes, args.seed)
+
+
+if __name__ == '__main__':
+    main()
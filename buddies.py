@@ -0,0 +1,216 @@
+import threading
+
+import numpy as np
+from mysql.connector import Error
+
+from database import get_db_connection
+
+# Confidence levels are centred on the middle of the 1-10 scale, so a
+# complementary partner (strong where you are weak) is the vector pointing
+# the opposite way and both kinds of match are cosine nearest neighbours.
+CONFIDENCE_CENTRE = 5.5
+STRONG_CONFIDENCE = 7
+WEAK_CONFIDENCE = 4
+
+# Random-projection LSH: each table hashes a vector to the signs of its
+# dot products with HASH_BITS random hyperplanes.
+HASH_TABLES = 8
+HASH_BITS = 8
+
+
+class _Partition:
+    """LSH index over the confidence vectors of one grade/stream cohort"""
+
+    def __init__(self, rng):
+        self._rng = rng
+        self.subjects = []
+        self.subject_index = {}
+        self.user_ids = []
+        self.names = []
+        self.rows = {}
+        self.vectors = np.zeros((16, 0))
+        self.signatures = np.zeros((16, HASH_TABLES), dtype=np.int64)
+        self.planes = np.zeros((HASH_TABLES, HASH_BITS, 0))
+        self.buckets = [{} for _ in range(HASH_TABLES)]
+        self._weights = 1 << np.arange(HASH_BITS)
+
+    def _add_subject(self, name):
+        self.subject_index[name] = len(self.subjects)
+        self.subjects.append(name)
+        # Existing vectors are 0 in the new dimension, so their hashes do not change
+        self.vectors = np.hstack([self.vectors, np.zeros((len(self.vectors), 1))])
+        self.planes = np.concatenate([self.planes, self._rng.standard_normal((HASH_TABLES, HASH_BITS, 1))], axis=2)
+
+    def vector(self, subjects):
+        for name in subjects:
+            if name not in self.subject_index:
+                self._add_subject(name)
+        vector = np.zeros(len(self.subjects))
+        for name, level in subjects.items():
+            vector[self.subject_index[name]] = float(level) - CONFIDENCE_CENTRE
+        return vector
+
+    def hash(self, vector):
+        """Bucket signature of a vector in every table"""
+        bits = (self.planes @ vector) > 0
+        return bits @ self._weights
+
+    def _unlink(self, row):
+        for table, signature in enumerate(self.signatures[row]):
+            bucket = self.buckets[table].get(int(signature))
+            if bucket is not None:
+                bucket.discard(row)
+
+    def upsert(self, user_id, name, subjects):
+        vector = self.vector(subjects)
+        row = self.rows.get(user_id)
+        if row is None:
+            row = len(self.user_ids)
+            self.rows[user_id] = row
+            self.user_ids.append(user_id)
+            self.names.append(name)
+            if row == len(self.vectors):
+                # Grow storage geometrically so inserts stay amortised O(1)
+                self.vectors = np.vstack([self.vectors, np.zeros_like(self.vectors)])
+                self.signatures = np.vstack([self.signatures, np.zeros_like(self.signatures)])
+        else:
+            self._unlink(row)
+        self.vectors[row] = vector
+        signature = self.hash(vector)
+        self.signatures[row] = signature
+        for table, key in enumerate(signature):
+            self.buckets[table].setdefault(int(key), set()).add(row)
+
+    def candidates(self, query, exclude, wanted):
+        """Rows sharing a bucket with the query in any table.
+
+        Buckets one bit away are probed too when that finds fewer than
+        `wanted` rows.
+        """
+        keys = [int(key) for key in self.hash(query)]
+        found = set()
+        for table, key in enumerate(keys):
+            found |= self.buckets[table].get(key, set())
+        found.discard(exclude)
+        if len(found) < wanted:
+            for table, key in enumerate(keys):
+                for bit in range(HASH_BITS):
+                    found |= self.buckets[table].get(key ^ (1 << bit), set())
+            found.discard(exclude)
+        return found
+
+
+class BuddyIndex:
+    """Study-buddy matching over confidence vectors, partitioned by grade and stream.
+
+    Loaded from the database on first use; signup and update_subjects keep
+    it current through add_user() and update_subjects().
+    """
+
+    def __init__(self, seed=42):
+        self._seed = seed
+        self._partitions = None
+        self._cohorts = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _partition(self, cohort):
+        partition = self._partitions.get(cohort)
+        if partition is None:
+            seed = self._seed + len(self._partitions)
+            partition = self._partitions[cohort] = _Partition(np.random.default_rng(seed))
+        return partition
+
+    def load(self):
+        """Index every user; returns False if the database is unavailable"""
+        connection = get_db_connection()
+        if connection is None:
+            return False
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT id, name, grade, stream FROM users")
+            users = cursor.fetchall()
+            cursor.execute("SELECT user_id, subject_name, confidence_level FROM user_subjects")
+            subjects = {}
+            for user_id, subject_name, confidence_level in cursor.fetchall():
+                subjects.setdefault(user_id, {})[subject_name] = confidence_level
+            cursor.close()
+        except Error as e:
+            print(f"Error loading study buddies: {e}")
+            return False
+        finally:
+            connection.close()
+
+        with self._lock:
+            self._partitions = {}
+            self._cohorts = {}
+            for user_id, name, grade, stream in users:
+                if user_id in subjects:
+                    self._cohorts[user_id] = (grade, stream)
+                    self._partition((grade, stream)).upsert(user_id, name, subjects[user_id])
+        return True
+
+    def add_user(self, user_id, name, grade, stream, subjects):
+        """Index a new user (a no-op until the index has been loaded)"""
+        with self._lock:
+            if self._partitions is None:
+                return
+            self._cohorts[user_id] = (grade, stream)
+            self._partition((grade, stream)).upsert(user_id, name, subjects)
+
+    def update_subjects(self, user_id, subjects):
+        with self._lock:
+            if self._partitions is None or user_id not in self._cohorts:
+                return
+            partition = self._partitions[self._cohorts[user_id]]
+            partition.upsert(user_id, partition.names[partition.rows[user_id]], subjects)
+
+    def matches(self, user_id, limit=5, complementary=True):
+        """Top matches for a user, or None if the database is unavailable.
+
+        Complementary matches are strong where the user is weak; otherwise
+        the most similar confidence profiles are returned.
+        """
+        if self._partitions is None:
+            with self._load_lock:
+                if self._partitions is None and not self.load():
+                    return None
+        with self._lock:
+            cohort = self._cohorts.get(user_id)
+            if cohort is None:
+                return []
+            partition = self._partitions[cohort]
+            row = partition.rows[user_id]
+            mine = partition.vectors[row]
+            query = -mine if complementary else mine
+
+            rows = partition.candidates(query, row, limit)
+            if len(rows) < limit:
+                # Sparse buckets: an exact scan of the cohort is still one matrix product
+                rows = set(range(len(partition.user_ids))) - {row}
+            if not rows:
+                return []
+            rows = np.fromiter(rows, dtype=np.int64)
+            vectors = partition.vectors[rows]
+            norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+            scores = np.divide(vectors @ query, norms, out=np.zeros(len(rows)), where=norms > 0)
+            best = np.argsort(-scores, kind='stable')[:limit]
+
+            results = []
+            for index in best:
+                theirs = vectors[index]
+                strong = theirs + CONFIDENCE_CENTRE >= STRONG_CONFIDENCE
+                weak = theirs + CONFIDENCE_CENTRE <= WEAK_CONFIDENCE
+                my_strong = mine + CONFIDENCE_CENTRE >= STRONG_CONFIDENCE
+                my_weak = mine + CONFIDENCE_CENTRE <= WEAK_CONFIDENCE
+                results.append({
+                    'user_id': partition.user_ids[rows[index]],
+                    'name': partition.names[rows[index]],
+                    'score': round(float(scores[index]), 3),
+                    'can_help_you_with': [partition.subjects[i] for i in np.flatnonzero(strong & my_weak)],
+                    'you_can_help_with': [partition.subjects[i] for i in np.flatnonzero(weak & my_strong)],
+                })
+            return results
+
+
+buddy_index = BuddyIndex()
@@ -0,0 +1,137 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+# brotli is an optional build-time dependency and deliberately not in
+# requirements.txt: `pip install brotli` to also write .br variants.
+# Without it only .gz variants are built and serve_asset() sends gzip.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# Source folders under static/ that are built into static/dist/
+ASSET_DIRS = ['css', 'js']
+
+
+def minify_css(source):
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    # Only whitespace after colons: "a :hover" differs from "a:hover"
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip() + '\n'
+
+
+def minify_js(source):
+    """Remove comments, indentation and blank lines outside string literals.
+
+    Newlines are kept so automatic semicolon insertion behaves exactly as
+    in the source file.
+    """
+    out = []
+    i = 0
+    length = len(source)
+    line_start = True
+    while i < length:
+        ch = source[i]
+        if line_start and ch in ' \t':
+            i += 1
+            continue
+        if ch in '\'"`':
+            end = i + 1
+            while end < length and source[end] != ch:
+                if source[end] == '\\':
+                    end += 1
+                elif ch != '`' and source[end] == '\n':
+                    break
+                end += 1
+            out.append(source[i:end + 1])
+            i = end + 1
+            line_start = False
+            continue
+        if source.startswith('//', i) and (i == 0 or source[i - 1] != '\\'):
+            while i < length and source[i] != '\n':
+                i += 1
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        if ch == '\n':
+            if out and not line_start:
+                out.append('\n')
+            line_start = True
+            i += 1
+            continue
+        out.append(ch)
+        line_start = False
+        i += 1
+    text = ''.join(out)
+    return re.sub(r'[ \t]+\n', '\n', text).strip() + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build(minify=True):
+    """Minify, fingerprint and precompress every asset; returns the manifest"""
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifest = {}
+    total_in = total_out = 0
+    for folder in ASSET_DIRS:
+        source_dir = os.path.join(STATIC_DIR, folder)
+        for filename in sorted(os.listdir(source_dir)):
+            stem, extension = os.path.splitext(filename)
+            if extension not in MINIFIERS:
+                continue
+            with open(os.path.join(source_dir, filename), encoding='utf-8') as f:
+                source = f.read()
+            content = (MINIFIERS[extension](source) if minify else source).encode('utf-8')
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            hashed_name = f"{folder}/{stem}.{digest}{extension}"
+            output = os.path.join(DIST_DIR, hashed_name)
+
+            _write(output, content)
+            _write(output + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write(output + '.br', brotli.compress(content, quality=11))
+
+            manifest[f"{folder}/{filename}"] = hashed_name
+            total_in += len(source.encode('utf-8'))
+            total_out += len(content)
+
+    _write(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    print(f"Built {len(manifest)} assets: {total_in} -> {total_out} bytes minified"
+          f"{'' if brotli else ' (brotli not installed; gzip only)'}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets")
+    parser.add_argument('--no-minify', action='store_true', help='copy sources without minifying')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    build(minify=not args.no_minify)
+    print(f"Done in {time.perf_counter() - started:.2f}s")
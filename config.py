@@ -0,0 +1,70 @@
+import os
+
+from dotenv import load_dotenv
+
+_TRUE = {'1', 'true', 'yes', 'on'}
+_FALSE = {'0', 'false', 'no', 'off', ''}
+
+
+def _bool(value):
+    value = value.strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+# Environment variable -> (settings group, key, type). create_app() and the
+# CLIs copy each group into the matching config dict (db_config, pool_config, ...).
+ENVIRONMENT = {
+    'SECRET_KEY': ('app', 'secret_key', str),
+    'WARMUP': ('app', 'warmup', _bool),
+    'DB_BACKEND': ('app', 'db_backend', str),
+    'DB_HOST': ('db', 'host', str),
+    'DB_PORT': ('db', 'port', int),
+    'DB_USER': ('db', 'user', str),
+    'DB_PASSWORD': ('db', 'password', str),
+    'DB_NAME': ('db', 'database', str),
+    'SQLITE_PATH': ('sqlite', 'path', str),
+    'DB_POOL_SIZE': ('pool', 'pool_size', int),
+    'DB_MAX_OVERFLOW': ('pool', 'max_overflow', int),
+    'DB_POOL_TIMEOUT': ('pool', 'timeout', float),
+    'DB_POOL_RECYCLE': ('pool', 'recycle', int),
+    'SESSION_BACKEND': ('session', 'backend', str),
+    'SESSION_PATH': ('session', 'path', str),
+    'SESSION_MAX_ENTRIES': ('session', 'max_entries', int),
+    'SESSION_TTL': ('session', 'ttl', int),
+    'ADMISSION_ENABLED': ('admission', 'enabled', _bool),
+    'ADMISSION_CLIENT_RATE': ('admission', 'client_rate', float),
+    'ADMISSION_CLIENT_BURST': ('admission', 'client_burst', float),
+    'ADMISSION_USER_RATE': ('admission', 'user_rate', float),
+    'ADMISSION_USER_BURST': ('admission', 'user_burst', float),
+    'ADMISSION_AUTH_RATE': ('admission', 'auth_rate', float),
+    'ADMISSION_AUTH_BURST': ('admission', 'auth_burst', float),
+    'ADMISSION_MAX_CONCURRENT': ('admission', 'max_concurrent', int),
+    'ADMISSION_QUEUE_TIMEOUT': ('admission', 'queue_timeout', float),
+}
+
+
+def load(env_file=None):
+    """Settings from the environment, after loading a .env file; returns {group: {key: value}}
+
+    Variables that are not set are left out, so the defaults in app.py and
+    database.py apply. Real environment variables win over the .env file.
+    """
+    if env_file is None:
+        env_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+    if os.path.exists(env_file):
+        load_dotenv(env_file, override=False)
+
+    settings = {}
+    for name, (group, key, convert) in ENVIRONMENT.items():
+        value = os.environ.get(name)
+        if value is None:
+            continue
+        try:
+            settings.setdefault(group, {})[key] = convert(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid value for {name}: {e}") from None
+    return settings
@@ -0,0 +1,61 @@
+from mysql.connector import Error, IntegrityError
+
+from database import get_db_connection
+
+
+def _key(scope):
+    """('subjects', 42) -> ('subjects', 42); ('quotes',) -> ('quotes', 0)"""
+    return scope[0], scope[1] if len(scope) > 1 else 0
+
+
+def bump(*scopes):
+    """Advance the shared version of each scope, e.g. ('subjects', user_id) or ('quotes',).
+
+    Caches in every worker compare these versions before reusing data
+    built from a scope. Returns False if the database is unavailable.
+    """
+    connection = get_db_connection()
+    if connection is None:
+        return False
+    cursor = connection.cursor()
+    try:
+        for scope in scopes:
+            key = _key(scope)
+            cursor.execute("UPDATE data_versions SET version = version + 1 WHERE scope = %s AND scope_id = %s", key)
+            if cursor.rowcount == 0:
+                try:
+                    cursor.execute("INSERT INTO data_versions (scope, scope_id, version) VALUES (%s, %s, 1)", key)
+                except IntegrityError:
+                    # Another worker created the row first
+                    cursor.execute("UPDATE data_versions SET version = version + 1 "
+                                   "WHERE scope = %s AND scope_id = %s", key)
+        connection.commit()
+        return True
+    except Error as e:
+        connection.rollback()
+        print(f"Error bumping data versions: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def current(scopes):
+    """Tuple of the scopes' versions (0 if never bumped), or None if the database is unavailable"""
+    connection = get_db_connection()
+    if connection is None:
+        return None
+    cursor = connection.cursor()
+    try:
+        versions = []
+        for scope in scopes:
+            cursor.execute("SELECT version FROM data_versions WHERE scope = %s AND scope_id = %s", _key(scope))
+            row = cursor.fetchone()
+            versions.append(row[0] if row else 0)
+    except Error as e:
+        print(f"Error reading data versions: {e}")
+        return None
+    finally:
+        cursor.close()
+        connection.close()
+    return tuple(versions)
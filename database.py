@@ -0,0 +1,120 @@
+import mysql.connector
+from mysql.connector import Error
+
+import sqlite_backend
+from db_pool import ConnectionPool, PoolTimeout
+from metrics import Gauge, InstrumentedConnection, registry
+
+# Storage backend: 'mysql', or 'sqlite' for an embedded single-node database
+db_backend = 'mysql'
+
+# MySQL configuration
+db_config = {
+    'host': 'localhost',
+    'user': 'root',  # Default XAMPP username
+    'password': '',  # Default XAMPP password (empty)
+    'database': 'study_planner'
+}
+
+# SQLite configuration (used when db_backend = 'sqlite')
+sqlite_config = {
+    'path': 'study_planner.sqlite3'
+}
+
+# Connection pool configuration
+pool_config = {
+    'pool_size': 5,        # Idle connections kept open for reuse
+    'max_overflow': 10,    # Extra connections allowed under load
+    'timeout': 10.0,       # Seconds to wait for a free connection
+    'recycle': 3600,       # Reopen connections older than this (seconds)
+    'pre_ping': True       # Check connections are alive before handing out
+}
+
+_pool = None
+
+
+def configure(settings, backend=None, sqlite_path=None):
+    """Apply config.load() settings (DB_BACKEND, DB_*, SQLITE_PATH, DB_POOL_*); backend and sqlite_path win over them"""
+    global db_backend
+    db_backend = backend or settings.get('app', {}).get('db_backend', db_backend)
+    db_config.update(settings.get('db', {}))
+    sqlite_config.update(settings.get('sqlite', {}))
+    if sqlite_path:
+        sqlite_config['path'] = sqlite_path
+    pool_config.update(settings.get('pool', {}))
+
+
+def _create_connection():
+    if db_backend == 'sqlite':
+        return sqlite_backend.connect(sqlite_config['path'])
+    return mysql.connector.connect(**db_config)
+
+
+def get_pool():
+    """Return the shared connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(_create_connection, **pool_config)
+    return _pool
+
+
+def get_db_connection():
+    """Check out a pooled database connection; close() returns it to the pool"""
+    try:
+        return InstrumentedConnection(get_pool().connect())
+    except PoolTimeout as e:
+        print(f"Connection pool exhausted: {e}")
+        return None
+    except Error as e:
+        print(f"Error connecting to {db_backend}: {e}")
+        return None
+
+
+def warm_pool():
+    """Open pool_size connections now so the first requests skip connecting; returns False on failure"""
+    connections = []
+    try:
+        for _ in range(pool_config['pool_size']):
+            connection = get_db_connection()
+            if connection is None:
+                return False
+            connections.append(connection)
+        return True
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def get_pool_stats():
+    """Return usage counters for the shared connection pool"""
+    return get_pool().stats()
+
+
+def _pool_connections():
+    stats = get_pool_stats()
+    return {('in_use',): stats['in_use'], ('idle',): stats['idle']}
+
+
+def _pool_waits():
+    stats = get_pool_stats()
+    return {('waits',): stats['waits'], ('timeouts',): stats['timeouts']}
+
+
+registry.register(Gauge('db_pool_connections', 'Pooled connections by state', _pool_connections, ('state',)))
+registry.register(Gauge('db_pool_checkout_waits', 'Checkouts that had to wait or timed out', _pool_waits, ('outcome',)))
+registry.register(Gauge('db_pool_wait_seconds', 'Total time spent waiting for a connection',
+                        lambda: get_pool_stats()['wait_time']))
+
+
+def upsert_clause(conflict_columns, update_columns):
+    """Return the backend's 'insert or update on duplicate key' clause"""
+    if db_backend == 'sqlite':
+        return sqlite_backend.upsert_clause(conflict_columns, update_columns)
+    return 'ON DUPLICATE KEY UPDATE ' + ', '.join(
+        f"{column} = VALUES({column})" for column in update_columns)
+
+
+def values_placeholders(row_count, width):
+    """Return '(%s, ...), (%s, ...)' for a multi-row INSERT of row_count rows"""
+    row = '(' + ', '.join(['%s'] * width) + ')'
+    return ', '.join([row] * row_count)
@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out in time"""
+
+
+class PooledConnection:
+    """Proxy around a raw connection that returns it to the pool on close().
+
+    A proxy that is garbage collected without being closed (a route that
+    raised before reaching close()) frees its slot and the raw connection
+    is discarded, so errors cannot drain the pool.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._closed = False
+        # Pool generation (process) the connection was checked out from
+        self._pid = pool._pid
+        self._finalizer = weakref.finalize(self, pool._abandon, raw, self._pid)
+        self._finalizer.atexit = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        self._pool._release(self._raw, self._created_at, self._pid)
+
+    def is_connected(self):
+        if self._closed:
+            return False
+        return self._raw.is_connected()
+
+
+class ConnectionPool:
+    """Thread-safe, fork-aware pool of database connections.
+
+    pool_size connections are kept idle for reuse; up to max_overflow extra
+    connections may be opened under load and are closed when released.
+    """
+
+    def __init__(self, creator, pool_size=5, max_overflow=10, timeout=10.0,
+                 recycle=3600, pre_ping=True):
+        self._creator = creator
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self._init_state()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _init_state(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = deque()
+        self._checked_out = 0
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'abandoned': 0,
+        }
+
+    def _reset_after_fork(self):
+        # The parent's sockets must not be shared with (or closed by) a
+        # child worker, so drop them and start with an empty pool.
+        self._init_state()
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+
+    @property
+    def capacity(self):
+        return self.pool_size + self.max_overflow
+
+    def connect(self):
+        """Check out a connection, waiting up to `timeout` seconds"""
+        self._check_pid()
+        deadline = None
+        with self._lock:
+            while not self._idle and self._checked_out >= self.capacity:
+                if deadline is None:
+                    self._stats['waits'] += 1
+                    wait_started = time.monotonic()
+                    deadline = wait_started + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._stats['wait_time'] += time.monotonic() - wait_started
+                    raise PoolTimeout(
+                        f"No connection available within {self.timeout}s")
+                self._available.wait(remaining)
+            if deadline is not None:
+                self._stats['wait_time'] += time.monotonic() - wait_started
+            self._checked_out += 1
+            self._stats['checkouts'] += 1
+            entry = self._idle.pop() if self._idle else None
+
+        try:
+            raw, created_at = self._prepare(entry)
+        except Exception:
+            with self._lock:
+                self._checked_out -= 1
+                self._available.notify()
+            raise
+        return PooledConnection(self, raw, created_at)
+
+    def _prepare(self, entry):
+        if entry is not None:
+            raw, created_at = entry
+            if self.recycle is not None and time.monotonic() - created_at > self.recycle:
+                self._discard(raw)
+                with self._lock:
+                    self._stats['recycled'] += 1
+            elif self.pre_ping and not self._ping(raw):
+                self._discard(raw)
+                with self._lock:
+                    self._stats['ping_failures'] += 1
+            else:
+                return raw, created_at
+        raw = self._creator()
+        with self._lock:
+            self._stats['created'] += 1
+        return raw, time.monotonic()
+
+    def _ping(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _release(self, raw, created_at, pid):
+        if pid != self._pid or self._pid != os.getpid():
+            # Connection checked out before a fork; it belongs to the parent.
+            return
+        try:
+            # Never hand out a connection with an open transaction
+            raw.rollback()
+            keep = True
+        except Exception:
+            keep = False
+        with self._lock:
+            self._checked_out -= 1
+            if keep and len(self._idle) < self.pool_size:
+                self._idle.append((raw, created_at))
+                raw = None
+            self._available.notify()
+        if raw is not None:
+            self._discard(raw)
+
+    def _abandon(self, raw, pid):
+        # Called when a checked-out proxy is collected without close(); its
+        # state is unknown (unread results, open transaction), so close it.
+        if pid != self._pid or self._pid != os.getpid():
+            return
+        with self._lock:
+            self._checked_out -= 1
+            self._stats['abandoned'] += 1
+            self._available.notify()
+        self._discard(raw)
+
+    def dispose(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        """Return a snapshot of pool usage counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'in_use': self._checked_out,
+                'idle': len(self._idle),
+            })
+        snapshot['wait_time'] = round(snapshot['wait_time'], 6)
+        return snapshot
@@ -0,0 +1,272 @@
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from mysql.connector import Error
+
+from database import get_db_connection, values_placeholders
+from metrics import Gauge, registry
+
+EVENT_TYPES = ('session', 'quiz')
+MAX_SESSION_MINUTES = 600
+
+# How far one quiz pulls the estimate towards the level its score implies
+QUIZ_WEIGHT = 0.3
+# Confidence gained per hour of study, shrinking as the estimate nears 10
+STUDY_GAIN_PER_HOUR = 0.5
+
+
+class BufferFull(Exception):
+    """Raised when the event buffer cannot take more events until it flushes"""
+
+
+def confidence_level(estimate):
+    """Round an estimate half up to the stored 1-10 level"""
+    return int(estimate + 0.5)
+
+
+def apply_event(estimate, event_type, duration_minutes=None, score=None):
+    """New confidence estimate (1-10) after one study session or quiz"""
+    if event_type == 'quiz':
+        target = 1 + 9 * score / 100
+        estimate += QUIZ_WEIGHT * (target - estimate)
+    else:
+        estimate += STUDY_GAIN_PER_HOUR * duration_minutes / 60 * (10 - estimate) / 9
+    return min(10.0, max(1.0, estimate))
+
+
+class EventBuffer:
+    """In-process buffer that writes study events in batched multi-row inserts.
+
+    A background thread flushes once batch_size events are waiting or
+    flush_interval seconds have passed. add() raises BufferFull beyond
+    max_buffered events, so callers shed load instead of queueing without
+    bound while the database is slow or down; failed batches go back to
+    the front of the buffer and are retried.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=1.0, max_buffered=20000, after_flush=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.after_flush = after_flush
+        self._events = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stats = {'accepted': 0, 'rejected': 0, 'written': 0, 'batches': 0, 'failures': 0}
+
+    def add(self, events):
+        """Buffer (user_id, subject_name, event_type, duration_minutes, score) tuples, all or none"""
+        occurred_at = datetime.now()
+        with self._condition:
+            if len(self._events) + len(events) > self.max_buffered:
+                self._stats['rejected'] += len(events)
+                raise BufferFull(f"{len(self._events)} events already buffered")
+            self._events.extend(event + (occurred_at,) for event in events)
+            self._stats['accepted'] += len(events)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='study-events', daemon=True)
+                self._thread.start()
+            if len(self._events) >= self.batch_size:
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._events) >= self.batch_size, self.flush_interval)
+            self.flush()
+            if self.after_flush is not None:
+                try:
+                    self.after_flush()
+                except Exception as e:
+                    print(f"Error after flushing study events: {e}")
+
+    def flush(self):
+        """Write every buffered event; returns False if a batch could not be written"""
+        with self._flush_lock:
+            while True:
+                with self._condition:
+                    batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+                if not batch:
+                    return True
+                if not self._write(batch):
+                    with self._condition:
+                        self._events.extendleft(reversed(batch))
+                        self._stats['failures'] += 1
+                    return False
+
+    def _write(self, batch):
+        connection = get_db_connection()
+        if connection is None:
+            return False
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"""
+                INSERT INTO study_events (user_id, subject_name, event_type, duration_minutes, score, occurred_at)
+                VALUES {values_placeholders(len(batch), 6)}
+            """, [value for event in batch for value in event])
+            connection.commit()
+        except Error as e:
+            connection.rollback()
+            print(f"Error writing study events: {e}")
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+        with self._condition:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+        return True
+
+    def stats(self):
+        with self._condition:
+            snapshot = dict(self._stats)
+            snapshot['buffered'] = len(self._events)
+        snapshot['max_buffered'] = self.max_buffered
+        snapshot['batch_size'] = self.batch_size
+        return snapshot
+
+
+class ConfidenceAggregator:
+    """Folds new study events into user_subjects.confidence_level.
+
+    Each run reads events not yet marked applied in id order, applies
+    them to the unrounded estimate per user and subject, and stores the
+    new levels and the applied flags in one transaction. Events are
+    marked one by one rather than behind an id watermark, so a batch
+    that commits after a higher id was applied is still picked up; if
+    another process marked any of them first, the run is rolled back.
+    on_change(user_id, subjects) is called for users whose rounded level
+    changed.
+    """
+
+    def __init__(self, interval=30, batch_size=5000, on_change=None):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_change = on_change
+        self._last_run = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'runs': 0, 'events': 0, 'updated_subjects': 0, 'conflicts': 0}
+
+    def maybe_run(self):
+        """Run if interval seconds have passed since the last run"""
+        if self._last_run is None or time.monotonic() - self._last_run >= self.interval:
+            self.run()
+
+    def run(self):
+        """Apply all pending events; returns False if the database is unavailable"""
+        if not self._lock.acquire(blocking=False):
+            return True
+        try:
+            self._last_run = time.monotonic()
+            while True:
+                applied = self._run_batch()
+                if applied is None:
+                    return False
+                if applied < self.batch_size:
+                    return True
+        finally:
+            self._lock.release()
+
+    def _run_batch(self):
+        connection = get_db_connection()
+        if connection is None:
+            return None
+        cursor = connection.cursor()
+        changed_users = {}
+        try:
+            cursor.execute("""
+                SELECT id, user_id, subject_name, event_type, duration_minutes, score
+                FROM study_events
+                WHERE applied = 0
+                ORDER BY id
+                LIMIT %s
+            """, (self.batch_size,))
+            events = cursor.fetchall()
+            if not events:
+                connection.rollback()
+                return 0
+
+            user_ids = sorted({event[1] for event in events})
+            placeholders = ', '.join(['%s'] * len(user_ids))
+            cursor.execute(f"""
+                SELECT user_id, subject_name, confidence_level, confidence_estimate
+                FROM user_subjects
+                WHERE user_id IN ({placeholders})
+            """, user_ids)
+            current = {(user_id, name): (level, estimate) for user_id, name, level, estimate in cursor.fetchall()}
+
+            estimates = {}
+            for _, user_id, subject_name, event_type, duration_minutes, score in events:
+                key = (user_id, subject_name)
+                if key not in current:
+                    continue  # Subject removed since the event was logged
+                if key not in estimates:
+                    level, estimate = current[key]
+                    # A level that no longer matches the estimate was set by hand; start from it
+                    estimates[key] = estimate if estimate is not None and confidence_level(estimate) == level else level
+                estimates[key] = apply_event(float(estimates[key]), event_type, duration_minutes, score)
+
+            # Only rows still at the level read above; a concurrent manual edit wins
+            updates = [(confidence_level(estimate), estimate, user_id, subject_name, current[(user_id, subject_name)][0])
+                       for (user_id, subject_name), estimate in estimates.items()]
+            cursor.executemany("""
+                UPDATE user_subjects
+                SET confidence_level = %s, confidence_estimate = %s
+                WHERE user_id = %s AND subject_name = %s AND confidence_level = %s
+            """, updates)
+            event_ids = [event[0] for event in events]
+            cursor.execute(f"""
+                UPDATE study_events SET applied = 1
+                WHERE id IN ({', '.join(['%s'] * len(event_ids))}) AND applied = 0
+            """, event_ids)
+            if cursor.rowcount != len(events):
+                # Another process applied these events first
+                connection.rollback()
+                with self._stats_lock:
+                    self._stats['conflicts'] += 1
+                return len(events)
+            connection.commit()
+
+            for (user_id, subject_name), estimate in estimates.items():
+                if confidence_level(estimate) != current[(user_id, subject_name)][0]:
+                    changed_users[user_id] = None
+            for user_id in changed_users:
+                changed_users[user_id] = {name: confidence_level(estimates.get((uid, name), level))
+                                          for (uid, name), (level, _) in current.items() if uid == user_id}
+        except Error as e:
+            connection.rollback()
+            print(f"Error aggregating study events: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+        with self._stats_lock:
+            self._stats['runs'] += 1
+            self._stats['events'] += len(events)
+            self._stats['updated_subjects'] += len(estimates)
+        if self.on_change is not None:
+            for user_id, subjects in changed_users.items():
+                self.on_change(user_id, subjects)
+        return len(events)
+
+    def stats(self):
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot['interval'] = self.interval
+        return snapshot
+
+
+confidence_aggregator = ConfidenceAggregator()
+study_events = EventBuffer(after_flush=confidence_aggregator.maybe_run)
+# Write whatever is still buffered on a clean shutdown
+atexit.register(study_events.flush)
+
+
+registry.register(Gauge('study_events_buffered', 'Study events waiting to be written',
+                        lambda: study_events.stats()['buffered']))
@@ -1,112 +1,225 @@
-import mysql.connector
+import argparse
+import csv
+import json
+import os
+import time
+
 from mysql.connector import Error
 
-# Database configuration
-db_config = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'study_planner'
-}
+import config
+import database
+from database import get_db_connection, upsert_clause, values_placeholders
+from quote_cache import quote_hash
 
-def get_db_connection():
-    """Create and return database connection"""
-    try:
-        connection = mysql.connector.connect(**db_config)
-        return connection
-    except Error as e:
-        print(f"Error connecting to MySQL: {e}")
+# Sample motivation quotes
+SAMPLE_QUOTES = [
+    {
+        'quote_text': "Push yourself, because no one else is going to do it for you.",
+        'author': "Unknown",
+        'category': "Motivation"
+    },
+    {
+        'quote_text': "The secret of getting ahead is getting started.",
+        'author': "Mark Twain",
+        'category': "Procrastination"
+    },
+    {
+        'quote_text': "Don't limit your challenges. Challenge your limits.",
+        'author': "Unknown",
+        'category': "Growth"
+    },
+    {
+        'quote_text': "The expert in anything was once a beginner.",
+        'author': "Helen Hayes",
+        'category': "Learning"
+    },
+    {
+        'quote_text': "Success doesn't come from what you do occasionally, it comes from what you do consistently.",
+        'author': "Marie Forleo",
+        'category': "Consistency"
+    },
+    {
+        'quote_text': "The harder you work for something, the greater you'll feel when you achieve it.",
+        'author': "Unknown",
+        'category': "Achievement"
+    },
+    {
+        'quote_text': "Education is the most powerful weapon which you can use to change the world.",
+        'author': "Nelson Mandela",
+        'category': "Education"
+    },
+    {
+        'quote_text': "Believe you can and you're halfway there.",
+        'author': "Theodore Roosevelt",
+        'category': "Belief"
+    },
+    {
+        'quote_text': "Your future is created by what you do today, not tomorrow.",
+        'author': "Robert Kiyosaki",
+        'category': "Action"
+    },
+    {
+        'quote_text': "The beautiful thing about learning is that no one can take it away from you.",
+        'author': "B.B. King",
+        'category': "Learning"
+    }
+]
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+QUOTE_COLUMNS = ['quote_text', 'author', 'category', 'is_active', 'content_hash']
+
+
+def read_quotes(path):
+    """Lazily yield quote dicts from a .csv or .jsonl file.
+
+    A JSONL line that is not a JSON object is reported with its line number
+    and yielded as None, which the import counts as skipped.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            yield from csv.DictReader(f)
+        elif extension in ('.jsonl', '.ndjson'):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    quote = json.loads(line)
+                except ValueError as e:
+                    print(f"Skipping malformed line {line_number} of {path}: {e}")
+                    yield None
+                    continue
+                if not isinstance(quote, dict):
+                    print(f"Skipping line {line_number} of {path}: expected a JSON object")
+                    yield None
+                    continue
+                yield quote
+        else:
+            raise ValueError(f"Unsupported quote file (expected .csv or .jsonl): {path}")
+
+
+def _quote_row(quote):
+    if quote is None:
         return None
+    quote_text = (quote.get('quote_text') or '').strip()
+    if not quote_text:
+        return None
+    author = (quote.get('author') or '').strip() or 'Unknown'
+    category = (quote.get('category') or '').strip() or 'Motivation'
+    return (quote_text, author, category, True, quote_hash(quote_text, author))
 
-def import_sample_quotes():
-    """Import sample motivation quotes into the database"""
-    
-    sample_quotes = [
-        {
-            'quote_text': "Push yourself, because no one else is going to do it for you.",
-            'author': "Unknown",
-            'category': "Motivation"
-        },
-        {
-            'quote_text': "The secret of getting ahead is getting started.",
-            'author': "Mark Twain",
-            'category': "Procrastination"
-        },
-        {
-            'quote_text': "Don't limit your challenges. Challenge your limits.",
-            'author': "Unknown",
-            'category': "Growth"
-        },
-        {
-            'quote_text': "The expert in anything was once a beginner.",
-            'author': "Helen Hayes",
-            'category': "Learning"
-        },
-        {
-            'quote_text': "Success doesn't come from what you do occasionally, it comes from what you do consistently.",
-            'author': "Marie Forleo",
-            'category': "Consistency"
-        },
-        {
-            'quote_text': "The harder you work for something, the greater you'll feel when you achieve it.",
-            'author': "Unknown",
-            'category': "Achievement"
-        },
-        {
-            'quote_text': "Education is the most powerful weapon which you can use to change the world.",
-            'author': "Nelson Mandela",
-            'category': "Education"
-        },
-        {
-            'quote_text': "Believe you can and you're halfway there.",
-            'author': "Theodore Roosevelt",
-            'category': "Belief"
-        },
-        {
-            'quote_text': "Your future is created by what you do today, not tomorrow.",
-            'author': "Robert Kiyosaki",
-            'category': "Action"
-        },
-        {
-            'quote_text': "The beautiful thing about learning is that no one can take it away from you.",
-            'author': "B.B. King",
-            'category': "Learning"
-        }
-    ]
-    
+
+def backfill_hashes(connection):
+    """Hash quotes inserted before content_hash existed so imports dedupe against them"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT id, quote_text, author FROM motivation_quotes WHERE content_hash IS NULL")
+    rows = cursor.fetchall()
+    for quote_id, quote_text, author in rows:
+        try:
+            cursor.execute("UPDATE motivation_quotes SET content_hash = %s WHERE id = %s",
+                           (quote_hash(quote_text, author), quote_id))
+        except Error:
+            # An existing duplicate; it stays unhashed
+            pass
+    connection.commit()
+    cursor.close()
+    return len(rows)
+
+
+def _write_batch(cursor, rows):
+    upsert_query = f"""
+    INSERT INTO motivation_quotes ({', '.join(QUOTE_COLUMNS)})
+    VALUES {values_placeholders(len(rows), len(QUOTE_COLUMNS))}
+    {upsert_clause(['content_hash'], ['category'])}
+    """
+    cursor.execute(upsert_query, [value for row in rows for value in row])
+
+
+def import_quotes(quotes, batch_size=DEFAULT_BATCH_SIZE):
+    """Upsert an iterable of quote dicts in batches, one transaction per batch.
+
+    Existing quotes are never deleted, so the dashboard always has quotes to
+    show while an import runs, and re-importing the same file is a no-op.
+    New quotes are active; a re-import only updates the category, so quotes
+    deactivated since stay deactivated.
+    """
     connection = get_db_connection()
     if connection is None:
         print("Failed to connect to database")
-        return
-    
+        return None
+
+    stats = {'read': 0, 'written': 0, 'skipped': 0, 'duplicates': 0}
+    started = time.perf_counter()
+    cursor = None
     try:
+        backfilled = backfill_hashes(connection)
+        if backfilled:
+            print(f"Hashed {backfilled} existing quotes")
+
         cursor = connection.cursor()
-        
-        # Clear existing quotes (optional)
-        cursor.execute("DELETE FROM motivation_quotes")
-        
-        # Insert sample quotes
-        insert_query = """
-        INSERT INTO motivation_quotes (quote_text, author, category)
-        VALUES (%s, %s, %s)
-        """
-        
-        for quote in sample_quotes:
-            cursor.execute(insert_query, (
-                quote['quote_text'],
-                quote['author'],
-                quote['category']
-            ))
-        
-        connection.commit()
-        print(f"Successfully imported {len(sample_quotes)} quotes into the database")
-        
+        batch = {}
+        for quote in quotes:
+            stats['read'] += 1
+            row = _quote_row(quote)
+            if row is None:
+                stats['skipped'] += 1
+                continue
+            if row[-1] in batch:
+                stats['duplicates'] += 1
+            batch[row[-1]] = row
+            if len(batch) >= batch_size:
+                _write_batch(cursor, list(batch.values()))
+                connection.commit()
+                stats['written'] += len(batch)
+                batch = {}
+                elapsed = time.perf_counter() - started
+                print(f"{stats['written']} quotes written ({stats['read'] / elapsed:.0f} rows/sec)")
+        if batch:
+            _write_batch(cursor, list(batch.values()))
+            connection.commit()
+            stats['written'] += len(batch)
+
     except Error as e:
+        connection.rollback()
         print(f"Error importing quotes: {e}")
+        return None
     finally:
-        if connection.is_connected():
+        if cursor is not None:
             cursor.close()
-            connection.close()
+        connection.close()
+
+    elapsed = time.perf_counter() - started
+    stats['rows_per_sec'] = round(stats['read'] / elapsed) if elapsed else 0
+    print(f"Imported {stats['written']} quotes from {stats['read']} rows in {elapsed:.2f}s "
+          f"({stats['rows_per_sec']} rows/sec, {stats['skipped']} skipped, "
+          f"{stats['duplicates']} duplicate rows merged)")
+    return stats
+
+
+def import_sample_quotes():
+    """Import sample motivation quotes into the database"""
+    return import_quotes(SAMPLE_QUOTES)
+
+
+def _iter_files(paths):
+    for path in paths:
+        print(f"Reading {path}")
+        yield from read_quotes(path)
+
 
 if __name__ == "__main__":
-    import_sample_quotes()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import motivation quotes from CSV/JSONL files")
+    parser.add_argument('files', nargs='*',
+                        help='.csv or .jsonl files with quote_text, author and category (default: sample quotes)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='rows per INSERT/transaction')
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help='overrides DB_BACKEND')
+    parser.add_argument('--sqlite-path', help='overrides SQLITE_PATH')
+    args = parser.parse_args()
+
+    database.configure(config.load(), backend=args.backend, sqlite_path=args.sqlite_path)
+    if args.files:
+        import_quotes(_iter_files(args.files), args.batch_size)
+    else:
+        import_sample_quotes()
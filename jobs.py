@@ -0,0 +1,135 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import Gauge, registry
+
+
+class QueueFull(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+class JobFailed(Exception):
+    """Raised by a job to fail with a message that is safe to show the user"""
+
+
+class Job:
+    """One unit of background work and its outcome"""
+
+    def __init__(self, user_id, kind, key):
+        self.id = secrets.token_urlsafe(12)
+        self.user_id = user_id
+        self.kind = kind
+        self.key = key
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'queued_seconds': round((self.started_at or time.time()) - self.created_at, 3),
+            'run_seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+        }
+
+
+class JobQueue:
+    """Bounded in-process thread pool for slow per-user work, no broker needed.
+
+    Identical in-flight jobs (same user, kind and key) are merged, at most
+    max_pending jobs wait at once, and finished jobs are kept for polling
+    until keep_finished newer ones have completed. Threads rather than
+    processes, because jobs update this process's caches; for the same
+    reason a job can only be polled on the worker that runs it.
+    """
+
+    def __init__(self, max_workers=4, max_pending=100, keep_finished=1000):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._in_flight = {}
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'deduplicated': 0, 'rejected': 0, 'done': 0, 'failed': 0}
+
+    def submit(self, user_id, kind, key, func, *args):
+        """Queue func(*args) unless the same job is already queued or running; returns the Job"""
+        with self._lock:
+            existing = self._in_flight.get((user_id, kind, key))
+            if existing is not None:
+                self._stats['deduplicated'] += 1
+                return existing
+            if len(self._in_flight) >= self.max_pending + self.max_workers:
+                self._stats['rejected'] += 1
+                raise QueueFull(f"{len(self._in_flight)} jobs already in flight")
+            job = Job(user_id, kind, key)
+            self._jobs[job.id] = job
+            self._in_flight[(user_id, kind, key)] = job
+            self._stats['submitted'] += 1
+        self._executor.submit(self._run, job, func, args)
+        return job
+
+    def _run(self, job, func, args):
+        job.started_at = time.time()
+        job.status = 'running'
+        try:
+            job.result = func(*args)
+            job.status = 'done'
+        except JobFailed as e:
+            job.error = str(e)
+            job.status = 'failed'
+        except Exception as e:
+            print(f"Job {job.kind} {job.id} failed: {e}")
+            job.error = 'An unexpected error occurred'
+            job.status = 'failed'
+        job.finished_at = time.time()
+
+        with self._lock:
+            self._in_flight.pop((job.user_id, job.kind, job.key), None)
+            self._stats[job.status] += 1
+            self._finished[job.id] = job
+            while len(self._finished) > self.keep_finished:
+                expired, _ = self._finished.popitem(last=False)
+                self._jobs.pop(expired, None)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            in_flight = list(self._in_flight.values())
+        snapshot['queued'] = sum(job.status == 'queued' for job in in_flight)
+        snapshot['running'] = sum(job.status == 'running' for job in in_flight)
+        snapshot['max_workers'] = self.max_workers
+        snapshot['max_pending'] = self.max_pending
+        return snapshot
+
+
+job_queue = JobQueue()
+
+
+def _job_states():
+    stats = job_queue.stats()
+    return {(state,): stats[state] for state in ('queued', 'running')}
+
+
+def _job_outcomes():
+    stats = job_queue.stats()
+    return {(outcome,): stats[outcome] for outcome in ('done', 'failed', 'deduplicated', 'rejected')}
+
+
+registry.register(Gauge('job_queue_depth', 'Background jobs in flight by state', _job_states, ('state',)))
+registry.register(Gauge('job_queue_jobs', 'Background jobs by outcome', _job_outcomes, ('outcome',)))
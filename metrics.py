@@ -0,0 +1,239 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, before_render_template, g, has_request_context, request, template_rendered
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                    for name, value in pairs)
+    return '{' + body + '}'
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name + _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Fixed-bucket histogram with labels, exported Prometheus-style"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                yield (self.name + '_bucket' + _format_labels(self.labelnames, labels, [('le', bound)]),
+                       cumulative)
+            yield self.name + '_sum' + _format_labels(self.labelnames, labels), total
+            yield self.name + '_count' + _format_labels(self.labelnames, labels), count
+
+
+class Gauge:
+    """Gauge whose samples are read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, callback, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception as e:
+            print(f"Error collecting {self.name}: {e}")
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            yield self.name + _format_labels(self.labelnames, labels), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, value in metric.samples():
+                lines.append(f"{sample_name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status', ('endpoint', 'method', 'status')))
+http_latency = registry.register(Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint', ('endpoint',)))
+db_statements = registry.register(Histogram(
+    'db_statements_per_request', 'SQL statements executed per request', ('endpoint',), COUNT_BUCKETS))
+db_time = registry.register(Histogram(
+    'db_time_per_request_seconds', 'Time spent in the database per request', ('endpoint',)))
+db_statements_total = registry.register(Counter(
+    'db_statements_total', 'SQL statements executed, including outside requests'))
+template_render = registry.register(Histogram(
+    'template_render_seconds', 'Jinja template render time', ('template',)))
+
+
+class InstrumentedCursor:
+    """Cursor proxy that counts statements and times database calls"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _timed(self, method, args, kwargs, statement):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if statement:
+                db_statements_total.inc()
+            if has_request_context():
+                g.db_time = g.get('db_time', 0.0) + elapsed
+                if statement:
+                    g.db_statements = g.get('db_statements', 0) + 1
+
+    def execute(self, *args, **kwargs):
+        return self._timed(self._cursor.execute, args, kwargs, True)
+
+    def executemany(self, *args, **kwargs):
+        return self._timed(self._cursor.executemany, args, kwargs, True)
+
+    def fetchone(self, *args, **kwargs):
+        return self._timed(self._cursor.fetchone, args, kwargs, False)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._timed(self._cursor.fetchmany, args, kwargs, False)
+
+    def fetchall(self, *args, **kwargs):
+        return self._timed(self._cursor.fetchall, args, kwargs, False)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are instrumented"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def close(self):
+        self._connection.close()
+
+
+def _start_request():
+    g.request_started = time.perf_counter()
+
+
+def _finish_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or 'unmatched'
+    http_requests.inc((endpoint, request.method, response.status_code))
+    http_latency.observe((endpoint,), elapsed)
+    db_statements.observe((endpoint,), g.get('db_statements', 0))
+    db_time.observe((endpoint,), g.get('db_time', 0.0))
+    return response
+
+
+def _template_started(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault('template_starts', []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    if has_request_context():
+        starts = g.get('template_starts')
+        if starts:
+            template_render.observe((template.name,), time.perf_counter() - starts.pop())
+
+
+def metrics_view():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """Record request, SQL and template metrics for app and serve them on /metrics"""
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
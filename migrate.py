@@ -0,0 +1,236 @@
+import argparse
+import ast
+import os
+import re
+import sys
+
+from mysql.connector import Error
+
+import config
+import database
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Modules whose queries `check` explains
+CHECKED_SOURCES = ['app.py', 'quote_cache.py', 'revision.py', 'analytics.py', 'buddies.py', 'profile_cache.py', 'events.py',
+                   'data_versions.py']
+
+# Queries that read a whole table or index on purpose, keyed by (file, function)
+ALLOW_FULL_SCAN = {
+    ('app.py', 'export_users.generate'): 'the /users/export stream reads every user by design',
+    ('app.py', 'get_all_quotes.load'): 'the admin /api/quotes list returns every quote; response_cache keeps it',
+    ('buddies.py', 'load'): 'the study-buddy index is built from every user once per process',
+}
+
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def list_migrations(backend):
+    """Return [(version, name, path)] for a backend, in version order"""
+    directory = os.path.join(MIGRATIONS_DIR, backend)
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return migrations
+
+
+def split_statements(sql):
+    """Split a schema file into statements, dropping '--' comment lines"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    _ensure_migrations_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def upgrade():
+    """Apply every migration that has not been applied yet"""
+    connection = database.get_db_connection()
+    if connection is None:
+        print("Failed to connect to database")
+        return False
+
+    cursor = connection.cursor()
+    try:
+        applied = applied_versions(cursor)
+        pending = [m for m in list_migrations(database.db_backend) if m[0] not in applied]
+        for version, name, path in pending:
+            with open(path) as f:
+                statements = split_statements(f.read())
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            connection.commit()
+            print(f"Applied {version:04d}_{name}")
+        if not pending:
+            print("Schema is up to date")
+        return True
+    except Error as e:
+        connection.rollback()
+        print(f"Migration failed: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def status():
+    """Print which migrations are applied"""
+    connection = database.get_db_connection()
+    if connection is None:
+        print("Failed to connect to database")
+        return False
+
+    cursor = connection.cursor()
+    try:
+        applied = applied_versions(cursor)
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+    for version, name, _ in list_migrations(database.db_backend):
+        state = 'applied' if version in applied else 'pending'
+        print(f"{version:04d}_{name}: {state}")
+    return True
+
+
+def _render(node):
+    """Turn the SQL argument of cursor.execute() back into a query string"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if not isinstance(node, ast.JoinedStr):
+        return None
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+            continue
+        expression = value.value
+        if isinstance(expression, ast.Call) and isinstance(expression.func, ast.Name):
+            args = []
+            for arg in expression.args:
+                try:
+                    args.append(ast.literal_eval(arg))
+                except ValueError:
+                    args.append(2)
+            if expression.func.id == 'values_placeholders':
+                parts.append(database.values_placeholders(*args))
+                continue
+            if expression.func.id == 'upsert_clause':
+                parts.append(database.upsert_clause(*args))
+                continue
+        # `placeholders` and anything else stand for a list of parameters
+        parts.append('%s, %s')
+    return ''.join(parts)
+
+
+def extract_queries(path):
+    """Yield (function, line, sql) for every literal cursor.execute() query in a module"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+
+    def visit(node, function):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                yield from visit(child, f"{function}.{child.name}" if function else child.name)
+                continue
+            if (isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)
+                    and child.func.attr == 'execute' and child.args):
+                sql = _render(child.args[0])
+                if sql is not None:
+                    yield function, child.lineno, ' '.join(sql.split())
+            yield from visit(child, function)
+
+    yield from visit(tree, None)
+
+
+def _explain_params(sql):
+    # LIMIT needs a number; everything else is compared as a string so
+    # MySQL does not skip an index on a VARCHAR column.
+    params = []
+    for match in re.finditer(r'%s', sql):
+        before = sql[:match.start()].rstrip().upper()
+        params.append(1 if before.endswith('LIMIT') else '1')
+    return params
+
+
+def full_scans(cursor, sql):
+    """Return the tables a query reads in full, through the table or a whole index"""
+    params = _explain_params(sql)
+    if database.db_backend == 'sqlite':
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        scans = []
+        for row in cursor.fetchall():
+            # SCAN walks every row, also with USING (COVERING) INDEX; SEARCH is a lookup
+            detail = row['detail']
+            if detail.startswith('SCAN ') and 'CONSTANT ROW' not in detail:
+                scans.append(detail[5:].split()[0])
+        return scans
+    cursor.execute("EXPLAIN " + sql, params)
+    # 'index' is a full index scan, as costly as 'ALL' on a big table
+    return [row['table'] for row in cursor.fetchall() if row.get('type') in ('ALL', 'index')]
+
+
+def check(sources=None):
+    """EXPLAIN every query in the checked modules; return False on any full table or index scan"""
+    connection = database.get_db_connection()
+    if connection is None:
+        print("Failed to connect to database")
+        return False
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    ok = True
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for source in sources or CHECKED_SOURCES:
+            for function, line, sql in extract_queries(os.path.join(root, source)):
+                label = f"{source}:{line} {function}()"
+                if sql.lstrip().upper().startswith('INSERT'):
+                    continue
+                try:
+                    scans = full_scans(cursor, sql)
+                except Error as e:
+                    print(f"ERROR      {label}: {e}")
+                    ok = False
+                    continue
+                if not scans:
+                    print(f"OK         {label}")
+                elif (source, function) in ALLOW_FULL_SCAN:
+                    print(f"ALLOWED    {label}: {ALLOW_FULL_SCAN[(source, function)]}")
+                else:
+                    print(f"FULL SCAN  {label}: {', '.join(scans)}")
+                    print(f"           {sql}")
+                    ok = False
+        connection.rollback()
+    finally:
+        cursor.close()
+        connection.close()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the database schema")
+    parser.add_argument('command', nargs='?', default='upgrade', choices=['upgrade', 'status', 'check'],
+                        help='apply pending migrations, list them, or EXPLAIN every app query')
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help='overrides DB_BACKEND')
+    parser.add_argument('--sqlite-path', help='overrides SQLITE_PATH')
+    args = parser.parse_args()
+
+    database.configure(config.load(), backend=args.backend, sqlite_path=args.sqlite_path)
+    commands = {'upgrade': upgrade, 'status': status, 'check': check}
+    sys.exit(0 if commands[args.command]() else 1)
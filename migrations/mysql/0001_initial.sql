@@ -0,0 +1,43 @@
+-- Tables used by app.py, import_quotes.py and regenerate_timetables.py
+CREATE TABLE IF NOT EXISTS users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    grade VARCHAR(10) NOT NULL,
+    stream VARCHAR(50),
+    study_time DECIMAL(4, 1) NOT NULL,
+    hobbies TEXT,
+    exams JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS user_subjects (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    subject_name VARCHAR(100) NOT NULL,
+    confidence_level TINYINT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_user_subjects_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS motivation_quotes (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    quote_text TEXT NOT NULL,
+    author VARCHAR(255) DEFAULT 'Unknown',
+    category VARCHAR(100) DEFAULT 'Motivation',
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS user_timetable (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    day_of_week VARCHAR(10) NOT NULL,
+    time_slot VARCHAR(8) NOT NULL,
+    subject_name VARCHAR(100) NOT NULL,
+    task_type VARCHAR(20) NOT NULL,
+    duration_minutes SMALLINT NOT NULL,
+    priority VARCHAR(10) NOT NULL,
+    CONSTRAINT fk_user_timetable_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,18 @@
+-- signup duplicate check and login lookup
+ALTER TABLE users ADD UNIQUE INDEX uq_users_email (email);
+
+-- update_subjects upsert key
+ALTER TABLE user_subjects ADD UNIQUE INDEX uq_user_subjects_user_subject (user_id, subject_name);
+
+-- login, /api/user-subjects, /user/<id>/subjects and timetable generation
+-- read only these columns, so they never touch the table rows
+ALTER TABLE user_subjects ADD INDEX idx_user_subjects_cover (user_id, subject_name, confidence_level);
+
+-- quote cache load and the random-id fallback
+ALTER TABLE motivation_quotes ADD INDEX idx_quotes_active (is_active, id);
+
+-- /api/quotes listing
+ALTER TABLE motivation_quotes ADD INDEX idx_quotes_created (created_at);
+
+-- /api/timetable, /api/clear-timetable and regeneration deletes
+ALTER TABLE user_timetable ADD INDEX idx_timetable_user (user_id, id);
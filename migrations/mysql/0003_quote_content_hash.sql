@@ -0,0 +1,5 @@
+-- SHA-256 of the normalised quote text and author (import_quotes.quote_hash);
+-- imports upsert on it instead of wiping the table
+ALTER TABLE motivation_quotes ADD COLUMN content_hash CHAR(64) NULL;
+
+ALTER TABLE motivation_quotes ADD UNIQUE INDEX uq_quotes_content_hash (content_hash);
@@ -0,0 +1,15 @@
+-- SM-2 spaced-repetition state per user and subject (revision.py).
+-- Subjects that were never reviewed have no row; they are seeded from
+-- user_subjects.confidence_level when the queue is loaded.
+CREATE TABLE IF NOT EXISTS revision_items (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    subject_name VARCHAR(100) NOT NULL,
+    easiness DOUBLE NOT NULL,
+    interval_days INT NOT NULL,
+    repetitions INT NOT NULL,
+    due_at TIMESTAMP NOT NULL,
+    last_reviewed_at TIMESTAMP NULL,
+    UNIQUE INDEX uq_revision_user_subject (user_id, subject_name),
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,24 @@
+-- Append-only log of completed study sessions and quiz scores (events.py).
+-- Rows are written in batches and never updated.
+CREATE TABLE IF NOT EXISTS study_events (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    subject_name VARCHAR(100) NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    duration_minutes SMALLINT NULL,
+    score DOUBLE NULL,
+    occurred_at TIMESTAMP NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Unrounded confidence kept by the aggregator between runs; NULL until a
+-- user's first event for the subject
+ALTER TABLE user_subjects ADD COLUMN confidence_estimate DOUBLE NULL;
+
+-- Last study_events id each aggregator has applied
+CREATE TABLE IF NOT EXISTS event_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    last_event_id INT NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT INTO event_watermarks (name, last_event_id) VALUES ('confidence', 0);
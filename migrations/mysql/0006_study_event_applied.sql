@@ -0,0 +1,11 @@
+-- Mark each study event once the confidence aggregator has applied it
+-- (events.py). An id watermark skipped events whose batch committed
+-- after a higher id had already been applied.
+ALTER TABLE study_events ADD COLUMN applied TINYINT(1) NOT NULL DEFAULT 0;
+
+UPDATE study_events SET applied = 1
+WHERE id <= (SELECT last_event_id FROM event_watermarks WHERE name = 'confidence');
+
+ALTER TABLE study_events ADD INDEX idx_study_events_applied (applied, id);
+
+DROP TABLE IF EXISTS event_watermarks;
@@ -0,0 +1,8 @@
+-- Change counters for data cached inside each worker (data_versions.py),
+-- e.g. ('subjects', user id) or ('quotes', 0); a missing row means version 0.
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope VARCHAR(50) NOT NULL,
+    scope_id INT NOT NULL,
+    version BIGINT NOT NULL,
+    PRIMARY KEY (scope, scope_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,41 @@
+-- Tables used by app.py, import_quotes.py and regenerate_timetables.py
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    stream TEXT,
+    study_time REAL NOT NULL,
+    hobbies TEXT,
+    exams TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    subject_name TEXT NOT NULL,
+    confidence_level INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS motivation_quotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    quote_text TEXT NOT NULL,
+    author TEXT DEFAULT 'Unknown',
+    category TEXT DEFAULT 'Motivation',
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_timetable (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    day_of_week TEXT NOT NULL,
+    time_slot TEXT NOT NULL,
+    subject_name TEXT NOT NULL,
+    task_type TEXT NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    priority TEXT NOT NULL
+);
@@ -0,0 +1,18 @@
+-- signup duplicate check and login lookup
+CREATE UNIQUE INDEX IF NOT EXISTS uq_users_email ON users (email);
+
+-- update_subjects upsert key
+CREATE UNIQUE INDEX IF NOT EXISTS uq_user_subjects_user_subject ON user_subjects (user_id, subject_name);
+
+-- login, /api/user-subjects, /user/<id>/subjects and timetable generation
+-- read only these columns, so they never touch the table rows
+CREATE INDEX IF NOT EXISTS idx_user_subjects_cover ON user_subjects (user_id, subject_name, confidence_level);
+
+-- quote cache load and the random-id fallback
+CREATE INDEX IF NOT EXISTS idx_quotes_active ON motivation_quotes (is_active, id);
+
+-- /api/quotes listing
+CREATE INDEX IF NOT EXISTS idx_quotes_created ON motivation_quotes (created_at);
+
+-- /api/timetable, /api/clear-timetable and regeneration deletes
+CREATE INDEX IF NOT EXISTS idx_timetable_user ON user_timetable (user_id, id);
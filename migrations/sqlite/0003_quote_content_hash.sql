@@ -0,0 +1,5 @@
+-- SHA-256 of the normalised quote text and author (import_quotes.quote_hash);
+-- imports upsert on it instead of wiping the table
+ALTER TABLE motivation_quotes ADD COLUMN content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_quotes_content_hash ON motivation_quotes (content_hash);
@@ -0,0 +1,15 @@
+-- SM-2 spaced-repetition state per user and subject (revision.py).
+-- Subjects that were never reviewed have no row; they are seeded from
+-- user_subjects.confidence_level when the queue is loaded.
+CREATE TABLE IF NOT EXISTS revision_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    subject_name TEXT NOT NULL,
+    easiness REAL NOT NULL,
+    interval_days INTEGER NOT NULL,
+    repetitions INTEGER NOT NULL,
+    due_at TIMESTAMP NOT NULL,
+    last_reviewed_at TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_revision_user_subject ON revision_items (user_id, subject_name);
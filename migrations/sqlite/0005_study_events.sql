@@ -0,0 +1,23 @@
+-- Append-only log of completed study sessions and quiz scores (events.py).
+-- Rows are written in batches and never updated.
+CREATE TABLE IF NOT EXISTS study_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    subject_name TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    duration_minutes INTEGER,
+    score REAL,
+    occurred_at TIMESTAMP NOT NULL
+);
+
+-- Unrounded confidence kept by the aggregator between runs; NULL until a
+-- user's first event for the subject
+ALTER TABLE user_subjects ADD COLUMN confidence_estimate REAL;
+
+-- Last study_events id each aggregator has applied
+CREATE TABLE IF NOT EXISTS event_watermarks (
+    name TEXT PRIMARY KEY,
+    last_event_id INTEGER NOT NULL
+);
+
+INSERT INTO event_watermarks (name, last_event_id) VALUES ('confidence', 0);
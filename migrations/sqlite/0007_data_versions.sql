@@ -0,0 +1,8 @@
+-- Change counters for data cached inside each worker (data_versions.py),
+-- e.g. ('subjects', user id) or ('quotes', 0); a missing row means version 0.
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope TEXT NOT NULL,
+    scope_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (scope, scope_id)
+);
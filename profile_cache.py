@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import OrderedDict
+
+from mysql.connector import Error
+
+import data_versions
+from database import get_db_connection
+from metrics import Gauge, registry
+
+
+def _profile(rows):
+    """Fold the joined user/subject rows of one user into a profile dict"""
+    first = rows[0]
+    subjects = [{
+        'subject_name': row['subject_name'],
+        'confidence_level': row['confidence_level'],
+        'created_at': row['created_at'],
+    } for row in rows if row['subject_name'] is not None]
+    return {
+        'id': first['id'],
+        'name': first['name'],
+        'email': first['email'],
+        'password': first['password'],
+        'grade': first['grade'],
+        'stream': first['stream'],
+        'subjects': subjects,
+    }
+
+
+class ProfileCache:
+    """Bounded, TTL'd read-through cache of user rows plus their subjects.
+
+    A miss loads the user and every subject in one joined query. Entries
+    are keyed by user id with an email index. Subjects change in every
+    worker's view at once: each entry remembers the shared ('subjects',
+    user_id) version it was loaded at (data_versions.py), and a hit is
+    only served after one primary key read confirms that version is
+    still current. If that read fails, cached profiles are served until
+    they expire. Unknown emails are not
+    cached: a user who just signed up through another worker must be able
+    to log in here (failed logins are throttled by admission control).
+    Callers treat returned profiles as read-only.
+    """
+
+    def __init__(self, ttl=300, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._profiles = OrderedDict()
+        self._emails = {}
+        self._invalidations = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stale': 0, 'evictions': 0, 'loads': 0}
+
+    def _cached(self, user_id):
+        entry = self._profiles.get(user_id)
+        if entry is None:
+            return None
+        profile, expires, version = entry
+        if expires <= time.monotonic():
+            self._drop(user_id)
+            self._stats['expired'] += 1
+            return None
+        self._profiles.move_to_end(user_id)
+        return profile, version
+
+    def _current(self, user_id):
+        """Cached profile unless it expired or another worker changed the user's subjects"""
+        with self._lock:
+            entry = self._cached(user_id) if user_id is not None else None
+        if entry is None:
+            return None
+        profile, version = entry
+        versions = data_versions.current([('subjects', user_id)])
+        if versions is not None and versions[0] != version:
+            with self._lock:
+                if self._profiles.get(user_id, (None,))[0] is profile:
+                    self._drop(user_id)
+                self._stats['stale'] += 1
+            return None
+        return profile
+
+    def _drop(self, user_id):
+        entry = self._profiles.pop(user_id, None)
+        if entry is not None:
+            self._emails.pop(entry[0]['email'], None)
+
+    def _store(self, profile, version, invalidations):
+        if invalidations != self._invalidations:
+            return  # Invalidated while loading: the rows may already be stale
+        self._drop(profile['id'])
+        self._profiles[profile['id']] = (profile, time.monotonic() + self.ttl, version)
+        self._emails[profile['email']] = profile['id']
+        while len(self._profiles) > self.max_entries:
+            _, (evicted, _, _) = self._profiles.popitem(last=False)
+            self._emails.pop(evicted['email'], None)
+            self._stats['evictions'] += 1
+
+    def _load(self, user_id=None, email=None):
+        connection = get_db_connection()
+        if connection is None:
+            return None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            if email is None:
+                cursor.execute("""
+                    SELECT u.id, u.name, u.email, u.password, u.grade, u.stream,
+                           s.subject_name, s.confidence_level, s.created_at, v.version
+                    FROM users u
+                    LEFT JOIN user_subjects s ON s.user_id = u.id
+                    LEFT JOIN data_versions v ON v.scope = 'subjects' AND v.scope_id = u.id
+                    WHERE u.id = %s
+                    ORDER BY s.subject_name
+                """, (user_id,))
+            else:
+                cursor.execute("""
+                    SELECT u.id, u.name, u.email, u.password, u.grade, u.stream,
+                           s.subject_name, s.confidence_level, s.created_at, v.version
+                    FROM users u
+                    LEFT JOIN user_subjects s ON s.user_id = u.id
+                    LEFT JOIN data_versions v ON v.scope = 'subjects' AND v.scope_id = u.id
+                    WHERE u.email = %s
+                    ORDER BY s.subject_name
+                """, (email,))
+            rows = cursor.fetchall()
+            cursor.close()
+        except Error as e:
+            print(f"Error loading user profile: {e}")
+            return None
+        finally:
+            connection.close()
+        with self._lock:
+            self._stats['loads'] += 1
+        if not rows:
+            return False
+        # Read with the rows, so a newer write can never be tagged with this version
+        return _profile(rows), rows[0]['version'] or 0
+
+    def _fill(self, invalidations, **where):
+        loaded = self._load(**where)
+        if not loaded:
+            return loaded
+        profile, version = loaded
+        with self._lock:
+            self._store(profile, version, invalidations)
+        return profile
+
+    def by_id(self, user_id):
+        """Profile for a user id, False if there is no such user, None if the database is unavailable"""
+        with self._lock:
+            invalidations = self._invalidations
+        profile = self._current(user_id)
+        with self._lock:
+            self._stats['hits' if profile else 'misses'] += 1
+        if profile:
+            return profile
+        return self._fill(invalidations, user_id=user_id)
+
+    def by_email(self, email):
+        """Profile for an email address, with the same return values as by_id()"""
+        with self._lock:
+            invalidations = self._invalidations
+            user_id = self._emails.get(email)
+        profile = self._current(user_id)
+        with self._lock:
+            self._stats['hits' if profile else 'misses'] += 1
+        if profile:
+            return profile
+        return self._fill(invalidations, email=email)
+
+    def invalidate(self, user_id=None, email=None):
+        """Forget a user's cached profile, by id and/or email"""
+        with self._lock:
+            self._invalidations += 1
+            if user_id is not None:
+                self._drop(user_id)
+            if email is not None and email in self._emails:
+                self._drop(self._emails[email])
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._profiles)
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['hit_rate'] = round(snapshot['hits'] / lookups, 4) if lookups else None
+        snapshot['max_entries'] = self.max_entries
+        return snapshot
+
+
+profile_cache = ProfileCache()
+
+
+def _profile_lookups():
+    stats = profile_cache.stats()
+    return {(outcome,): stats[outcome] for outcome in ('hits', 'misses')}
+
+
+registry.register(Gauge('profile_cache_lookups', 'User profile cache lookups by outcome', _profile_lookups,
+                        ('outcome',)))
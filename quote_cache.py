@@ -0,0 +1,224 @@
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+from mysql.connector import Error
+
+from database import get_db_connection
+
+
+# Category multipliers for each student situation (see app._quote_situation);
+# unlisted categories keep weight 1 and no situation means uniform picks
+SITUATION_WEIGHTS = {
+    'behind': {'Procrastination': 6, 'Action': 4, 'Consistency': 2},
+    'struggling': {'Belief': 4, 'Growth': 4, 'Learning': 2, 'Motivation': 2},
+    'steady': {'Consistency': 4, 'Achievement': 3, 'Growth': 2},
+}
+
+# Quotes a user saw recently are not shown again
+HISTORY_SIZE = 20
+MAX_DRAWS = 8
+
+
+def quote_hash(quote_text, author):
+    """Content hash used to deduplicate quotes (case and whitespace insensitive)"""
+    normalized = ' '.join(quote_text.split()).lower() + '\x1f' + ' '.join((author or '').split()).lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def build_alias(weights):
+    """Vose alias table for sampling index i with probability weights[i] / sum(weights)"""
+    count = len(weights)
+    total = float(sum(weights))
+    scaled = [weight * count / total for weight in weights]
+    probability = [1.0] * count
+    alias = list(range(count))
+    small = [i for i, value in enumerate(scaled) if value < 1.0]
+    large = [i for i, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return probability, alias
+
+
+def alias_sample(table, rng=random):
+    probability, alias = table
+    index = rng.randrange(len(probability))
+    return index if rng.random() < probability[index] else alias[index]
+
+
+class _QuotePool:
+    """Active quotes grouped by category, with one category alias table per situation"""
+
+    def __init__(self, by_category):
+        self.by_category = by_category
+        self.categories = sorted(by_category)
+        self.size = sum(len(quotes) for quotes in by_category.values())
+        # A category's weight is its quote count times the situation multiplier,
+        # so each quote keeps its multiplier however many quotes share a category
+        self.tables = {None: build_alias([len(by_category[c]) for c in self.categories])}
+        for situation, multipliers in SITUATION_WEIGHTS.items():
+            self.tables[situation] = build_alias(
+                [len(by_category[c]) * multipliers.get(c, 1) for c in self.categories])
+
+    def sample(self, situation=None):
+        category = self.categories[alias_sample(self.tables.get(situation, self.tables[None]))]
+        return random.choice(self.by_category[category])
+
+    def with_quote(self, quote):
+        """Copy of the pool with one more quote; only the small category tables are rebuilt"""
+        by_category = dict(self.by_category)
+        by_category[quote['category']] = by_category.get(quote['category'], []) + [quote]
+        return _QuotePool(by_category)
+
+
+class QuoteCache:
+    """In-process cache of active motivation quotes for O(1) weighted random picks"""
+
+    def __init__(self, ttl=300, max_users=10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._pool = None
+        self._history = OrderedDict()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def is_fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def invalidate(self):
+        """Drop cached quotes so the next pick reloads them"""
+        with self._lock:
+            self._loaded_at = None
+
+    def refresh(self):
+        """Load every active quote in one query; returns False on failure"""
+        connection = get_db_connection()
+        if connection is None:
+            return False
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id, quote_text, author, category
+                FROM motivation_quotes
+                WHERE is_active = TRUE
+            """)
+            quotes = cursor.fetchall()
+            cursor.close()
+        except Error as e:
+            print(f"Error loading quotes: {e}")
+            return False
+        finally:
+            connection.close()
+
+        by_category = {}
+        for quote in quotes:
+            by_category.setdefault(quote['category'], []).append(quote)
+        with self._lock:
+            self._pool = _QuotePool(by_category) if quotes else None
+            self._loaded_at = time.monotonic()
+        return True
+
+    def add(self, quote):
+        """Make a newly inserted quote (id, quote_text, author, category) eligible at once"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool = self._pool.with_quote(quote)
+
+    def _recent(self, user_id):
+        history = self._history.get(user_id)
+        if history is None:
+            history = self._history[user_id] = deque(maxlen=HISTORY_SIZE)
+            while len(self._history) > self.max_users:
+                self._history.popitem(last=False)
+        else:
+            self._history.move_to_end(user_id)
+        return history
+
+    def random_quote(self, user_id=None, situation=None):
+        """Return a random cached quote, reloading the cache if it is stale.
+
+        Categories are weighted for the user's situation (a SITUATION_WEIGHTS
+        key) and quotes the user saw recently are skipped.
+        """
+        if not self.is_fresh():
+            # Only one request reloads; the others keep serving stale quotes
+            if self._refresh_lock.acquire(blocking=self._pool is None):
+                try:
+                    if not self.is_fresh():
+                        self.refresh()
+                finally:
+                    self._refresh_lock.release()
+
+        pool = self._pool
+        if pool is None:
+            return fetch_random_quote()
+        quote = pool.sample(situation)
+        if user_id is None:
+            return dict(quote)
+
+        with self._lock:
+            history = self._recent(user_id)
+            # Never remember more than half the pool, or repeats become unavoidable
+            recent = list(history)[-(pool.size // 2):] if pool.size > 1 else []
+            for _ in range(MAX_DRAWS):
+                if quote['id'] not in recent:
+                    break
+                quote = pool.sample(situation)
+            history.append(quote['id'])
+        return dict(quote)
+
+
+def fetch_random_quote():
+    """Pick a random active quote straight from the database by random id"""
+    try:
+        connection = get_db_connection()
+        if connection is None:
+            return None
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            # Separate subqueries so each bound is a single index probe
+            cursor.execute("""
+                SELECT (SELECT MIN(id) FROM motivation_quotes) AS min_id,
+                       (SELECT MAX(id) FROM motivation_quotes) AS max_id
+            """)
+            bounds = cursor.fetchone()
+            quote = None
+            if bounds and bounds['min_id'] is not None:
+                pivot = random.randint(bounds['min_id'], bounds['max_id'])
+                cursor.execute("""
+                    SELECT id, quote_text, author, category
+                    FROM motivation_quotes
+                    WHERE is_active = TRUE AND id >= %s
+                    ORDER BY id
+                    LIMIT 1
+                """, (pivot,))
+                quote = cursor.fetchone()
+                if quote is None:
+                    # Wrap around when the pivot lands past the last active quote
+                    cursor.execute("""
+                        SELECT id, quote_text, author, category
+                        FROM motivation_quotes
+                        WHERE is_active = TRUE
+                        ORDER BY id
+                        LIMIT 1
+                    """)
+                    quote = cursor.fetchone()
+        finally:
+            cursor.close()
+            connection.close()
+        return quote
+
+    except Error as e:
+        print(f"Error fetching quote: {e}")
+        return None
+
+
+quote_cache = QuoteCache()
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from multiprocessing import Pool
+
+from mysql.connector import Error
+
+import config
+import database
+from database import get_db_connection
+from scheduler import generate_timetable, TimetableError
+
+DEFAULT_CHECKPOINT = 'regenerate_timetables.checkpoint.json'
+INSERT_BATCH_ROWS = 5000
+
+insert_session_query = """
+INSERT INTO user_timetable (user_id, day_of_week, time_slot, subject_name, task_type, duration_minutes, priority)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def load_checkpoint(path):
+    """Return the last user id written by a previous run, or 0"""
+    try:
+        with open(path) as f:
+            return json.load(f)['last_user_id']
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def save_checkpoint(path, last_user_id):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'last_user_id': last_user_id, 'updated_at': time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+def iter_user_chunks(cursor, start_after, chunk_size):
+    """Yield lists of (user_id, study_time, subjects) in id order, chunk by chunk"""
+    last_id = start_after
+    while True:
+        cursor.execute("""
+            SELECT id, study_time
+            FROM users
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+        """, (last_id, chunk_size))
+        users = cursor.fetchall()
+        if not users:
+            return
+
+        ids = [row['id'] for row in users]
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(f"""
+            SELECT user_id, subject_name, confidence_level
+            FROM user_subjects
+            WHERE user_id IN ({placeholders})
+        """, ids)
+        subjects = {user_id: {} for user_id in ids}
+        for row in cursor.fetchall():
+            subjects[row['user_id']][row['subject_name']] = row['confidence_level']
+
+        yield [(row['id'], row['study_time'], subjects[row['id']]) for row in users]
+        last_id = ids[-1]
+
+
+def generate_chunk(chunk, preferred_study_times, days_per_subject):
+    """Worker: build timetable rows for every user in a chunk.
+
+    Returns (every user id in the chunk, ids of the users rebuilt, rows).
+    Users without subjects or with an unschedulable plan are left out of
+    the rebuilt ids so their current timetable is kept.
+    """
+    rebuilt = []
+    rows = []
+    for user_id, study_time, subjects in chunk:
+        if not subjects:
+            continue
+        try:
+            hours = min(max(float(study_time or 4), 1), 12)
+        except (TypeError, ValueError):
+            hours = 4
+        try:
+            sessions = generate_timetable(subjects, hours, preferred_study_times, days_per_subject)
+        except TimetableError:
+            continue
+        rebuilt.append(user_id)
+        for entry in sessions:
+            rows.append((user_id, entry['day_of_week'], entry['time_slot'], entry['subject_name'],
+                         entry['task_type'], entry['duration_minutes'], entry['priority']))
+    return [user_id for user_id, _, _ in chunk], rebuilt, rows
+
+
+def write_chunk(connection, user_ids, rows):
+    """Replace the timetables of the given users in one transaction"""
+    if not user_ids:
+        return
+    cursor = connection.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        cursor.execute(f"DELETE FROM user_timetable WHERE user_id IN ({placeholders})", user_ids)
+        # executemany() sends INSERTs as multi-row VALUES statements
+        for start in range(0, len(rows), INSERT_BATCH_ROWS):
+            cursor.executemany(insert_session_query, rows[start:start + INSERT_BATCH_ROWS])
+        connection.commit()
+    except Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def regenerate_timetables(chunk_size=500, processes=None, checkpoint=DEFAULT_CHECKPOINT, resume=True,
+                          preferred_study_times=('Morning', 'Evening'), days_per_subject=2):
+    """Regenerate every user's timetable, fanning generation out to a process pool"""
+    start_after = load_checkpoint(checkpoint) if resume else 0
+    if start_after:
+        print(f"Resuming after user id {start_after}")
+
+    read_connection = get_db_connection()
+    if read_connection is None:
+        print("Failed to connect to database")
+        return
+    write_connection = get_db_connection()
+    if write_connection is None:
+        read_connection.close()
+        print("Failed to connect to database")
+        return
+
+    processes = processes or os.cpu_count()
+    users_done = 0
+    users_rebuilt = 0
+    rows_written = 0
+    started = time.perf_counter()
+    try:
+        cursor = read_connection.cursor(dictionary=True)
+        with Pool(processes) as pool:
+            # Keep a bounded number of chunks in flight and write them back
+            # in id order so the checkpoint is always a safe resume point.
+            pending = deque()
+            chunks = iter_user_chunks(cursor, start_after, chunk_size)
+            while True:
+                while len(pending) < processes * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.append(pool.apply_async(
+                        generate_chunk, (chunk, list(preferred_study_times), days_per_subject)))
+                if not pending:
+                    break
+
+                user_ids, rebuilt, rows = pending.popleft().get()
+                write_chunk(write_connection, rebuilt, rows)
+                save_checkpoint(checkpoint, user_ids[-1])
+
+                users_done += len(user_ids)
+                users_rebuilt += len(rebuilt)
+                rows_written += len(rows)
+                elapsed = time.perf_counter() - started
+                print(f"{users_done} users, {rows_written} sessions "
+                      f"({users_done / elapsed:.0f} users/sec)")
+        cursor.close()
+
+    except Error as e:
+        print(f"Error regenerating timetables: {e}")
+        return
+    finally:
+        read_connection.close()
+        write_connection.close()
+
+    elapsed = time.perf_counter() - started
+    rate = users_done / elapsed if elapsed else 0
+    print(f"Regenerated {users_rebuilt} timetables in {elapsed:.1f}s ({rate:.0f} users/sec); "
+          f"kept {users_done - users_rebuilt} without subjects or a valid plan")
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate every user's study timetable")
+    parser.add_argument('--chunk-size', type=int, default=500, help='users per chunk/transaction')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='checkpoint file for resuming')
+    parser.add_argument('--restart', action='store_true', help='ignore any existing checkpoint')
+    parser.add_argument('--study-times', nargs='+', default=['Morning', 'Evening'],
+                        choices=['Morning', 'Afternoon', 'Evening'])
+    parser.add_argument('--days-per-subject', type=int, default=2)
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help='overrides DB_BACKEND')
+    parser.add_argument('--sqlite-path', help='overrides SQLITE_PATH')
+    args = parser.parse_args()
+
+    database.configure(config.load(), backend=args.backend, sqlite_path=args.sqlite_path)
+
+    regenerate_timetables(chunk_size=args.chunk_size, processes=args.processes, checkpoint=args.checkpoint,
+                          resume=not args.restart, preferred_study_times=args.study_times,
+                          days_per_subject=args.days_per_subject)
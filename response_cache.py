@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, json, request
+
+import data_versions
+from metrics import Gauge, registry
+
+
+class ResponseCache:
+    """Bounded LRU of serialized JSON responses keyed by data version counters.
+
+    Write routes bump the version of each scope they change, e.g.
+    ('subjects', user_id) or ('quotes',); a cached body is only reused while
+    every scope it was built from still has the same version. The counters
+    live in the database (data_versions.py), so a write handled by one
+    worker invalidates every worker's copies; checking them is one primary
+    key read per request instead of the full query. Entries also expire
+    after `ttl` seconds to pick up writes made outside the app
+    (import_quotes.py, manual SQL).
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'evictions': 0}
+
+    def bump(self, *scopes):
+        """Invalidate every cached response built from these scopes, in every worker"""
+        data_versions.bump(*scopes)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[2] >= self.ttl:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def respond(self, name, scopes, loader, private=False):
+        """Return a conditional JSON response for `name`, calling loader() only on a miss.
+
+        loader() returns the payload dict to cache, or an error response
+        which is passed through uncached.
+        """
+        # Read versions before loading so a concurrent write is never cached
+        # under the version it bumped to.
+        versions = data_versions.current(scopes)
+        key = (name, versions)
+
+        entry = self._get(key) if versions is not None else None
+        if entry is None:
+            payload = loader()
+            if not isinstance(payload, dict):
+                return payload
+            body = json.dumps(payload).encode('utf-8') + b'\n'
+            # Strong ETag from the content, so it survives restarts and expiry
+            entry = (body, hashlib.sha1(body).hexdigest(), time.monotonic())
+            if versions is not None:
+                self._put(key, entry)
+
+        body, etag, _ = entry
+        if request.if_none_match.contains(etag):
+            with self._lock:
+                self._stats['not_modified'] += 1
+            response = Response(status=304)
+            response.set_etag(etag)
+        else:
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag)
+        # Clients must revalidate, which costs a 304 at most
+        response.headers['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+        return response
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._entries)
+        snapshot['max_entries'] = self.max_entries
+        return snapshot
+
+
+response_cache = ResponseCache()
+
+
+def _cache_requests():
+    stats = response_cache.stats()
+    return {(outcome,): stats[outcome] for outcome in ('hits', 'misses', 'not_modified')}
+
+
+registry.register(Gauge('response_cache_requests', 'Cached JSON responses by outcome', _cache_requests, ('outcome',)))
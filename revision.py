@@ -0,0 +1,290 @@
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from mysql.connector import Error, IntegrityError
+
+from database import get_db_connection
+
+# SM-2 easiness factor bounds; new subjects start between them by confidence
+MIN_EASINESS = 1.3
+MAX_SEED_EASINESS = 2.5
+
+# Review grades, as in SM-2: below PASSING_QUALITY restarts the intervals
+MIN_QUALITY = 0
+MAX_QUALITY = 5
+PASSING_QUALITY = 3
+# Tries at a review whose row another worker keeps changing
+REVIEW_ATTEMPTS = 3
+
+
+def sm2(easiness, interval_days, repetitions, quality):
+    """Apply one SM-2 review; returns (easiness, interval_days, repetitions)"""
+    if quality < PASSING_QUALITY:
+        repetitions = 0
+        interval_days = 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(1, round(interval_days * easiness))
+        repetitions += 1
+    miss = MAX_QUALITY - quality
+    easiness = max(MIN_EASINESS, easiness + 0.1 - miss * (0.08 + miss * 0.02))
+    return easiness, interval_days, repetitions
+
+
+def seed_easiness(confidence_level):
+    """Starting easiness for a subject nobody has reviewed yet (confidence 1-10)"""
+    confidence = min(10, max(1, confidence_level))
+    return MIN_EASINESS + (confidence - 1) / 9 * (MAX_SEED_EASINESS - MIN_EASINESS)
+
+
+class RevisionItem:
+    """SM-2 state of one subject for one user"""
+
+    __slots__ = ('subject_name', 'confidence_level', 'easiness', 'interval_days', 'repetitions',
+                 'due_at', 'last_reviewed_at')
+
+    def __init__(self, subject_name, confidence_level, easiness, interval_days, repetitions, due_at,
+                 last_reviewed_at=None):
+        self.subject_name = subject_name
+        self.confidence_level = confidence_level
+        self.easiness = easiness
+        self.interval_days = interval_days
+        self.repetitions = repetitions
+        self.due_at = due_at
+        self.last_reviewed_at = last_reviewed_at
+
+    def to_dict(self, now=None):
+        now = now or datetime.now()
+        return {
+            'subject_name': self.subject_name,
+            'confidence_level': self.confidence_level,
+            'easiness': round(self.easiness, 2),
+            'interval_days': self.interval_days,
+            'repetitions': self.repetitions,
+            'due_at': self.due_at.isoformat(),
+            'last_reviewed_at': self.last_reviewed_at.isoformat() if self.last_reviewed_at else None,
+            'due': self.due_at <= now,
+        }
+
+
+class RevisionQueue:
+    """One user's revision items in a min-heap ordered by due time, then easiness.
+
+    Updates push a new heap entry and leave the old one behind; stale
+    entries are skipped when they reach the top, so both next() and
+    update() are O(log n).
+    """
+
+    def __init__(self, items):
+        self._counter = itertools.count()
+        self._entries = {}
+        for item in items:
+            self._entries[item.subject_name] = self._entry(item)
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
+        self._items = {item.subject_name: item for item in items}
+
+    def _entry(self, item):
+        # Harder subjects (lower easiness) win ties on the due time
+        return (item.due_at, item.easiness, next(self._counter), item.subject_name)
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, subject_name):
+        return self._items.get(subject_name)
+
+    def next(self):
+        """Return the item to study next without removing it"""
+        heap = self._heap
+        while heap:
+            entry = heap[0]
+            if self._entries.get(entry[3]) is entry:
+                return self._items[entry[3]]
+            heapq.heappop(heap)
+        return None
+
+    def upcoming(self, limit):
+        """Return up to `limit` items in study order"""
+        entries = heapq.nsmallest(limit, self._entries.values())
+        return [self._items[entry[3]] for entry in entries]
+
+    def update(self, item):
+        entry = self._entry(item)
+        self._items[item.subject_name] = item
+        self._entries[item.subject_name] = entry
+        heapq.heappush(self._heap, entry)
+        # Drop stale entries once they outnumber the live ones
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+
+
+class RevisionScheduler:
+    """Per-user revision queues kept in memory, loaded from the database on first use.
+
+    Bounded by max_users (least recently used queues are dropped and
+    reloaded later). Call invalidate() after a user's subjects change.
+    """
+
+    def __init__(self, max_users=10000):
+        self.max_users = max_users
+        self._queues = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._queues.pop(user_id, None)
+
+    def load(self, user_id, now=None):
+        """Build a user's queue in one query; returns None if the database is unavailable"""
+        now = (now or datetime.now()).replace(microsecond=0)
+        connection = get_db_connection()
+        if connection is None:
+            return None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT s.subject_name, s.confidence_level, r.easiness, r.interval_days,
+                       r.repetitions, r.due_at, r.last_reviewed_at
+                FROM user_subjects s
+                LEFT JOIN revision_items r
+                    ON r.user_id = s.user_id AND r.subject_name = s.subject_name
+                WHERE s.user_id = %s
+            """, (user_id,))
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+
+        items = []
+        for row in rows:
+            if row['easiness'] is None:
+                # Never reviewed: due now, weakest subjects first
+                items.append(RevisionItem(row['subject_name'], row['confidence_level'],
+                                          seed_easiness(row['confidence_level']), 0, 0, now))
+            else:
+                items.append(RevisionItem(row['subject_name'], row['confidence_level'], row['easiness'],
+                                          row['interval_days'], row['repetitions'], row['due_at'],
+                                          row['last_reviewed_at']))
+        return RevisionQueue(items)
+
+    def queue_for(self, user_id):
+        with self._lock:
+            queue = self._queues.get(user_id)
+            if queue is not None:
+                self._queues.move_to_end(user_id)
+                return queue
+
+        queue = self.load(user_id)
+        if queue is None:
+            return None
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep the first one
+            queue = self._queues.setdefault(user_id, queue)
+            self._queues.move_to_end(user_id)
+            while len(self._queues) > self.max_users:
+                self._queues.popitem(last=False)
+        return queue
+
+    def peek(self, user_id):
+        """Next item if the user's queue is already in memory; never queries the database"""
+        with self._lock:
+            queue = self._queues.get(user_id)
+            return queue.next() if queue is not None else None
+
+    def next_items(self, user_id, limit=1):
+        """Return up to `limit` items to study next, or None if the database is unavailable"""
+        queue = self.queue_for(user_id)
+        if queue is None:
+            return None
+        with self._lock:
+            if limit == 1:
+                item = queue.next()
+                return [item] if item else []
+            return queue.upcoming(limit)
+
+    def review(self, user_id, subject_name, quality, now=None):
+        """Record a finished revision session and reschedule the subject.
+
+        SM-2 is applied to the stored row, not this process's copy, and
+        the row is only written if nobody changed it meanwhile (another
+        worker may hold its own queue for the user); on a conflict the
+        review is retried on the newer row. Returns the updated item,
+        False for a subject the user does not have, or None if the
+        database is unavailable.
+        """
+        now = (now or datetime.now()).replace(microsecond=0)
+        queue = self.queue_for(user_id)
+        if queue is None:
+            return None
+        with self._lock:
+            item = queue.get(subject_name)
+        if item is None:
+            return False
+
+        connection = get_db_connection()
+        if connection is None:
+            return None
+        cursor = connection.cursor()
+        try:
+            for _ in range(REVIEW_ATTEMPTS):
+                cursor.execute("""
+                    SELECT easiness, interval_days, repetitions
+                    FROM revision_items
+                    WHERE user_id = %s AND subject_name = %s
+                """, (user_id, subject_name))
+                stored = cursor.fetchone()
+                exists = stored is not None
+                if not exists:
+                    stored = (seed_easiness(item.confidence_level), 0, 0)
+                easiness, interval_days, repetitions = sm2(*stored, quality)
+                updated = RevisionItem(subject_name, item.confidence_level, easiness, interval_days, repetitions,
+                                       now + timedelta(days=interval_days), now)
+                if not exists:
+                    try:
+                        cursor.execute("""
+                            INSERT INTO revision_items
+                                (user_id, subject_name, easiness, interval_days, repetitions, due_at,
+                                 last_reviewed_at)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s)
+                        """, (user_id, subject_name, easiness, interval_days, repetitions, updated.due_at, now))
+                    except IntegrityError:
+                        connection.rollback()
+                        continue  # Another worker stored the first review; apply this one on top
+                else:
+                    cursor.execute("""
+                        UPDATE revision_items
+                        SET easiness = %s, interval_days = %s, repetitions = %s, due_at = %s,
+                            last_reviewed_at = %s
+                        WHERE user_id = %s AND subject_name = %s
+                            AND easiness = %s AND interval_days = %s AND repetitions = %s
+                    """, (easiness, interval_days, repetitions, updated.due_at, now,
+                          user_id, subject_name) + tuple(stored))
+                    if cursor.rowcount != 1:
+                        connection.rollback()
+                        continue
+                connection.commit()
+                break
+            else:
+                raise Error(msg=f"Revision of {subject_name} kept changing underneath the review")
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+        with self._lock:
+            queue.update(updated)
+        return updated
+
+
+revision_scheduler = RevisionScheduler()
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# The nine time slots rendered by timetable.html, grouped by period, with
+# the longest session that fits before the next slot starts.
+TIME_SLOTS = {
+    'Morning': [('09:00:00', 90), ('10:30:00', 90), ('12:00:00', 90)],
+    'Afternoon': [('14:00:00', 90), ('15:30:00', 90), ('17:00:00', 60)],
+    'Evening': [('18:00:00', 90), ('19:30:00', 90), ('21:00:00', 90)],
+}
+
+MIN_SESSION_MINUTES = 30
+MAX_CONFIDENCE = 10
+
+# Task rotation per confidence band: weak subjects are mostly learnt,
+# strong subjects are mostly practised and revised.
+TASK_CYCLES = {
+    'High': ('Study', 'Practice', 'Study', 'Revision'),
+    'Medium': ('Study', 'Practice', 'Revision'),
+    'Low': ('Practice', 'Revision'),
+}
+
+PRIORITY_ORDER = {'High': 0, 'Medium': 1, 'Low': 2}
+
+
+class TimetableError(ValueError):
+    """Raised when timetable settings are invalid"""
+
+
+def priority_for(confidence):
+    """Map a 1-10 confidence level to a session priority"""
+    if confidence <= 4:
+        return 'High'
+    if confidence <= 7:
+        return 'Medium'
+    return 'Low'
+
+
+def daily_slots(study_hours_per_day, preferred_study_times):
+    """Return the (time_slot, duration_minutes) sessions studied each day"""
+    periods = [TIME_SLOTS[period] for period in TIME_SLOTS if period in preferred_study_times]
+
+    # Take slots round-robin so every preferred period gets used
+    slots = []
+    for position in range(max(len(period) for period in periods)):
+        for period in periods:
+            if position < len(period):
+                slots.append(period[position])
+
+    remaining = int(study_hours_per_day * 60)
+    sessions = []
+    for time_slot, slot_minutes in slots:
+        if remaining < MIN_SESSION_MINUTES:
+            break
+        duration = min(remaining, slot_minutes)
+        sessions.append((time_slot, duration))
+        remaining -= duration
+    sessions.sort()
+    return sessions
+
+
+def allocate_sessions(subjects, total_sessions, days_per_subject):
+    """Decide how many weekly sessions each subject gets.
+
+    Every subject gets days_per_subject sessions when there is room, and the
+    remaining sessions go to subjects in proportion to their weakness
+    (largest remainder). If there is not enough room, weaker subjects are
+    served first.
+    """
+    # Weakest first; ties broken by name so output is deterministic
+    ordered = sorted(subjects.items(), key=lambda item: (item[1], item[0]))
+    counts = {name: 0 for name, _ in ordered}
+
+    base = min(days_per_subject, len(DAYS_OF_WEEK))
+    if base * len(ordered) >= total_sessions:
+        left = total_sessions
+        for _ in range(base):
+            for name, _ in ordered:
+                if left == 0:
+                    return counts
+                counts[name] += 1
+                left -= 1
+        return counts
+
+    for name in counts:
+        counts[name] = base
+    extra = total_sessions - base * len(ordered)
+
+    weights = [(name, MAX_CONFIDENCE + 1 - confidence) for name, confidence in ordered]
+    total_weight = sum(weight for _, weight in weights)
+    remainders = []
+    assigned = 0
+    for name, weight in weights:
+        share, remainder = divmod(extra * weight, total_weight)
+        counts[name] += share
+        assigned += share
+        remainders.append((-remainder, name))
+    remainders.sort()
+    for _, name in remainders[:extra - assigned]:
+        counts[name] += 1
+    return counts
+
+
+def _prepare(subjects, study_hours_per_day, preferred_study_times, days_per_subject):
+    """Validate plan inputs; returns (subjects with clamped levels, daily slots)"""
+    if not subjects:
+        raise TimetableError('No subjects to schedule')
+    if not 1 <= study_hours_per_day <= 12:
+        raise TimetableError('study_hours_per_day must be between 1 and 12')
+    if not 1 <= days_per_subject <= len(DAYS_OF_WEEK):
+        raise TimetableError('days_per_subject must be between 1 and 7')
+    unknown = set(preferred_study_times) - set(TIME_SLOTS)
+    if unknown or not preferred_study_times:
+        raise TimetableError('preferred_study_times must be Morning, Afternoon and/or Evening')
+
+    subjects = {name: min(max(int(level), 1), MAX_CONFIDENCE) for name, level in subjects.items()}
+    day_slots = daily_slots(study_hours_per_day, preferred_study_times)
+    if not day_slots:
+        raise TimetableError('Not enough study time for a single session')
+    return subjects, day_slots
+
+
+def plan_key(subjects, study_hours_per_day=4, preferred_study_times=('Morning', 'Evening'), days_per_subject=2):
+    """Hash of every input that shapes a plan; equal keys mean identical plans"""
+    payload = json.dumps([
+        sorted((name, int(level)) for name, level in subjects.items()),
+        study_hours_per_day,
+        sorted(set(preferred_study_times)),
+        days_per_subject,
+    ])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _place(day_plan, free, subjects, counts):
+    """Spread each subject's sessions evenly over the days with free slots.
+
+    Days that do not already contain the subject are preferred. Appends
+    sort keys to day_plan and decrements free.
+    """
+    num_days = len(DAYS_OF_WEEK)
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], subjects[item[0]], item[0]))
+    for index, (name, count) in enumerate(ordered):
+        if count == 0:
+            continue
+        confidence = subjects[name]
+        priority = priority_for(confidence)
+        cycle = TASK_CYCLES[priority]
+        seen = [0] * num_days
+        start = (index * 3) % num_days
+        for i in range(count):
+            ideal = (start + i * num_days // count) % num_days
+            best_day = None
+            best_key = None
+            for offset in range(num_days):
+                day = (ideal + offset) % num_days
+                if free[day] == 0:
+                    continue
+                key = (seen[day], offset)
+                if best_key is None or key < best_key:
+                    best_day, best_key = day, key
+                    if key[0] == 0:
+                        break
+            free[best_day] -= 1
+            seen[best_day] += 1
+            day_plan[best_day].append((PRIORITY_ORDER[priority], confidence, name, cycle[i % len(cycle)], priority))
+
+
+def _session(day, time_slot, duration, placed):
+    _, _, name, task_type, priority = placed
+    return {
+        'day_of_week': DAYS_OF_WEEK[day],
+        'time_slot': time_slot,
+        'subject_name': name,
+        'task_type': task_type,
+        'duration_minutes': duration,
+        'priority': priority,
+    }
+
+
+def generate_timetable(subjects, study_hours_per_day=4, preferred_study_times=('Morning', 'Evening'),
+                       days_per_subject=2):
+    """Build a weekly plan from {subject_name: confidence_level}.
+
+    Returns a list of sessions with day_of_week, time_slot, subject_name,
+    task_type, duration_minutes and priority, in the shape timetable.html
+    renders.
+    """
+    subjects, day_slots = _prepare(subjects, study_hours_per_day, preferred_study_times, days_per_subject)
+    slots_per_day = len(day_slots)
+    num_days = len(DAYS_OF_WEEK)
+    counts = allocate_sessions(subjects, slots_per_day * num_days, days_per_subject)
+
+    free = [slots_per_day] * num_days
+    day_plan = [[] for _ in range(num_days)]
+    _place(day_plan, free, subjects, counts)
+
+    # Within a day the most urgent subjects take the earliest slots
+    timetable = []
+    for day, sessions in enumerate(day_plan):
+        sessions.sort()
+        for (time_slot, duration), placed in zip(day_slots, sessions):
+            timetable.append(_session(day, time_slot, duration, placed))
+    return timetable
+
+
+def replan_timetable(timetable, subjects, study_hours_per_day=4,
+                     preferred_study_times=('Morning', 'Evening'), days_per_subject=2):
+    """Update a plan made by generate_timetable() after its subjects changed.
+
+    Only subjects whose session count or priority changed (plus added and
+    removed ones) are taken out and re-placed in the freed slots; every
+    other session keeps its day and time. Returns (timetable, changed
+    subject names), or (generate_timetable(...), None) when the old plan
+    does not match the slot grid of these settings.
+
+    Planning costs about as much as generate_timetable(); what it saves is
+    churn, since fewer slots end up holding a different session (see
+    diff_timetable()).
+    """
+    subjects, day_slots = _prepare(subjects, study_hours_per_day, preferred_study_times, days_per_subject)
+    num_days = len(DAYS_OF_WEEK)
+    grid = {(day, time_slot): duration for day in DAYS_OF_WEEK for time_slot, duration in day_slots}
+    placed = {(entry['day_of_week'], entry['time_slot']): entry for entry in timetable}
+    if len(placed) != len(timetable) or len(placed) != len(grid) or any(
+            grid.get(position) != entry['duration_minutes'] for position, entry in placed.items()):
+        return generate_timetable(subjects, study_hours_per_day, preferred_study_times, days_per_subject), None
+
+    counts = allocate_sessions(subjects, len(grid), days_per_subject)
+    previous_counts = Counter(entry['subject_name'] for entry in timetable)
+    previous_priority = {entry['subject_name']: entry['priority'] for entry in timetable}
+    changed = set()
+    for name in set(counts) | set(previous_counts):
+        count = counts.get(name, 0)
+        if count != previous_counts.get(name, 0):
+            changed.add(name)
+        elif count and previous_priority[name] != priority_for(subjects[name]):
+            # Same number of sessions, but a different task rotation
+            changed.add(name)
+
+    kept = {position: entry for position, entry in placed.items() if entry['subject_name'] not in changed}
+    free = [len(day_slots)] * num_days
+    for day_name, _ in kept:
+        free[DAYS_OF_WEEK.index(day_name)] -= 1
+    day_plan = [[] for _ in range(num_days)]
+    _place(day_plan, free, subjects, {name: counts[name] for name in changed if counts.get(name)})
+
+    # Re-placed sessions fill the freed slots of each day, most urgent first
+    result = []
+    for day, sessions in enumerate(day_plan):
+        sessions.sort()
+        fresh = iter(sessions)
+        for time_slot, duration in day_slots:
+            entry = kept.get((DAYS_OF_WEEK[day], time_slot))
+            result.append(entry or _session(day, time_slot, duration, next(fresh)))
+    return result, changed
+
+
+def diff_timetable(stored, timetable):
+    """Compare stored rows (dicts with an id) with a new plan slot by slot.
+
+    Returns (updates, inserts, deletes): (row id, session) pairs for slots
+    now holding a different session, sessions for slots with no row yet,
+    and ids of rows in slots the plan no longer uses.
+    """
+    by_slot = {}
+    deletes = []
+    for row in stored:
+        position = (row['day_of_week'], row['time_slot'])
+        if position in by_slot:
+            deletes.append(row['id'])
+        else:
+            by_slot[position] = row
+
+    updates = []
+    inserts = []
+    for entry in timetable:
+        row = by_slot.pop((entry['day_of_week'], entry['time_slot']), None)
+        if row is None:
+            inserts.append(entry)
+        elif any(row[column] != value for column, value in entry.items()):
+            updates.append((row['id'], entry))
+    deletes.extend(row['id'] for row in by_slot.values())
+    return updates, inserts, deletes
+
+
+class TimetablePlanCache:
+    """Last plan built for each user with the inputs it came from (bounded LRU).
+
+    Plans are dicts with key (plan_key() of the inputs), settings and
+    sessions; they are the base replan_timetable() updates.
+    """
+
+    def __init__(self, max_users=10000):
+        self.max_users = max_users
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            plan = self._plans.get(user_id)
+            if plan is not None:
+                self._plans.move_to_end(user_id)
+            return plan
+
+    def put(self, user_id, plan):
+        with self._lock:
+            self._plans[user_id] = plan
+            self._plans.move_to_end(user_id)
+            while len(self._plans) > self.max_users:
+                self._plans.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._plans.pop(user_id, None)
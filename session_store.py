@@ -0,0 +1,237 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session whose data lives in a store; the cookie only holds its id"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.regenerated = False
+
+    def regenerate(self):
+        """Move the session to a fresh id when it is saved (on login and logout, against fixation)"""
+        self.regenerated = True
+        self.modified = True
+
+
+class MemorySessionStore:
+    """Bounded in-process LRU session store with per-entry expiry (single node)"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def get(self, sid):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            data, expires = entry
+            if expires <= now:
+                del self._data[sid]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._data.move_to_end(sid)
+            self._stats['hits'] += 1
+            return dict(data)
+
+    def set(self, sid, data, ttl):
+        with self._lock:
+            self._data[sid] = (dict(data), time.time() + ttl)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._data)
+        snapshot['max_entries'] = self.max_entries
+        return snapshot
+
+
+class SQLiteSessionStore:
+    """Session store in a local SQLite file, shared by every worker on a host"""
+
+    def __init__(self, path='sessions.sqlite3', max_entries=100000, purge_every=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._serializer = TaggedJSONSerializer()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires REAL NOT NULL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires)")
+
+    def _connection(self):
+        # One connection per thread and process; sqlite handles must not cross a fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def get(self, sid):
+        row = self._connection().execute(
+            "SELECT data, expires FROM sessions WHERE sid = ?", (sid,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        if row[1] <= time.time():
+            self.delete(sid)
+            self._count('expired')
+            self._count('misses')
+            return None
+        self._count('hits')
+        return self._serializer.loads(row[0])
+
+    def set(self, sid, data, ttl):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)",
+            (sid, self._serializer.dumps(dict(data)), time.time() + ttl))
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge()
+
+    def delete(self, sid):
+        self._connection().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def purge(self):
+        """Drop expired sessions, then the soonest-expiring ones above max_entries"""
+        connection = self._connection()
+        expired = connection.execute("DELETE FROM sessions WHERE expires <= ?", (time.time(),)).rowcount
+        evicted = connection.execute("""
+            DELETE FROM sessions WHERE sid IN (
+                SELECT sid FROM sessions ORDER BY expires
+                LIMIT MAX((SELECT COUNT(*) FROM sessions) - ?, 0)
+            )
+        """, (self.max_entries,)).rowcount
+        self._count('expired', expired)
+        self._count('evictions', evicted)
+
+    def stats(self):
+        entries = self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['entries'] = entries
+        snapshot['max_entries'] = self.max_entries
+        return snapshot
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that keeps session data in a server-side store"""
+
+    session_class = ServerSideSession
+
+    def __init__(self, store, ttl=86400):
+        self.store = store
+        # Lifetime of non-permanent sessions; permanent ones use
+        # app.permanent_session_lifetime
+        self.ttl = ttl
+
+    def _new_sid(self):
+        return secrets.token_urlsafe(32)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return self.session_class(data, sid=sid)
+        return self.session_class(sid=self._new_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.regenerated:
+            # The old id (possibly planted by someone else) stops working
+            self.store.delete(session.sid)
+            session.sid = self._new_sid()
+            session.regenerated = False
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not session.modified and not session.new:
+            return
+
+        if session.permanent:
+            ttl = int(app.permanent_session_lifetime.total_seconds())
+        else:
+            ttl = self.ttl
+        self.store.set(session.sid, session, ttl)
+
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def stats(self):
+        return self.store.stats()
+
+
+def create_session_interface(backend='memory', **options):
+    """Build a session interface for the 'memory' or 'sqlite' backend"""
+    ttl = options.pop('ttl', 86400)
+    if backend == 'memory':
+        store = MemorySessionStore(**options)
+    elif backend == 'sqlite':
+        store = SQLiteSessionStore(**options)
+    else:
+        raise ValueError(f"Unknown session backend: {backend}")
+    return ServerSideSessionInterface(store, ttl=ttl)
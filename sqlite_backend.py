@@ -0,0 +1,148 @@
+import re
+import sqlite3
+from datetime import datetime
+
+from mysql.connector import errorcode, errors
+
+# Statements are prepared once per connection and reused from this cache
+STATEMENT_CACHE_SIZE = 256
+
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",        # Readers never block the writer
+    "PRAGMA synchronous=NORMAL",      # Durable at checkpoints; safe with WAL
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",       # 16 MB page cache per connection
+    "PRAGMA mmap_size=134217728",     # Memory-map up to 128 MB of the file
+    "PRAGMA busy_timeout=5000",
+]
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_converter('TIMESTAMP', _parse_timestamp)
+sqlite3.register_converter('DATETIME', _parse_timestamp)
+sqlite3.register_converter('BOOLEAN', lambda value: value not in (b'0', b''))
+
+
+def _translate_error(e):
+    """Map sqlite3 errors onto the mysql.connector types the routes catch"""
+    if isinstance(e, sqlite3.IntegrityError):
+        message = str(e)
+        errno = errorcode.ER_DUP_ENTRY if 'UNIQUE' in message else None
+        return errors.IntegrityError(msg=message, errno=errno)
+    if isinstance(e, sqlite3.OperationalError):
+        return errors.OperationalError(msg=str(e))
+    return errors.DatabaseError(msg=str(e))
+
+
+class SQLiteCursor:
+    """Cursor with the subset of the mysql.connector cursor API used by the app"""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, operation, params=()):
+        try:
+            self._cursor.execute(_PLACEHOLDER.sub('?', operation), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def executemany(self, operation, seq_params):
+        try:
+            self._cursor.executemany(_PLACEHOLDER.sub('?', operation), seq_params)
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        if not self._dictionary:
+            return rows
+        names = [column[0] for column in self._cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if not self._dictionary:
+            return rows
+        names = [column[0] for column in self._cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Embedded SQLite connection that quacks like a mysql.connector connection"""
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,  # Pooled connections move between threads
+        )
+        for pragma in PRAGMAS:
+            self._connection.execute(pragma)
+        self._open = True
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return SQLiteCursor(self._connection.cursor(), dictionary=dictionary)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def ping(self, reconnect=False):
+        try:
+            self._connection.execute("SELECT 1")
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def is_connected(self):
+        return self._open
+
+    def close(self):
+        self._open = False
+        self._connection.close()
+
+
+def connect(path):
+    return SQLiteConnection(path)
+
+
+def upsert_clause(conflict_columns, update_columns):
+    return 'ON CONFLICT ({}) DO UPDATE SET {}'.format(
+        ', '.join(conflict_columns),
+        ', '.join(f"{column} = excluded.{column}" for column in update_columns))
+
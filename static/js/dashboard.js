@@ -0,0 +1,70 @@
+// Simple interactive elements
+document.addEventListener('DOMContentLoaded', function() {
+  // Add hover effects to stat cards
+  const statCards = document.querySelectorAll('.stat-card');
+  statCards.forEach(card => {
+    card.addEventListener('mouseenter', function() {
+      this.style.transform = 'translateY(-5px)';
+    });
+
+    card.addEventListener('mouseleave', function() {
+      this.style.transform = 'translateY(0)';
+    });
+  });
+
+  // Add active state to nav items
+  const navItems = document.querySelectorAll('.nav-item');
+  navItems.forEach(item => {
+    item.addEventListener('click', function(e) {
+      e.preventDefault();
+      navItems.forEach(i => i.classList.remove('active'));
+      this.classList.add('active');
+    });
+  });
+
+  // Refresh quote functionality
+  const refreshButton = document.getElementById('refreshQuote');
+  const quoteElement = document.getElementById('motivationQuote');
+
+  refreshButton.addEventListener('click', function() {
+    // Show loading state
+    quoteElement.classList.add('loading');
+    refreshButton.disabled = true;
+
+    // Fetch new random quote
+    fetch('/api/random-quote')
+      .then(response => response.json())
+      .then(data => {
+        if (data.success) {
+          const quote = data.quote;
+          quoteElement.innerHTML = `
+            <span class="quote-category">${quote.category}</span>
+            "${quote.quote_text}"
+            <div class="quote-author">- ${quote.author}</div>
+          `;
+        } else {
+          quoteElement.innerHTML = `
+            "Failed to load quote. Please try again."
+            <div class="quote-author">- System</div>
+          `;
+        }
+      })
+      .catch(error => {
+        console.error('Error fetching quote:', error);
+        quoteElement.innerHTML = `
+          "Error loading quote. Please try again."
+          <div class="quote-author">- System</div>
+        `;
+      })
+      .finally(() => {
+        // Remove loading state
+        quoteElement.classList.remove('loading');
+        refreshButton.disabled = false;
+      });
+  });
+
+  // Auto-refresh quote every 30 minutes
+  setInterval(() => {
+    refreshButton.click();
+  }, 30 * 60 * 1000);
+});
@@ -0,0 +1,97 @@
+// Redirect functions
+function redirectToLogin() {
+    window.location.href = '/login';
+}
+
+function redirectToSignup() {
+    window.location.href = '/create';
+}
+
+// Header scroll effect
+const header = document.getElementById('header');
+window.addEventListener('scroll', () => {
+    if (window.scrollY > 50) {
+        header.classList.add('scrolled');
+    } else {
+        header.classList.remove('scrolled');
+    }
+});
+
+// Create floating particles
+const particlesContainer = document.getElementById('particles');
+const colors = ['#6C63FF', '#36D1DC', '#FF6584'];
+
+for (let i = 0; i < 30; i++) {
+    const particle = document.createElement('div');
+    particle.classList.add('particle');
+
+    const size = Math.random() * 8 + 3;
+    particle.style.width = `${size}px`;
+    particle.style.height = `${size}px`;
+
+    particle.style.left = `${Math.random() * 100}%`;
+    particle.style.top = `${Math.random() * 100}%`;
+
+    particle.style.background = colors[Math.floor(Math.random() * colors.length)];
+    particle.style.animationDuration = `${Math.random() * 15 + 10}s`;
+    particle.style.animationDelay = `${Math.random() * 5}s`;
+
+    particlesContainer.appendChild(particle);
+}
+
+// Animate stats on scroll
+const observerOptions = {
+    threshold: 0.5
+};
+
+const statsObserver = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            entry.target.classList.add('visible');
+            const statNumbers = entry.target.querySelectorAll('[data-target]');
+            statNumbers.forEach(stat => {
+                const target = parseInt(stat.getAttribute('data-target'));
+                animateNumber(stat, target);
+            });
+            statsObserver.unobserve(entry.target);
+        }
+    });
+}, observerOptions);
+
+document.querySelectorAll('.stat-item').forEach(item => {
+    statsObserver.observe(item);
+});
+
+function animateNumber(element, target) {
+    const duration = 2000;
+    const start = 0;
+    const increment = target / (duration / 16);
+    let current = start;
+
+    const timer = setInterval(() => {
+        current += increment;
+        if (current >= target) {
+            element.textContent = target.toLocaleString();
+            clearInterval(timer);
+        } else {
+            element.textContent = Math.floor(current).toLocaleString();
+        }
+    }, 16);
+}
+
+// Button interactions
+document.querySelectorAll('.btn').forEach(button => {
+    button.addEventListener('click', function() {
+        this.style.transform = 'scale(0.95)';
+        setTimeout(() => {
+            this.style.transform = '';
+        }, 100);
+    });
+});
+
+// Animate floating cards on load
+window.addEventListener('load', () => {
+    document.querySelectorAll('.floating-card').forEach(card => {
+        card.style.opacity = '1';
+    });
+});
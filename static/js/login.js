@@ -0,0 +1,135 @@
+const form = document.getElementById('loginForm');
+const submitBtn = document.getElementById('submitBtn');
+const successMessage = document.getElementById('successMessage');
+
+// Clear error messages when user starts typing
+document.querySelectorAll('input').forEach(input => {
+    input.addEventListener('input', function() {
+        hideError(this.name);
+    });
+});
+
+function showError(field, message) {
+    const errorElement = document.getElementById(field + 'Error');
+    if (errorElement) {
+        errorElement.textContent = message;
+        errorElement.style.display = 'block';
+    }
+}
+
+function hideError(field) {
+    const errorElement = document.getElementById(field + 'Error');
+    if (errorElement) {
+        errorElement.style.display = 'none';
+    }
+}
+
+function showLoading() {
+    submitBtn.textContent = 'Signing In...';
+    submitBtn.classList.add('loading');
+}
+
+function hideLoading() {
+    submitBtn.textContent = 'Sign In';
+    submitBtn.classList.remove('loading');
+}
+
+function showSuccess(message) {
+    successMessage.textContent = message;
+    successMessage.style.display = 'block';
+    setTimeout(() => {
+        successMessage.style.display = 'none';
+    }, 3000);
+}
+
+form.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    // Clear previous errors
+    document.querySelectorAll('.error-message').forEach(error => {
+        error.style.display = 'none';
+    });
+
+    // Basic validation
+    let isValid = true;
+
+    const email = document.getElementById('email').value.trim();
+    const password = document.getElementById('password').value;
+    const remember = document.getElementById('remember').checked;
+
+    if (!email) {
+        showError('email', 'Please enter your email address');
+        isValid = false;
+    } else if (!/\S+@\S+\.\S+/.test(email)) {
+        showError('email', 'Please enter a valid email address');
+        isValid = false;
+    }
+
+    if (!password) {
+        showError('password', 'Please enter your password');
+        isValid = false;
+    }
+
+    if (!isValid) return;
+
+    // Prepare form data
+    const formData = new FormData();
+    formData.append('email', email);
+    formData.append('password', password);
+    formData.append('remember', remember);
+
+    // Show loading state
+    showLoading();
+
+    // Send data to Flask backend
+    fetch('/login', {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showSuccess(data.message);
+            // Redirect to dashboard after successful login
+            setTimeout(() => {
+                window.location.href = data.redirect_url || '/dashboard';
+            }, 1000);
+        } else {
+            if (data.error.includes('Invalid email')) {
+                showError('email', data.error);
+            } else if (data.error.includes('Invalid password')) {
+                showError('password', data.error);
+            } else {
+                alert('Error: ' + data.error);
+            }
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('An error occurred while signing in. Please try again.');
+    })
+    .finally(() => {
+        hideLoading();
+    });
+});
+
+function loginWithGoogle() {
+    fetch('/api/google-login', {
+        method: 'POST'
+    })
+    .then(response => response.json())
+    .then(data => {
+        console.log('Google login response:', data);
+        alert('Google Login: ' + data.message);
+    })
+    .catch(error => {
+        console.error('Google login error:', error);
+        alert('Google Login is currently unavailable. Please use the form below.');
+    });
+}
+
+// Check if there's a success message in URL parameters (for redirects from signup)
+const urlParams = new URLSearchParams(window.location.search);
+if (urlParams.get('signup') === 'success') {
+    showSuccess('Account created successfully! Please sign in.');
+}
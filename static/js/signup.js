@@ -1,110 +1,282 @@
-// Update study time slider value display
+const gradeRadios = document.querySelectorAll('input[name="grade"]');
+const streamGroup = document.getElementById('streamGroup');
+const examGroup = document.getElementById('examGroup');
 const studyTimeSlider = document.getElementById('studyTime');
-const studyTimeValue = document.getElementById('studyTimeValue');
+const timeValue = document.getElementById('timeValue');
+const form = document.getElementById('signupForm');
+const submitBtn = document.getElementById('submitBtn');
+const successMessage = document.getElementById('successMessage');
+const subjectsContainer = document.getElementById('subjectsContainer');
 
+// Subject lists for different grades and streams
+const subjectLists = {
+    '9': ['Mathematics', 'Science', 'Social Studies', 'English', 'Hindi', 'Artificial Intelligence'],
+    '10': ['Mathematics', 'Science', 'Social Studies', 'English', 'Hindi', 'Artificial Intelligence'],
+    '11': {
+        'Science': ['Physics', 'Chemistry', 'Mathematics', 'Biology', 'English', 'Computer Science'],
+        'Commerce': ['Accountancy', 'Business Studies', 'Economics', 'Mathematics', 'English', 'Computer Science'],
+        'Arts': ['History', 'Political Science', 'Geography', 'Economics', 'Psychology', 'English']
+    },
+    '12': {
+        'Science': ['Physics', 'Chemistry', 'Mathematics', 'Biology', 'English', 'Computer Science'],
+        'Commerce': ['Accountancy', 'Business Studies', 'Economics', 'Mathematics', 'English', 'Computer Science'],
+        'Arts': ['History', 'Political Science', 'Geography', 'Economics', 'Psychology', 'English']
+    }
+};
+
+// Update slider value display
 studyTimeSlider.addEventListener('input', function() {
-    studyTimeValue.textContent = this.value;
+    timeValue.textContent = this.value;
 });
 
-// Form validation
-const signupForm = document.getElementById('signupForm');
+// Show/hide stream and exam options based on grade
+gradeRadios.forEach(radio => {
+    radio.addEventListener('change', function() {
+        const grade = this.value;
 
-signupForm.addEventListener('submit', function(e) {
-    e.preventDefault();
-    
-    // Get form values
-    const firstName = document.getElementById('firstName').value.trim();
-    const lastName = document.getElementById('lastName').value.trim();
-    const email = document.getElementById('email').value.trim();
-    const password = document.getElementById('password').value;
-    const selectedClass = document.querySelector('input[name="class"]:checked');
-    const selectedBoard = document.querySelector('input[name="exam_board"]:checked');
-    const termsChecked = document.querySelector('input[name="terms"]:checked');
-    
-    // Validation
-    if (!firstName || !lastName) {
-        showAlert('Please enter your full name', 'error');
-        return;
-    }
-    
-    if (!email || !validateEmail(email)) {
-        showAlert('Please enter a valid email address', 'error');
-        return;
-    }
-    
-    if (password.length < 6) {
-        showAlert('Password must be at least 6 characters long', 'error');
-        return;
+        // Reset stream selection when grade changes
+        document.querySelectorAll('input[name="stream"]').forEach(streamRadio => {
+            streamRadio.checked = false;
+        });
+
+        if (grade === '11' || grade === '12') {
+            streamGroup.classList.remove('hidden');
+            examGroup.classList.remove('hidden');
+            // Clear subjects until stream is selected
+            subjectsContainer.innerHTML = '<div class="confidence-instruction">Please select your stream first</div>';
+        } else {
+            streamGroup.classList.add('hidden');
+            examGroup.classList.add('hidden');
+            document.querySelectorAll('input[name="exams"]').forEach(checkbox => {
+                checkbox.checked = false;
+            });
+            // Update subjects for 9th/10th grade
+            updateSubjects(grade);
+        }
+    });
+});
+
+// Update subjects when stream is selected for 11th/12th
+document.querySelectorAll('input[name="stream"]').forEach(streamRadio => {
+    streamRadio.addEventListener('change', function() {
+        const grade = document.querySelector('input[name="grade"]:checked');
+        if (grade && (grade.value === '11' || grade.value === '12')) {
+            updateSubjects(grade.value, this.value);
+        }
+    });
+});
+
+// Function to update subjects based on selected grade and stream
+function updateSubjects(grade, stream = null) {
+    subjectsContainer.innerHTML = '';
+    let subjects = [];
+
+    if (grade === '9' || grade === '10') {
+        subjects = subjectLists[grade] || [];
+    } else if ((grade === '11' || grade === '12') && stream) {
+        subjects = subjectLists[grade][stream] || [];
     }
-    
-    if (!selectedClass) {
-        showAlert('Please select your current grade', 'error');
+
+    if (subjects.length === 0) {
+        subjectsContainer.innerHTML = '<div class="confidence-instruction">Please select your grade and stream first</div>';
         return;
     }
-    
-    if (!selectedBoard) {
-        showAlert('Please select your exam board', 'error');
-        return;
+
+    subjects.forEach(subject => {
+        const subjectItem = document.createElement('div');
+        subjectItem.className = 'subject-item';
+        subjectItem.innerHTML = `
+            <div class="subject-name">${subject}</div>
+            <input type="range" class="confidence-slider"
+                   name="confidence_${subject.toLowerCase().replace(' ', '_')}"
+                   min="1" max="10" value="5"
+                   oninput="updateConfidenceValue(this)">
+            <div class="confidence-value">5</div>
+        `;
+        subjectsContainer.appendChild(subjectItem);
+    });
+}
+
+// Update confidence value display
+function updateConfidenceValue(slider) {
+    const valueDisplay = slider.nextElementSibling;
+    valueDisplay.textContent = slider.value;
+}
+
+// Clear error messages when user starts typing
+document.querySelectorAll('input, textarea').forEach(input => {
+    input.addEventListener('input', function() {
+        hideError(this.name);
+    });
+});
+
+function showError(field, message) {
+    const errorElement = document.getElementById(field + 'Error');
+    if (errorElement) {
+        errorElement.textContent = message;
+        errorElement.style.display = 'block';
     }
-    
-    if (!termsChecked) {
-        showAlert('Please agree to the Terms of Service and Privacy Policy', 'error');
-        return;
+}
+
+function hideError(field) {
+    const errorElement = document.getElementById(field + 'Error');
+    if (errorElement) {
+        errorElement.style.display = 'none';
     }
-    
-    // If validation passes, submit the form
-    this.submit();
-});
+}
 
-// Email validation function
-function validateEmail(email) {
-    const re = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
-    return re.test(email);
+function showLoading() {
+    submitBtn.textContent = 'Creating Account...';
+    submitBtn.classList.add('loading');
 }
 
-// Show alert function
-function showAlert(message, type) {
-    const flashContainer = document.querySelector('.flash-messages') || createFlashContainer();
-    
-    const alertDiv = document.createElement('div');
-    alertDiv.className = `alert alert-${type}`;
-    alertDiv.textContent = message;
-    
-    flashContainer.appendChild(alertDiv);
-    
-    // Remove alert after 5 seconds
+function hideLoading() {
+    submitBtn.textContent = 'Create Account';
+    submitBtn.classList.remove('loading');
+}
+
+function showSuccess(message) {
+    successMessage.textContent = message;
+    successMessage.style.display = 'block';
     setTimeout(() => {
-        alertDiv.style.opacity = '0';
-        setTimeout(() => alertDiv.remove(), 300);
+        successMessage.style.display = 'none';
     }, 5000);
 }
 
-function createFlashContainer() {
-    const container = document.createElement('div');
-    container.className = 'flash-messages';
-    document.body.appendChild(container);
-    return container;
-}
+form.addEventListener('submit', function(e) {
+    e.preventDefault();
 
-// Social login buttons (placeholder functionality)
-const googleBtn = document.querySelector('.google-btn');
-const facebookBtn = document.querySelector('.facebook-btn');
+    // Clear previous errors
+    document.querySelectorAll('.error-message').forEach(error => {
+        error.style.display = 'none';
+    });
 
-googleBtn.addEventListener('click', function() {
-    showAlert('Google sign-up is coming soon!', 'warning');
-});
+    // Basic validation
+    let isValid = true;
+
+    const name = document.getElementById('name').value.trim();
+    const email = document.getElementById('email').value.trim();
+    const password = document.getElementById('password').value;
+    const grade = document.querySelector('input[name="grade"]:checked');
+    const stream = document.querySelector('input[name="stream"]:checked');
+
+    if (!name) {
+        showError('name', 'Please enter your full name');
+        isValid = false;
+    }
+
+    if (!email) {
+        showError('email', 'Please enter your email address');
+        isValid = false;
+    } else if (!/\S+@\S+\.\S+/.test(email)) {
+        showError('email', 'Please enter a valid email address');
+        isValid = false;
+    }
+
+    if (!password) {
+        showError('password', 'Please create a password');
+        isValid = false;
+    } else if (password.length < 6) {
+        showError('password', 'Password must be at least 6 characters long');
+        isValid = false;
+    }
+
+    if (!grade) {
+        showError('grade', 'Please select your grade');
+        isValid = false;
+    }
 
-facebookBtn.addEventListener('click', function() {
-    showAlert('Facebook sign-up is coming soon!', 'warning');
+    // Validate stream for 11th/12th grade
+    if ((grade.value === '11' || grade.value === '12') && !stream) {
+        showError('stream', 'Please select your stream');
+        isValid = false;
+    }
+
+    if (!isValid) return;
+
+    // Prepare form data
+    const formData = new FormData();
+    formData.append('name', name);
+    formData.append('email', email);
+    formData.append('password', password);
+    formData.append('grade', grade.value);
+    formData.append('studyTime', document.getElementById('studyTime').value);
+    formData.append('hobbies', document.getElementById('hobbies').value.trim());
+
+    // Add stream if selected
+    if (stream) {
+        formData.append('stream', stream.value);
+    }
+
+    // Add subjects data
+    const subjectsData = {};
+    document.querySelectorAll('.subject-item').forEach(item => {
+        const subjectName = item.querySelector('.subject-name').textContent;
+        const confidenceLevel = item.querySelector('.confidence-slider').value;
+        subjectsData[subjectName] = parseInt(confidenceLevel);
+    });
+    formData.append('subjects', JSON.stringify(subjectsData));
+
+    const selectedGrade = grade.value;
+    if (selectedGrade === '11' || selectedGrade === '12') {
+        document.querySelectorAll('input[name="exams"]:checked').forEach(checkbox => {
+            formData.append('exams', checkbox.value);
+        });
+    }
+
+    // Show loading state
+    showLoading();
+
+    // Send data to Flask backend
+    fetch('/signup', {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showSuccess(data.message);
+            form.reset();
+            // Reset slider display
+            timeValue.textContent = '4';
+            // Hide groups
+            streamGroup.classList.add('hidden');
+            examGroup.classList.add('hidden');
+            // Reset subjects
+            updateSubjects('9');
+        } else {
+            if (data.error.includes('Email already exists')) {
+                showError('email', data.error);
+            } else {
+                alert('Error: ' + data.error);
+            }
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('An error occurred while creating your account. Please try again.');
+    })
+    .finally(() => {
+        hideLoading();
+    });
 });
 
-// Auto-hide flash messages
-document.addEventListener('DOMContentLoaded', function() {
-    const alerts = document.querySelectorAll('.alert');
-    alerts.forEach(alert => {
-        setTimeout(() => {
-            alert.style.opacity = '0';
-            setTimeout(() => alert.remove(), 300);
-        }, 5000);
+function signupWithGoogle() {
+    fetch('/api/google-signup', {
+        method: 'POST'
+    })
+    .then(response => response.json())
+    .then(data => {
+        console.log('Google signup response:', data);
+        alert('Google Sign-up: ' + data.message);
+    })
+    .catch(error => {
+        console.error('Google signup error:', error);
+        alert('Google Sign-up is currently unavailable. Please use the form below.');
     });
-});
\ No newline at end of file
+}
+
+// Initialize with default subjects for 9th grade
+document.addEventListener('DOMContentLoaded', function() {
+    updateSubjects('9');
+});
@@ -0,0 +1,262 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize user info
+    initializeUserInfo();
+
+    // Load timetable
+    loadTimetable();
+
+    // Event listeners
+    document.getElementById('generate-btn').addEventListener('click', generateTimetable);
+    document.getElementById('refresh-btn').addEventListener('click', loadTimetable);
+    document.getElementById('clear-btn').addEventListener('click', clearTimetable);
+
+    // Initialize multiple select
+    initializeMultiSelect();
+});
+
+function initializeUserInfo() {
+    // Set by timetable.html from the session
+    const userName = window.currentUser.name;
+    const userGrade = window.currentUser.grade;
+    const userAvatar = window.currentUser.name.toUpperCase().charAt(0);
+
+    document.getElementById('user-name').textContent = userName;
+    document.getElementById('user-grade').textContent = `Grade ${userGrade}`;
+    document.getElementById('user-avatar').textContent = userAvatar;
+}
+
+function initializeMultiSelect() {
+    const select = document.getElementById('study-times');
+    // Ensure at least one option is selected
+    if (select.selectedOptions.length === 0) {
+        select.options[0].selected = true;
+    }
+}
+
+async function generateTimetable() {
+    const studyHours = document.getElementById('study-hours').value;
+    const studyTimesSelect = document.getElementById('study-times');
+    const daysPerSubject = document.getElementById('days-per-subject').value;
+
+    // Get selected study times
+    const preferredStudyTimes = Array.from(studyTimesSelect.selectedOptions).map(option => option.value);
+
+    if (preferredStudyTimes.length === 0) {
+        alert('Please select at least one preferred study time');
+        return;
+    }
+
+    // Show loading
+    showLoading(true);
+
+    try {
+        const response = await fetch('/api/generate-timetable', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                study_hours_per_day: parseInt(studyHours),
+                preferred_study_times: preferredStudyTimes,
+                days_per_subject: parseInt(daysPerSubject)
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showNotification('Timetable generated successfully!', 'success');
+            await loadTimetable();
+        } else {
+            throw new Error(data.error || 'Failed to generate timetable');
+        }
+    } catch (error) {
+        console.error('Error generating timetable:', error);
+        showNotification('Error generating timetable: ' + error.message, 'error');
+    } finally {
+        showLoading(false);
+    }
+}
+
+async function loadTimetable() {
+    showLoading(true);
+
+    try {
+        const response = await fetch('/api/timetable');
+        const data = await response.json();
+
+        if (data.success) {
+            renderTimetable(data.timetable);
+            document.getElementById('timetable-info').textContent =
+                `${data.timetable.length} study sessions scheduled`;
+        } else {
+            throw new Error(data.error || 'Failed to load timetable');
+        }
+    } catch (error) {
+        console.error('Error loading timetable:', error);
+        renderTimetable([]);
+        document.getElementById('timetable-info').textContent = 'Error loading timetable';
+    } finally {
+        showLoading(false);
+    }
+}
+
+async function clearTimetable() {
+    if (!confirm('Are you sure you want to clear your timetable? This action cannot be undone.')) {
+        return;
+    }
+
+    showLoading(true);
+
+    try {
+        const response = await fetch('/api/clear-timetable', {
+            method: 'POST'
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showNotification('Timetable cleared successfully!', 'success');
+            renderTimetable([]);
+            document.getElementById('timetable-info').textContent = 'No timetable generated yet';
+        } else {
+            throw new Error(data.error || 'Failed to clear timetable');
+        }
+    } catch (error) {
+        console.error('Error clearing timetable:', error);
+        showNotification('Error clearing timetable: ' + error.message, 'error');
+    } finally {
+        showLoading(false);
+    }
+}
+
+function renderTimetable(timetableData) {
+    const timetableBody = document.getElementById('timetable-body');
+    timetableBody.innerHTML = '';
+
+    // Define time slots for the day
+    const timeSlots = [
+        '09:00:00', '10:30:00', '12:00:00',
+        '14:00:00', '15:30:00', '17:00:00',
+        '18:00:00', '19:30:00', '21:00:00'
+    ];
+
+    const daysOfWeek = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'];
+
+    // Create rows for each time slot
+    timeSlots.forEach(timeSlot => {
+        const row = document.createElement('tr');
+
+        // Time column
+        const timeCell = document.createElement('td');
+        const [hours, minutes] = timeSlot.split(':');
+        const timeDisplay = `${parseInt(hours) % 12 || 12}:${minutes} ${hours >= 12 ? 'PM' : 'AM'}`;
+        timeCell.innerHTML = `<div class="time-slot">${timeDisplay}</div>`;
+        row.appendChild(timeCell);
+
+        // Create cells for each day
+        daysOfWeek.forEach(day => {
+            const cell = document.createElement('td');
+
+            // Find sessions for this day and time
+            const sessions = timetableData.filter(slot =>
+                slot.day_of_week === day && slot.time_slot === timeSlot
+            );
+
+            if (sessions.length > 0) {
+                sessions.forEach(session => {
+                    const sessionDiv = document.createElement('div');
+                    sessionDiv.className = `timetable-session priority-${session.priority.toLowerCase()}`;
+                    sessionDiv.style.padding = '10px';
+                    sessionDiv.style.marginBottom = '5px';
+                    sessionDiv.style.borderRadius = '8px';
+                    sessionDiv.style.background = 'var(--soft-gray)';
+
+                    sessionDiv.innerHTML = `
+                        <div class="subject-badge">${session.subject_name}</div>
+                        <div class="task-type">
+                            <i class="fas fa-${getTaskIcon(session.task_type)}"></i>
+                            ${session.task_type} • ${session.duration_minutes}min
+                        </div>
+                        <div style="font-size: 11px; color: var(--text-light); margin-top: 4px;">
+                            Priority: ${session.priority}
+                        </div>
+                    `;
+
+                    cell.appendChild(sessionDiv);
+                });
+            } else {
+                cell.innerHTML = '<div style="color: var(--text-light); font-style: italic; text-align: center;">-</div>';
+            }
+
+            row.appendChild(cell);
+        });
+
+        timetableBody.appendChild(row);
+    });
+}
+
+function getTaskIcon(taskType) {
+    const icons = {
+        'Study': 'book',
+        'Revision': 'sync',
+        'Practice': 'pen',
+        'Break': 'coffee'
+    };
+    return icons[taskType] || 'book';
+}
+
+function showLoading(show) {
+    document.getElementById('loading').style.display = show ? 'block' : 'none';
+}
+
+function showNotification(message, type) {
+    // Create notification element
+    const notification = document.createElement('div');
+    notification.style.cssText = `
+        position: fixed;
+        top: 20px;
+        right: 20px;
+        padding: 15px 20px;
+        border-radius: 10px;
+        color: white;
+        font-weight: 600;
+        z-index: 1000;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+        transition: all 0.3s ease;
+    `;
+
+    if (type === 'success') {
+        notification.style.background = 'var(--success)';
+    } else {
+        notification.style.background = 'var(--danger)';
+    }
+
+    notification.textContent = message;
+    document.body.appendChild(notification);
+
+    // Remove notification after 3 seconds
+    setTimeout(() => {
+        notification.style.opacity = '0';
+        notification.style.transform = 'translateX(100px)';
+        setTimeout(() => {
+            document.body.removeChild(notification);
+        }, 300);
+    }, 3000);
+}
+
+// Keyboard shortcuts
+document.addEventListener('keydown', function(e) {
+    if (e.ctrlKey || e.metaKey) {
+        switch(e.key) {
+            case 'g':
+                e.preventDefault();
+                document.getElementById('generate-btn').click();
+                break;
+            case 'r':
+                e.preventDefault();
+                document.getElementById('refresh-btn').click();
+                break;
+        }
+    }
+});
@@ -0,0 +1,74 @@
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import database
+import migrate
+
+# app.py configures itself on import; these beat anything in a local .env
+os.environ['SESSION_BACKEND'] = 'sqlite'
+os.environ['SESSION_PATH'] = os.path.join(tempfile.mkdtemp(), 'sessions.sqlite3')
+os.environ['WARMUP'] = '0'
+
+_emails = itertools.count(1)
+
+
+def use_sqlite(path):
+    """Point database.py at a fresh SQLite file and migrate it"""
+    database.db_backend = 'sqlite'
+    database.sqlite_config['path'] = str(path)
+    if database._pool is not None:
+        database._pool.dispose()
+    database._pool = None
+    assert migrate.upgrade()
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The configured app on a migrated SQLite database shared by the whole run"""
+    from app import app as flask_app
+    flask_app.config['TESTING'] = True
+    # Every test client shares one address; test_admission.py covers the limits
+    flask_app.extensions['admission'].enabled = False
+    use_sqlite(tmp_path_factory.mktemp('db') / 'study_planner.sqlite3')
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(client):
+    """Sign up a user with a unique email; returns (user_id, email, password)"""
+    def make_user(subjects=None, grade='10', stream=None):
+        email = f"student{next(_emails)}@example.com"
+        response = client.post('/signup', data={
+            'name': 'Student',
+            'email': email,
+            'password': 'secret',
+            'grade': grade,
+            'stream': stream or '',
+            'studyTime': '4',
+            'subjects': json.dumps(subjects or {'Maths': 3, 'Physics': 6}),
+        })
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()['user_id'], email, 'secret'
+    return make_user
+
+
+@pytest.fixture
+def logged_in(client, make_user):
+    """A client logged in as a new user; returns the user's id"""
+    user_id, email, password = make_user()
+    response = client.post('/login', data={'email': email, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return user_id
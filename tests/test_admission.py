@@ -0,0 +1,106 @@
+import threading
+
+from flask import Flask, Response
+from flask.sessions import SecureCookieSessionInterface
+
+from admission import AdmissionControl, TokenBuckets, uses_database
+
+
+def make_app(**settings):
+    app = Flask(__name__)
+    admission = AdmissionControl(**dict({'max_concurrent': 1, 'queue_timeout': 0.01}, **settings))
+    admission.init_app(app)
+    entered = threading.Event()
+    release = threading.Event()
+
+    @app.route('/page')
+    def page():
+        return 'page'
+
+    @app.route('/query')
+    @uses_database
+    def query():
+        return 'rows'
+
+    @app.route('/slow')
+    @uses_database
+    def slow():
+        entered.set()
+        release.wait(5)
+        return 'rows'
+
+    @app.route('/export')
+    @uses_database
+    def export():
+        def generate():
+            yield 'first\n'
+            yield 'second\n'
+        return Response(generate(), mimetype='text/plain')
+
+    return app, admission, entered, release
+
+
+def test_token_bucket_refills_at_its_rate():
+    buckets = TokenBuckets(rate=2, burst=2)
+    assert buckets.take('client') == 0
+    assert buckets.take('client') == 0
+    wait = buckets.take('client')
+    assert 0 < wait <= 0.5
+
+
+def test_empty_bucket_answers_429_with_retry_after():
+    app, admission, _, _ = make_app(client_rate=0.1, client_burst=2)
+    client = app.test_client()
+    assert client.get('/page').status_code == 200
+    assert client.get('/page').status_code == 200
+    response = client.get('/page')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '10'
+    assert admission.stats()['rate_limited'] == 1
+
+
+def test_only_database_views_take_slots():
+    app, admission, entered, release = make_app()
+    client = app.test_client()
+    # Servers close every response; the test client only does when buffered
+    worker = threading.Thread(target=client.get, args=('/slow',), kwargs={'buffered': True})
+    worker.start()
+    assert entered.wait(5)
+    try:
+        assert admission.stats()['in_flight'] == 1
+        assert client.get('/page').status_code == 200
+        response = client.get('/query')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        release.set()
+        worker.join()
+    assert admission.stats()['in_flight'] == 0
+    assert client.get('/query', buffered=True).status_code == 200
+
+
+def test_streamed_response_keeps_its_slot_until_closed():
+    app, admission, _, _ = make_app()
+    client = app.test_client()
+    response = client.get('/export', buffered=False)
+    assert response.status_code == 200
+    assert admission.stats()['in_flight'] == 1
+    assert client.get('/query').status_code == 503
+    assert b''.join(response.response) == b'first\nsecond\n'
+    response.close()
+    assert admission.stats()['in_flight'] == 0
+    assert client.get('/query', buffered=True).status_code == 200
+
+
+def test_slot_is_released_when_saving_the_session_fails():
+    class FailingSessions(SecureCookieSessionInterface):
+        def save_session(self, app, session, response):
+            raise RuntimeError('database is locked')
+
+    app, admission, _, _ = make_app()
+    app.secret_key = 'test'
+    app.session_interface = FailingSessions()
+    client = app.test_client()
+    for _ in range(2):
+        assert client.get('/query', buffered=True).status_code == 500
+    assert admission.stats()['in_flight'] == 0
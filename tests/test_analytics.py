@@ -0,0 +1,81 @@
+import pytest
+
+import database
+from analytics import CohortSnapshot
+
+
+def execute(sql, params=()):
+    connection = database.get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall() if sql.lstrip().upper().startswith('SELECT') else None
+        connection.commit()
+        return rows
+    finally:
+        connection.close()
+
+
+def next_id(table, ahead):
+    return (execute(f"SELECT MAX(id) FROM {table}")[0][0] or 0) + ahead
+
+
+def insert_user(user_id, grade, stream, subjects):
+    """Insert a user and subjects with chosen ids, as a slow transaction would commit them"""
+    execute("""
+        INSERT INTO users (id, name, email, password, grade, stream, study_time)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (user_id, 'Student', f'late{user_id}@example.com', 'secret', grade, stream, 4))
+    for subject_id, (name, level) in subjects:
+        execute("""
+            INSERT INTO user_subjects (id, user_id, subject_name, confidence_level)
+            VALUES (%s, %s, %s, %s)
+        """, (subject_id, user_id, name, level))
+
+
+def test_cohort_aggregates(app, make_user):
+    for level in (1, 2, 3, 4, 5):
+        make_user({'Maths': level, 'Physics': 10}, grade='9', stream='Analytics')
+    snapshot = CohortSnapshot()
+
+    maths, physics = snapshot.subject_stats('9', 'Analytics')
+    assert (maths['subject_name'], maths['students'], maths['average_confidence']) == ('Maths', 5, 3.0)
+    assert maths['percentiles'] == {'p10': 1.4, 'p25': 2.0, 'p50': 3.0, 'p75': 4.0, 'p90': 4.6}
+    assert physics['average_confidence'] == 10.0
+
+    cohort, = [c for c in snapshot.weakest_subjects(1) if (c['grade'], c['stream']) == ('9', 'Analytics')]
+    assert cohort['students'] == 5
+    assert cohort['weakest_subjects'] == [{'subject_name': 'Maths', 'students': 5, 'average_confidence': 3.0}]
+
+    month, = snapshot.trend('9', 'Analytics')
+    assert (month['students'], month['average_confidence']) == (5, 6.5)
+    assert snapshot.trend('9', 'Analytics', 'Physics')[0]['average_confidence'] == 10.0
+
+
+def test_rows_committed_below_the_last_read_id_are_picked_up(app):
+    snapshot = CohortSnapshot()
+    user_id, subject_id = next_id('users', 10), next_id('user_subjects', 10)
+    insert_user(user_id, '9', 'Early', [(subject_id, ('Maths', 6))])
+    assert snapshot.refresh()
+
+    # A transaction that took lower ids commits only now
+    insert_user(user_id - 5, '9', 'Late', [(subject_id - 5, ('Maths', 2))])
+    assert snapshot.refresh()
+    assert [s['average_confidence'] for s in snapshot.subject_stats('9', 'Late')] == [2.0]
+    assert [s['average_confidence'] for s in snapshot.subject_stats('9', 'Early')] == [6.0]
+
+
+def test_rows_of_unread_users_stay_out_of_other_cohorts(app):
+    snapshot = CohortSnapshot(commit_grace=0)
+    user_id, subject_id = next_id('users', 10), next_id('user_subjects', 10)
+    insert_user(user_id, '9', 'Known', [(subject_id, ('Maths', 6))])
+    assert snapshot.refresh()
+    # Gives up on the skipped ids straight away
+    insert_user(user_id + 10, '9', 'Known', [(subject_id + 10, ('Maths', 8))])
+    assert snapshot.refresh()
+
+    # Its user id is below every read id and no longer looked for; its subject row is read
+    insert_user(user_id - 5, '9', 'Unread', [(subject_id + 20, ('Maths', 1))])
+    assert snapshot.refresh()
+    assert snapshot.subject_stats('9', 'Known')[0]['average_confidence'] == pytest.approx(7.0)
+    assert snapshot.subject_stats('9', 'Unread') == []
@@ -0,0 +1,61 @@
+import config
+import database
+from session_store import ServerSideSessionInterface
+
+
+def test_module_level_app_is_configured(app, client):
+    import app as app_module
+    assert app_module.app is app
+    assert isinstance(app.session_interface, ServerSideSessionInterface)
+    assert 'admission' in app.extensions
+    assert client.get('/').status_code == 200
+    assert client.get('/metrics').status_code == 200
+
+
+def test_create_app_builds_a_new_app(app, monkeypatch):
+    import app as app_module
+    monkeypatch.setenv('WARMUP', '0')
+    other = app_module.create_app()
+    assert other is not app
+    assert other.extensions['admission'] is not app.extensions['admission']
+    assert other.session_interface is not app.session_interface
+    assert sorted(rule.endpoint for rule in other.url_map.iter_rules()) == \
+        sorted(rule.endpoint for rule in app.url_map.iter_rules())
+    other.config['TESTING'] = True
+    other.extensions['admission'].enabled = False
+    client = other.test_client()
+    assert client.get('/').status_code == 200
+    assert client.get('/ready').get_json()['status'] == 'ready'
+    assert client.get('/metrics').data.count(b'# TYPE admission_in_flight ') == 1
+
+
+def test_health_and_ready(client):
+    assert client.get('/health').get_json() == {'status': 'ok'}
+    assert client.get('/ready').status_code == 200
+
+
+def test_environment_wins_over_env_file(tmp_path, monkeypatch):
+    env_file = tmp_path / '.env'
+    env_file.write_text("DB_BACKEND=mysql\nDB_NAME=study_planner\nDB_POOL_SIZE=7\n")
+    monkeypatch.setenv('DB_BACKEND', 'sqlite')
+    # setenv first, so the values load() reads from .env are undone afterwards
+    for name in ('DB_NAME', 'DB_POOL_SIZE'):
+        monkeypatch.setenv(name, '')
+        monkeypatch.delenv(name)
+    settings = config.load(str(env_file))
+    assert settings['app']['db_backend'] == 'sqlite'
+    assert settings['db']['database'] == 'study_planner'
+    assert settings['pool']['pool_size'] == 7
+
+
+def test_cli_options_win_over_environment(monkeypatch):
+    monkeypatch.setattr(database, 'db_backend', database.db_backend)
+    for name in ('db_config', 'sqlite_config', 'pool_config'):
+        monkeypatch.setattr(database, name, dict(getattr(database, name)))
+    database.configure({'app': {'db_backend': 'mysql'}, 'db': {'database': 'planner'},
+                        'sqlite': {'path': 'env.sqlite3'}, 'pool': {'pool_size': 3}},
+                       backend='sqlite', sqlite_path='cli.sqlite3')
+    assert database.db_backend == 'sqlite'
+    assert database.sqlite_config['path'] == 'cli.sqlite3'
+    assert database.db_config['database'] == 'planner'
+    assert database.pool_config['pool_size'] == 3
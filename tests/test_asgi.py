@@ -0,0 +1,82 @@
+import asyncio
+
+from asgi import ASGIAdapter, FLUSH_BYTES
+
+
+def scope(path='/', method='GET', query=b'', headers=()):
+    return {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'http_version': '1.1',
+            'headers': list(headers), 'client': ('127.0.0.1', 50000), 'server': ('testserver', 80)}
+
+
+def call(adapter, scope, body=b''):
+    """Run one request through the adapter; returns (status, headers, [body chunks])"""
+    messages = [{'type': 'http.request', 'body': body[:3], 'more_body': True},
+                {'type': 'http.request', 'body': body[3:], 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(adapter(scope, receive, send))
+    start = sent[0]
+    return start['status'], dict(start['headers']), [message['body'] for message in sent[1:]]
+
+
+def echo(environ, start_response):
+    body = environ['wsgi.input'].read()
+    start_response('201 Created', [('Content-Type', 'text/plain'), ('X-Path', environ['PATH_INFO'])])
+    return [environ['REQUEST_METHOD'].encode(), b' ', environ['QUERY_STRING'].encode(), b' ', body]
+
+
+def test_request_and_response_pass_through():
+    adapter = ASGIAdapter(echo, max_workers=2)
+    status, headers, chunks = call(adapter, scope('/notes', 'POST', b'a=1', [(b'content-type', b'text/plain')]),
+                                   b'hello world')
+    assert status == 201
+    assert headers[b'x-path'] == b'/notes'
+    assert b''.join(chunks) == b'POST a=1 hello world'
+    assert adapter.stats()['completed'] == 1
+
+
+def test_streamed_responses_are_sent_in_chunks_and_closed():
+    closed = []
+
+    class Stream:
+        def __iter__(self):
+            for _ in range(3):
+                yield b'x' * FLUSH_BYTES
+
+        def close(self):
+            closed.append(True)
+
+    def stream(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return Stream()
+
+    status, _, chunks = call(ASGIAdapter(stream, max_workers=1), scope())
+    assert status == 200
+    assert [len(chunk) for chunk in chunks] == [FLUSH_BYTES] * 3 + [0]
+    assert closed == [True]
+
+
+def test_errors_become_500_and_a_full_queue_503():
+    def broken(environ, start_response):
+        raise RuntimeError('boom')
+
+    status, _, chunks = call(ASGIAdapter(broken, max_workers=1), scope())
+    assert (status, b''.join(chunks)) == (500, b'Internal Server Error')
+
+    adapter = ASGIAdapter(echo, max_workers=1, max_waiting=0)
+    status, headers, _ = call(adapter, scope())
+    assert status == 503
+    assert headers[b'retry-after'] == b'1'
+    assert adapter.stats()['rejected'] == 1
+
+
+def test_flask_app_is_served(app):
+    status, headers, chunks = call(ASGIAdapter(app, max_workers=1), scope('/health'))
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
@@ -0,0 +1,26 @@
+import assets
+
+
+def _build(tmp_path, monkeypatch):
+    (tmp_path / 'css').mkdir()
+    for suffix, content in (('', b'plain'), ('.gz', b'gzip'), ('.br', b'brotli')):
+        (tmp_path / 'css' / f"site.abc.css{suffix}").write_bytes(content)
+    monkeypatch.setattr(assets, 'DIST_DIR', str(tmp_path))
+
+
+def _get(client, accept_encoding):
+    response = client.get('/assets/css/site.abc.css', headers={'Accept-Encoding': accept_encoding})
+    return response.headers.get('Content-Encoding'), response.data
+
+
+def test_best_accepted_variant_is_served(client, tmp_path, monkeypatch):
+    _build(tmp_path, monkeypatch)
+    assert _get(client, 'gzip, deflate, br') == ('br', b'brotli')
+    assert _get(client, 'gzip') == ('gzip', b'gzip')
+    assert _get(client, 'identity') == (None, b'plain')
+
+
+def test_encodings_refused_with_q_zero_are_skipped(client, tmp_path, monkeypatch):
+    _build(tmp_path, monkeypatch)
+    assert _get(client, 'br;q=0, gzip') == ('gzip', b'gzip')
+    assert _get(client, 'br;q=0, gzip;q=0') == (None, b'plain')
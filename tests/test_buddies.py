@@ -0,0 +1,43 @@
+import numpy as np
+
+from buddies import BuddyIndex, HASH_BITS, _Partition
+
+
+def test_hash_ignores_vector_length_and_new_subjects():
+    partition = _Partition(np.random.default_rng(0))
+    vector = partition.vector({'Maths': 2, 'Physics': 9})
+    signature = partition.hash(vector)
+    assert (partition.hash(vector * 3) == signature).all()
+    assert (signature < 1 << HASH_BITS).all()
+    # Existing users are 0 in a new subject's dimension, so their buckets stay put
+    partition.vector({'Biology': 5})
+    assert (partition.hash(np.append(vector, 0.0)) == signature).all()
+
+
+def test_buddies_are_matched_within_the_cohort(client, make_user):
+    me, email, password = make_user({'Maths': 2, 'Physics': 9}, grade='12', stream='Buddies')
+    helper, _, _ = make_user({'Maths': 9, 'Physics': 2}, grade='12', stream='Buddies')
+    twin, _, _ = make_user({'Maths': 2, 'Physics': 8}, grade='12', stream='Buddies')
+    make_user({'Maths': 9, 'Physics': 2}, grade='11', stream='Buddies')
+    client.post('/login', data={'email': email, 'password': password})
+
+    buddies = client.get('/api/study-buddies').get_json()['buddies']
+    assert [buddy['user_id'] for buddy in buddies] == [helper, twin]
+    assert buddies[0]['can_help_you_with'] == ['Maths']
+    assert buddies[0]['you_can_help_with'] == ['Physics']
+
+    similar = client.get('/api/study-buddies?mode=similar').get_json()['buddies']
+    assert similar[0]['user_id'] == twin
+
+    # Subject updates move the user in the index without a reload
+    client.post('/api/update-subjects', json={'subjects': '{"Maths": 9, "Physics": 2}'})
+    similar = client.get('/api/study-buddies?mode=similar').get_json()['buddies']
+    assert similar[0]['user_id'] == helper
+
+
+def test_matches_load_the_index_on_first_use(app, make_user):
+    user_id, _, _ = make_user({'Chemistry': 3}, grade='12', stream='Fresh')
+    other, _, _ = make_user({'Chemistry': 8}, grade='12', stream='Fresh')
+    index = BuddyIndex()
+    assert [match['user_id'] for match in index.matches(user_id)] == [other]
+    assert index.matches(-1) == []
@@ -0,0 +1,73 @@
+import gc
+
+import pytest
+
+import database
+import sqlite_backend
+from db_pool import ConnectionPool, PoolTimeout
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = str(tmp_path / 'pool.sqlite3')
+    pool = ConnectionPool(lambda: sqlite_backend.connect(path), pool_size=2, max_overflow=1, timeout=0.1)
+    yield pool
+    pool.dispose()
+
+
+def test_closed_connections_are_reused(pool):
+    connection = pool.connect()
+    connection.close()
+    connection.close()
+    pool.connect().close()
+    stats = pool.stats()
+    assert stats['created'] == 1
+    assert stats['in_use'] == 0
+    assert stats['idle'] == 1
+
+
+def test_checkout_times_out_when_every_slot_is_taken(pool):
+    connections = [pool.connect() for _ in range(pool.capacity)]
+    with pytest.raises(PoolTimeout):
+        pool.connect()
+    connections[0].close()
+    pool.connect().close()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_abandoned_connection_frees_its_slot(pool):
+    for _ in range(pool.capacity + 2):
+        connection = pool.connect()
+        connection.cursor().execute("SELECT 1")
+        del connection
+        gc.collect()
+    stats = pool.stats()
+    assert stats['in_use'] == 0
+    assert stats['abandoned'] == pool.capacity + 2
+    # Abandoned connections are closed, never handed out again
+    assert stats['idle'] == 0
+
+
+def test_context_manager_returns_connection(pool):
+    with pool.connect() as connection:
+        connection.cursor().execute("SELECT 1")
+    assert pool.stats()['in_use'] == 0
+
+
+def test_failing_routes_do_not_leak_connections(client, logged_in):
+    connection = database.get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute("ALTER TABLE user_timetable RENAME TO user_timetable_moved")
+    connection.commit()
+    try:
+        in_use = database.get_pool_stats()['in_use'] - 1
+        for _ in range(3):
+            assert client.get('/api/timetable').status_code == 500
+            assert client.post('/api/clear-timetable').status_code == 500
+            assert client.post('/api/generate-timetable', json={}).status_code == 500
+        assert database.get_pool_stats()['in_use'] - 1 == in_use
+    finally:
+        cursor.execute("ALTER TABLE user_timetable_moved RENAME TO user_timetable")
+        connection.commit()
+        cursor.close()
+        connection.close()
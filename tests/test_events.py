@@ -0,0 +1,65 @@
+import pytest
+
+import database
+from events import ConfidenceAggregator, apply_event, confidence_level
+
+
+def query(sql, params=()):
+    connection = database.get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        if sql.lstrip().upper().startswith('SELECT'):
+            return cursor.fetchall()
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def insert_quiz(event_id, user_id, subject_name, score):
+    query("""
+        INSERT INTO study_events (id, user_id, subject_name, event_type, duration_minutes, score, occurred_at)
+        VALUES (%s, %s, %s, 'quiz', NULL, %s, CURRENT_TIMESTAMP)
+    """, (event_id, user_id, subject_name, score))
+
+
+def test_apply_event_moves_towards_quiz_score_and_stays_in_range():
+    assert apply_event(3.0, 'quiz', score=100) == pytest.approx(3.0 + 0.3 * 7)
+    assert 9.9 < apply_event(9.9, 'session', duration_minutes=600) <= 10.0
+    assert apply_event(1.0, 'quiz', score=0) == 1.0
+    assert confidence_level(6.5) == 7
+
+
+@pytest.mark.parametrize('event', [
+    {'type': 'session', 'duration_minutes': True},
+    {'type': 'session', 'duration_minutes': 1.5},
+    {'type': 'quiz', 'score': True},
+    {'type': 'quiz', 'score': '80'},
+])
+def test_booleans_and_wrong_types_are_rejected(app, event):
+    from app import _parse_study_event
+    parsed, error = _parse_study_event(1, {'Maths': 5}, dict(event, subject_name='Maths'))
+    assert parsed is None and error
+
+
+def test_event_committed_after_a_higher_id_is_still_applied(app, make_user):
+    user_id, _, _ = make_user({'Maths': 3})
+    aggregator = ConfidenceAggregator()
+    high_id = (query("SELECT MAX(id) FROM study_events")[0][0] or 0) + 100
+
+    insert_quiz(high_id, user_id, 'Maths', 100)
+    assert aggregator.run()
+    # A batch that was slower to commit lands below the event already applied
+    insert_quiz(high_id - 50, user_id, 'Maths', 100)
+    assert aggregator.run()
+
+    expected = apply_event(apply_event(3.0, 'quiz', score=100), 'quiz', score=100)
+    assert query("""
+        SELECT confidence_level, confidence_estimate FROM user_subjects
+        WHERE user_id = %s AND subject_name = %s
+    """, (user_id, 'Maths')) == [(confidence_level(expected), expected)]
+    assert query("SELECT COUNT(*) FROM study_events WHERE applied = 0") == [(0,)]
+
+    # Nothing is applied twice
+    assert aggregator.run()
+    assert aggregator.stats()['events'] == 2
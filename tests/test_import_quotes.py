@@ -0,0 +1,53 @@
+import database
+from import_quotes import import_quotes, read_quotes
+from quote_cache import quote_hash
+
+
+def _active(quote_text):
+    connection = database.get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT is_active FROM motivation_quotes WHERE content_hash = %s",
+                       (quote_hash(quote_text, 'Tester'),))
+        return [bool(row[0]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_quote_hash_ignores_case_and_whitespace():
+    assert quote_hash('Keep  going.', 'Ann Lee') == quote_hash('keep going.', ' ann   lee ')
+    assert quote_hash('Keep going.', 'Ann Lee') != quote_hash('Keep going.', 'Someone else')
+
+
+def test_reimport_keeps_deactivated_quotes_inactive(app):
+    quotes = [{'quote_text': 'Reimported quote', 'author': 'Tester', 'category': 'Growth'}]
+    assert import_quotes(quotes)['written'] == 1
+    connection = database.get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute("UPDATE motivation_quotes SET is_active = FALSE WHERE content_hash = %s",
+                   (quote_hash('Reimported quote', 'Tester'),))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+    import_quotes(quotes)
+
+    assert _active('Reimported quote') == [False]
+
+
+def test_malformed_jsonl_lines_are_reported_and_skipped(app, tmp_path, capsys):
+    path = tmp_path / 'quotes.jsonl'
+    path.write_text('{"quote_text": "First good line", "author": "Tester"}\n'
+                    '{"quote_text": "broken\n'
+                    '["not", "an", "object"]\n'
+                    '{"quote_text": "Second good line", "author": "Tester"}\n')
+
+    stats = import_quotes(read_quotes(str(path)))
+
+    output = capsys.readouterr().out
+    assert 'line 2 of' in output and 'line 3 of' in output
+    assert stats['written'] == 2
+    assert stats['skipped'] == 2
+    assert _active('First good line') == [True]
+    assert _active('Second good line') == [True]
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from jobs import JobFailed, JobQueue, QueueFull
+
+
+def wait_for(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if job.status in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job.id} still {job.status}")
+
+
+def test_identical_jobs_are_merged_and_the_queue_is_bounded():
+    queue = JobQueue(max_workers=1, max_pending=1)
+    release = threading.Event()
+    first = queue.submit(1, 'slow', 'a', release.wait)
+    assert queue.submit(1, 'slow', 'a', release.wait) is first
+    queued = queue.submit(1, 'slow', 'b', release.wait)
+    with pytest.raises(QueueFull):
+        queue.submit(2, 'slow', 'a', release.wait)
+    release.set()
+    assert wait_for(first).status == 'done'
+    assert wait_for(queued).status == 'done'
+    assert queue.stats()['deduplicated'] == 1
+    assert queue.stats()['rejected'] == 1
+
+
+def test_job_failed_is_reported_to_the_poller():
+    queue = JobQueue(max_workers=1)
+
+    def fail():
+        raise JobFailed('No subjects provided')
+
+    job = wait_for(queue.submit(None, 'fail', '', fail))
+    assert job.status == 'failed'
+    assert job.error == 'No subjects provided'
+
+
+def test_async_subject_update_reaches_the_session_only_after_the_job(client, logged_in, monkeypatch):
+    release = threading.Event()
+    update_subjects_for = app_module._update_subjects_for
+
+    def blocked(user_id, subjects):
+        release.wait(5)
+        return update_subjects_for(user_id, subjects)
+
+    monkeypatch.setattr(app_module, '_update_subjects_for', blocked)
+    with client.session_transaction() as sess:
+        before = sess['user_subjects']
+
+    response = client.post('/api/update-subjects?async=1', json={'subjects': '{"Maths": 8}'})
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    with client.session_transaction() as sess:
+        assert sess['user_subjects'] == before
+
+    release.set()
+    wait_for(app_module.job_queue.get(job_id))
+    assert client.get(f'/api/jobs/{job_id}').get_json()['job']['status'] == 'done'
+    with client.session_transaction() as sess:
+        assert sess['user_subjects'] == {'Maths': 8}
+
+
+def test_polling_an_old_job_does_not_undo_a_newer_update(client, logged_in):
+    response = client.post('/api/update-subjects?async=1', json={'subjects': '{"Maths": 3}'})
+    job_id = response.get_json()['job_id']
+    wait_for(app_module.job_queue.get(job_id))
+    client.get(f'/api/jobs/{job_id}')
+    assert client.post('/api/update-subjects', json={'subjects': '{"Maths": 9}'}).status_code == 200
+
+    assert client.get(f'/api/jobs/{job_id}').get_json()['job']['status'] == 'done'
+    with client.session_transaction() as sess:
+        assert sess['user_subjects'] == {'Maths': 9}
+
+
+def test_jobs_are_private_to_their_user(app, client, logged_in, make_user):
+    response = client.post('/api/update-subjects?async=1', json={'subjects': '{"Physics": 4}'})
+    job_id = response.get_json()['job_id']
+    wait_for(app_module.job_queue.get(job_id))
+
+    other = app.test_client()
+    _, email, password = make_user()
+    other.post('/login', data={'email': email, 'password': password})
+    assert other.get(f'/api/jobs/{job_id}').status_code == 404
+    assert client.get(f'/api/jobs/{job_id}').status_code == 200
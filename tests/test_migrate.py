@@ -0,0 +1,18 @@
+import database
+import migrate
+
+
+def test_full_index_scans_are_reported(app):
+    connection = database.get_db_connection()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        assert migrate.full_scans(cursor, "SELECT id FROM motivation_quotes ORDER BY created_at DESC") == \
+            ['motivation_quotes']
+        assert migrate.full_scans(cursor, "SELECT id FROM motivation_quotes WHERE created_at > %s") == []
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_app_queries_pass_the_check(app):
+    assert migrate.check()
@@ -0,0 +1,53 @@
+import database
+from profile_cache import ProfileCache, profile_cache
+
+
+def insert_user_elsewhere(email):
+    """Sign a user up the way another worker would: straight into the database"""
+    connection = database.get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO users (name, email, password, grade, stream, study_time)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, ('Student', email, 'secret', '10', None, 4))
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def test_unknown_email_is_not_remembered_across_signups(client):
+    email = 'signed-up-elsewhere@example.com'
+    response = client.post('/login', data={'email': email, 'password': 'secret'})
+    assert response.status_code == 401
+
+    insert_user_elsewhere(email)
+    response = client.post('/login', data={'email': email, 'password': 'secret'})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_profiles_are_served_from_the_cache_until_invalidated(make_user):
+    user_id, email, _ = make_user()
+    profile_cache.invalidate(user_id)
+    loads = profile_cache.stats()['loads']
+    assert profile_cache.by_email(email)['id'] == user_id
+    assert profile_cache.by_id(user_id)['email'] == email
+    assert profile_cache.stats()['loads'] == loads + 1
+
+    profile_cache.invalidate(email=email)
+    assert profile_cache.by_id(user_id)['id'] == user_id
+    assert profile_cache.stats()['loads'] == loads + 2
+
+
+def test_subject_update_in_another_worker_reaches_this_cache(client, make_user):
+    user_id, email, password = make_user({'Maths': 3})
+    other_worker = ProfileCache()
+    assert other_worker.by_email(email)['subjects'][0]['confidence_level'] == 3
+    assert other_worker.by_id(user_id)['subjects'][0]['confidence_level'] == 3
+    assert other_worker.stats()['loads'] == 1
+
+    client.post('/login', data={'email': email, 'password': password})
+    client.post('/api/update-subjects', json={'subjects': '{"Maths": 8}'})
+    assert other_worker.by_email(email)['subjects'][0]['confidence_level'] == 8
+    assert other_worker.stats()['stale'] == 1
@@ -0,0 +1,62 @@
+import random
+import time
+
+import pytest
+
+from quote_cache import QuoteCache, _QuotePool, alias_sample, build_alias
+
+
+def alias_probabilities(table):
+    """Exact probability of each index under an alias table"""
+    probability, alias = table
+    count = len(probability)
+    result = [p / count for p in probability]
+    for i, p in enumerate(probability):
+        result[alias[i]] += (1 - p) / count
+    return result
+
+
+@pytest.mark.parametrize('weights', [[1], [1, 1], [1, 2, 3, 4], [5, 0, 1], [0.2, 7, 0.5, 0.5, 1.8]])
+def test_alias_table_reproduces_the_weights(weights):
+    total = sum(weights)
+    assert alias_probabilities(build_alias(weights)) == pytest.approx([w / total for w in weights])
+
+
+def test_alias_sample_never_picks_a_zero_weight():
+    rng = random.Random(7)
+    table = build_alias([3, 0, 1])
+    draws = [alias_sample(table, rng) for _ in range(4000)]
+    assert 1 not in draws
+    assert draws.count(0) / len(draws) == pytest.approx(0.75, abs=0.03)
+
+
+def quote(quote_id, category):
+    return {'id': quote_id, 'quote_text': f'Quote {quote_id}', 'author': None, 'category': category}
+
+
+def test_situation_weights_apply_per_quote():
+    pool = _QuotePool({'Procrastination': [quote(1, 'Procrastination')],
+                       'Belief': [quote(2, 'Belief'), quote(3, 'Belief')]})
+    behind = dict(zip(pool.categories, alias_probabilities(pool.tables['behind'])))
+    assert behind == pytest.approx({'Belief': 2 / 8, 'Procrastination': 6 / 8})
+    uniform = dict(zip(pool.categories, alias_probabilities(pool.tables[None])))
+    assert uniform == pytest.approx({'Belief': 2 / 3, 'Procrastination': 1 / 3})
+
+    grown = pool.with_quote(quote(4, 'Procrastination'))
+    assert grown.size == 4 and pool.size == 3
+
+
+def test_recent_quotes_are_not_repeated(monkeypatch):
+    random.seed(3)
+    cache = QuoteCache()
+    monkeypatch.setattr(cache, '_pool', _QuotePool({'Growth': [quote(i, 'Growth') for i in range(6)]}))
+    monkeypatch.setattr(cache, '_loaded_at', time.monotonic())
+    seen = [cache.random_quote(user_id=1)['id'] for _ in range(30)]
+    # Half the pool (3 quotes) is remembered, so any 4 in a row are distinct
+    assert all(len(set(seen[i:i + 4])) == 4 for i in range(len(seen) - 3))
+
+
+def test_non_numeric_levels_fall_back_to_the_steady_situation(client, logged_in):
+    with client.session_transaction() as sess:
+        sess['user_subjects'] = {'Maths': 'high', 'Physics': None}
+    assert client.get('/dashboard').status_code == 200
@@ -0,0 +1,42 @@
+import database
+from regenerate_timetables import generate_chunk, regenerate_timetables
+
+
+def _timetable(user_id):
+    connection = database.get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT subject_name FROM user_timetable WHERE user_id = %s", (user_id,))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_generate_chunk_reports_only_rebuilt_users():
+    chunk = [(1, '4', {'Maths': 3}), (2, '4', {}), (3, '4', {'Physics': 5})]
+    user_ids, rebuilt, rows = generate_chunk(chunk, ['Morning'], 2)
+    assert user_ids == [1, 2, 3]
+    assert rebuilt == [1, 3]
+    assert {row[0] for row in rows} == {1, 3}
+
+
+def test_skipped_users_keep_their_timetable(app, make_user, tmp_path):
+    rebuilt_id, _, _ = make_user({'Maths': 2})
+    skipped_id, _, _ = make_user({'Physics': 4})
+    connection = database.get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM user_subjects WHERE user_id = %s", (skipped_id,))
+    cursor.executemany("""
+        INSERT INTO user_timetable (user_id, day_of_week, time_slot, subject_name, task_type, duration_minutes, priority)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, [(user_id, 'Monday', 'Morning', 'Old subject', 'study', 60, 1) for user_id in (rebuilt_id, skipped_id)])
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+    regenerate_timetables(chunk_size=1, processes=1, checkpoint=str(tmp_path / 'checkpoint.json'),
+                          resume=False)
+
+    assert set(_timetable(rebuilt_id)) == {'Maths'}
+    assert _timetable(skipped_id) == ['Old subject']
@@ -0,0 +1,38 @@
+import data_versions
+from response_cache import ResponseCache
+
+
+def test_unchanged_subjects_revalidate_with_304(client, logged_in):
+    first = client.get('/api/user-subjects')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    etag = first.headers['ETag']
+
+    again = client.get('/api/user-subjects', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+
+def test_subject_update_changes_the_etag(client, logged_in):
+    etag = client.get('/api/user-subjects').headers['ETag']
+    client.post('/api/update-subjects', json={'subjects': '{"Maths": 9, "Physics": 6}'})
+    response = client.get('/api/user-subjects', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert {s['subject_name']: s['confidence_level'] for s in response.get_json()['subjects']}['Maths'] == 9
+
+
+def test_a_bump_from_another_worker_invalidates_this_one(app):
+    cache = ResponseCache()
+    loads = []
+
+    def load():
+        loads.append(True)
+        return {'loads': len(loads)}
+
+    with app.test_request_context('/'):
+        assert cache.respond('shared', [('test-scope', 1)], load).get_json() == {'loads': 1}
+        assert cache.respond('shared', [('test-scope', 1)], load).get_json() == {'loads': 1}
+        # What another worker's write does: only the shared counter changes
+        assert data_versions.bump(('test-scope', 1))
+        assert cache.respond('shared', [('test-scope', 1)], load).get_json() == {'loads': 2}
+    assert cache.stats()['hits'] == 1
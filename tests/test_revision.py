@@ -0,0 +1,56 @@
+from revision import MIN_EASINESS, MAX_SEED_EASINESS, RevisionScheduler, revision_scheduler, seed_easiness, sm2
+
+
+def test_sm2_intervals_grow_after_each_pass_and_restart_on_a_fail():
+    easiness, interval, repetitions = sm2(2.5, 0, 0, 5)
+    assert (interval, repetitions) == (1, 1)
+    easiness, interval, repetitions = sm2(easiness, interval, repetitions, 5)
+    assert (interval, repetitions) == (6, 2)
+    easiness, interval, repetitions = sm2(easiness, interval, repetitions, 4)
+    assert (interval, repetitions) == (round(6 * easiness), 3)
+
+    easiness, interval, repetitions = sm2(easiness, interval, repetitions, 1)
+    assert (interval, repetitions) == (1, 0)
+
+
+def test_easiness_stays_above_the_floor():
+    easiness = 1.4
+    for _ in range(5):
+        easiness, _, _ = sm2(easiness, 1, 0, 0)
+    assert easiness == MIN_EASINESS
+    assert seed_easiness(1) == MIN_EASINESS
+    assert seed_easiness(10) == MAX_SEED_EASINESS
+    assert seed_easiness(0) == seed_easiness(1)
+
+
+def test_weakest_subject_comes_first_and_moves_back_once_reviewed(client, make_user):
+    user_id, email, password = make_user({'Maths': 2, 'Physics': 8, 'Chemistry': 5})
+    client.post('/login', data={'email': email, 'password': password})
+
+    items = client.get('/api/revision/next?limit=3').get_json()['items']
+    assert [item['subject_name'] for item in items] == ['Maths', 'Chemistry', 'Physics']
+
+    response = client.post('/api/revision/review', json={'subject_name': 'Maths', 'quality': 4})
+    assert response.get_json()['item']['interval_days'] == 1
+    assert client.get('/api/revision/next').get_json()['next']['subject_name'] == 'Chemistry'
+
+    # The schedule was stored, not just kept in memory
+    revision_scheduler.invalidate(user_id)
+    assert client.get('/api/revision/next').get_json()['next']['subject_name'] == 'Chemistry'
+    assert client.post('/api/revision/review', json={'subject_name': 'Art', 'quality': 4}).status_code == 404
+
+
+def test_review_builds_on_progress_saved_by_another_worker(app, make_user):
+    user_id, _, _ = make_user({'Maths': 4})
+    first, second = RevisionScheduler(), RevisionScheduler()
+    # Both workers have the user's queue in memory before any review
+    assert first.next_items(user_id)[0].repetitions == 0
+    assert second.next_items(user_id)[0].repetitions == 0
+
+    assert first.review(user_id, 'Maths', 5).interval_days == 1
+    item = second.review(user_id, 'Maths', 5)
+    assert (item.repetitions, item.interval_days) == (2, 6)
+    assert second.next_items(user_id)[0].repetitions == 2
+
+    revisited = RevisionScheduler().next_items(user_id)[0]
+    assert (revisited.repetitions, revisited.interval_days) == (2, 6)
@@ -0,0 +1,68 @@
+import json
+
+import database
+from scheduler import allocate_sessions, diff_timetable, generate_timetable, replan_timetable
+
+SETTINGS = {'study_hours_per_day': 12, 'preferred_study_times': ['Morning', 'Afternoon', 'Evening'],
+            'days_per_subject': 3}
+SUBJECTS = {f"Subject {i}": i % 10 + 1 for i in range(15)}
+
+
+def test_every_slot_is_filled_once():
+    timetable = generate_timetable(SUBJECTS, **SETTINGS)
+    slots = {(entry['day_of_week'], entry['time_slot']) for entry in timetable}
+    assert len(slots) == len(timetable) == 63
+    assert sum(allocate_sessions(SUBJECTS, 63, 3).values()) == 63
+
+
+def test_replan_keeps_unchanged_subjects_in_place():
+    timetable = generate_timetable(SUBJECTS, **SETTINGS)
+    edited = dict(SUBJECTS, **{'Subject 3': 9})
+    replanned, changed = replan_timetable(timetable, edited, **SETTINGS)
+    before = {(entry['day_of_week'], entry['time_slot']): entry for entry in timetable}
+    for entry in replanned:
+        if entry['subject_name'] not in changed:
+            assert before[(entry['day_of_week'], entry['time_slot'])] == entry
+
+
+def test_diff_touches_only_changed_slots():
+    timetable = generate_timetable(SUBJECTS, **SETTINGS)
+    stored = [dict(entry, id=index) for index, entry in enumerate(timetable)]
+    assert diff_timetable(stored, timetable) == ([], [], [])
+
+    moved = [dict(entry) for entry in timetable]
+    moved[5]['subject_name'] = 'Something else'
+    updates, inserts, deletes = diff_timetable(stored + [dict(stored[0], id=99)], moved[1:])
+    assert updates == [(5, moved[5])]
+    assert inserts == []
+    assert sorted(deletes) == [0, 99]
+
+
+def _stored_timetable(user_id):
+    connection = database.get_db_connection()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT day_of_week, time_slot, subject_name, task_type, duration_minutes, priority
+            FROM user_timetable WHERE user_id = %s
+        """, (user_id,))
+        return sorted(tuple(row.values()) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_subject_edit_writes_only_changed_rows(client, logged_in):
+    subjects = {f"Subject {i}": i % 10 + 1 for i in range(30)}
+    assert client.post('/api/update-subjects', json={'subjects': json.dumps(subjects)}).status_code == 200
+    response = client.post('/api/generate-timetable', json=SETTINGS)
+    assert response.get_json()['sessions_written'] == 63
+    assert client.post('/api/generate-timetable', json=SETTINGS).get_json()['sessions_written'] == 0
+
+    subjects['Subject 7'] = 2
+    assert client.post('/api/update-subjects', json={'subjects': json.dumps(subjects)}).status_code == 200
+
+    expected = replan_timetable(generate_timetable(dict(subjects, **{'Subject 7': 8}), **SETTINGS),
+                                subjects, **SETTINGS)[0]
+    assert _stored_timetable(logged_in) == sorted(tuple(entry.values()) for entry in expected)
+    assert client.post('/api/generate-timetable', json=SETTINGS).get_json()['sessions_written'] == 0
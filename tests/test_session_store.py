@@ -0,0 +1,59 @@
+import pytest
+
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionStore(max_entries=2)
+    return SQLiteSessionStore(str(tmp_path / 'sessions.sqlite3'), max_entries=2, purge_every=1)
+
+
+def test_store_round_trip_and_expiry(store):
+    store.set('a', {'user_id': 1, 'user_subjects': {'Maths': 3}}, ttl=60)
+    assert store.get('a') == {'user_id': 1, 'user_subjects': {'Maths': 3}}
+    store.set('b', {'user_id': 2}, ttl=-1)
+    assert store.get('b') is None
+    store.delete('a')
+    assert store.get('a') is None
+
+
+def test_store_is_bounded(store):
+    for index in range(5):
+        store.set(str(index), {'user_id': index}, ttl=60 + index)
+    assert store.stats()['entries'] <= 2
+    assert store.get('4') == {'user_id': 4}
+
+
+def _session_cookie(client):
+    cookie = client.get_cookie('session')
+    return cookie.value if cookie else None
+
+
+def test_login_rotates_a_planted_session_id(app, client, make_user):
+    _, email, password = make_user()
+    app.session_interface.store.set('planted-by-attacker', {'theme': 'dark'}, 60)
+    client.set_cookie('session', 'planted-by-attacker')
+
+    assert client.post('/login', data={'email': email, 'password': password}).status_code == 200
+
+    sid = _session_cookie(client)
+    assert sid and sid != 'planted-by-attacker'
+    assert app.session_interface.store.get('planted-by-attacker') is None
+    attacker = app.test_client()
+    attacker.set_cookie('session', 'planted-by-attacker')
+    assert attacker.get('/api/user-subjects').status_code == 401
+
+
+def test_logout_invalidates_the_session_id(app, client, logged_in):
+    sid = _session_cookie(client)
+    assert client.get('/api/user-subjects').status_code == 200
+
+    client.get('/logout')
+
+    assert app.session_interface.store.get(sid) is None
+    replay = app.test_client()
+    replay.set_cookie('session', sid)
+    assert replay.get('/api/user-subjects').status_code == 401
+
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+
+class Warmup:
+    """Runs startup tasks in the background and reports readiness.
+
+    Each task is a (name, callable) pair; a callable that returns False
+    or raises is retried every retry_interval seconds, and the app is
+    ready once every task has succeeded. A process forked after warmup
+    started (a preloading server's workers) runs it again for itself, since
+    connection pools do not survive the fork.
+    """
+
+    def __init__(self, tasks, retry_interval=5.0):
+        self.tasks = list(tasks)
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._pid = None
+        self._done = {}
+        self._errors = {}
+        self._started_at = None
+        self._finished_at = None
+
+    def start(self):
+        """Start warming up in a background thread (once per process)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._done = {}
+            self._errors = {}
+            self._started_at = time.monotonic()
+            self._finished_at = None
+        threading.Thread(target=self._run, name='warmup', daemon=True).start()
+
+    def _run(self):
+        pending = list(self.tasks)
+        while pending:
+            failed = []
+            for name, task in pending:
+                started = time.perf_counter()
+                try:
+                    ok = task() is not False
+                    error = None if ok else 'failed'
+                except Exception as e:
+                    ok, error = False, str(e)
+                with self._lock:
+                    if ok:
+                        self._done[name] = round((time.perf_counter() - started) * 1000, 1)
+                        self._errors.pop(name, None)
+                    else:
+                        self._errors[name] = error
+                if not ok:
+                    print(f"Warmup task {name} failed: {error}")
+                    failed.append((name, task))
+            pending = failed
+            if pending:
+                time.sleep(self.retry_interval)
+        with self._lock:
+            self._finished_at = time.monotonic()
+
+    def ready(self):
+        if self._pid is not None and self._pid != os.getpid():
+            self.start()
+        return self._finished_at is not None and self._pid == os.getpid()
+
+    def status(self):
+        ready = self.ready()
+        with self._lock:
+            return {
+                'ready': ready,
+                'tasks_ms': dict(self._done),
+                'pending': [name for name, _ in self.tasks if name not in self._done],
+                'errors': dict(self._errors),
+                'seconds': round((self._finished_at or time.monotonic()) - self._started_at, 3)
+                if self._started_at is not None else None,
+            }
@@ -0,0 +1,12 @@
+"""WSGI entry point for production servers.
+
+    gunicorn 'wsgi:application' --workers 4 --preload
+
+Settings come from the environment or a .env file next to app.py (see
+config.py and .env.example). With --preload the app is configured and
+its templates compiled once in the master; set WARMUP=1 to prime the
+connection pool and caches before /ready reports the instance ready.
+"""
+from app import app
+
+application = app